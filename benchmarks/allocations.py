@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+"""
+Measure the memory allocated to encode drawings and split them into packets.
+
+The "before" scenario reproduces the send path preceding the contiguous buffer: the encoders of every drawing type
+concatenating `bytearray`s, and packets copied out of the commands with slices of 20 bytes. The "buffer" scenarios
+reproduce the encoders writing every command of a drawing into one `BTCommandBuffer`, with packets sliced as
+`memoryview`s over it. The "current" scenario uses `GYWDrawing.to_commands()`, which also packs the control commands
+with the precompiled layouts of `encoders`.
+
+For each scenario, the script reports per drawing the number of packets, the number of payload bytes copied into new
+objects, the peak memory allocated while encoding and slicing the drawing, and the best time spent over five runs.
+
+Requires Python 3.9 or later.
+
+Usage: python benchmarks/allocations.py [iterations]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from pygyw.bluetooth import commands
+from pygyw.layout import drawings, fonts, icons
+from pygyw.layout.color import Colors
+from pygyw.layout.helpers import byte_from_scale_float, clamp
+
+
+def sample_drawings():
+    return [
+        drawings.TextDrawing("Station 4 - Part #12345 - Tighten the four bolts to 25 Nm then scan the label",
+                             left=20, top=40, font=fonts.GYWFonts.ROBOTO_MONO_BOLD, size=24, max_lines=0),
+        drawings.IconDrawing(icons.GYWIcons.WARNING, left=400, top=200, color=Colors.RED, scale=2.0),
+        drawings.RectangleDrawing(left=0, top=400, width=854, height=80, color=Colors.BLUE),
+        drawings.SpinnerDrawing(left=600, top=200, color=Colors.BLACK, scale=1.5),
+    ]
+
+
+def legacy_text_commands(drawing):
+    result = []
+    current_top = drawing.top
+    for line in drawing._wrap_text():
+        ctrl_data = bytearray([commands.ControlCodes.DRAW_TEXT])
+        ctrl_data += drawing.left.to_bytes(2, 'little', signed=True)
+        ctrl_data += current_top.to_bytes(2, 'little', signed=True)
+        ctrl_data += bytes(drawing.font.filename, 'utf-8')
+        ctrl_data += drawing.size.to_bytes(1, 'little')
+        ctrl_data += drawing.color.to_rgba8888_bytes()
+        result.append(commands.BTCommand(commands.GYWCharacteristics.DISPLAY_DATA, bytes(line, 'utf-8')))
+        result.append(commands.BTCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, ctrl_data))
+        current_top += int(drawing.size * 1.33 + 0.999)
+    return result
+
+
+def legacy_icon_commands(drawing):
+    left = drawing.left.to_bytes(2, 'little', signed=True)
+    top = drawing.top.to_bytes(2, 'little', signed=True)
+    ctrl_data = bytearray([commands.ControlCodes.DRAW_IMAGE]) + left + top
+    ctrl_data += drawing.color.to_rgba8888_bytes() if drawing.color is not None else bytearray([0, 0, 0, 0])
+    ctrl_data += byte_from_scale_float(drawing.scale)
+    return [
+        commands.BTCommand(commands.GYWCharacteristics.DISPLAY_DATA, bytes(f"{drawing.icon.name}.svg", 'utf-8')),
+        commands.BTCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, ctrl_data),
+    ]
+
+
+def legacy_rectangle_commands(drawing):
+    left = drawing.left.to_bytes(2, 'little', signed=True)
+    top = drawing.top.to_bytes(2, 'little', signed=True)
+    width = drawing.width.to_bytes(2, 'little')
+    height = drawing.height.to_bytes(2, 'little')
+    color = drawing.color.to_rgba8888_bytes() if drawing.color is not None else bytearray([0, 0, 0, 0])
+    ctrl_data = bytearray([commands.ControlCodes.DRAW_RECTANGLE]) + left + top + width + height + color
+    return [commands.BTCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, ctrl_data)]
+
+
+def legacy_spinner_commands(drawing):
+    left = drawing.left.to_bytes(2, 'little', signed=True)
+    top = drawing.top.to_bytes(2, 'little', signed=True)
+    ctrl_data = bytearray([commands.ControlCodes.DRAW_SPINNER]) + left + top
+    ctrl_data += drawing.color.to_rgba8888_bytes()
+    ctrl_data += byte_from_scale_float(drawing.scale)
+    ctrl_data += drawing.animation_timing_function.value.to_bytes(1, 'little')
+    spins_per_second = int(clamp(drawing.spins_per_second, 0.0, 25.5) * 10)
+    ctrl_data += spins_per_second.to_bytes(1, 'little')
+    return [
+        commands.BTCommand(commands.GYWCharacteristics.DISPLAY_DATA, bytes("spinner_1.svg", 'utf-8')),
+        commands.BTCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, ctrl_data),
+    ]
+
+
+def buffer_text_commands(drawing):
+    buffer = commands.BTCommandBuffer()
+    current_top = drawing.top
+    for line in drawing._wrap_text():
+        buffer.write(line.encode('utf-8'))
+        buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+        buffer.write_byte(commands.ControlCodes.DRAW_TEXT)
+        buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+        buffer.write(current_top.to_bytes(2, 'little', signed=True))
+        buffer.write(drawing.font.filename.encode('utf-8'))
+        buffer.write_byte(drawing.size)
+        buffer.write(drawing.color.to_rgba8888_bytes())
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+        current_top += int(drawing.size * 1.33 + 0.999)
+    return buffer.to_commands()
+
+
+def buffer_icon_commands(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write(f"{drawing.icon.name}.svg".encode('utf-8'))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+    buffer.write_byte(commands.ControlCodes.DRAW_IMAGE)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.color.to_rgba8888_bytes() if drawing.color is not None else bytes(4))
+    buffer.write(byte_from_scale_float(drawing.scale))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+def buffer_rectangle_commands(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write_byte(commands.ControlCodes.DRAW_RECTANGLE)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.width.to_bytes(2, 'little'))
+    buffer.write(drawing.height.to_bytes(2, 'little'))
+    buffer.write(drawing.color.to_rgba8888_bytes() if drawing.color is not None else bytes(4))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+def buffer_spinner_commands(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write(b"spinner_1.svg")
+    buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+    buffer.write_byte(commands.ControlCodes.DRAW_SPINNER)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.color.to_rgba8888_bytes())
+    buffer.write(byte_from_scale_float(drawing.scale))
+    buffer.write_byte(drawing.animation_timing_function.value)
+    buffer.write_byte(int(clamp(drawing.spins_per_second, 0.0, 25.5) * 10))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+LEGACY_ENCODERS = {
+    drawings.TextDrawing: legacy_text_commands,
+    drawings.IconDrawing: legacy_icon_commands,
+    drawings.RectangleDrawing: legacy_rectangle_commands,
+    drawings.SpinnerDrawing: legacy_spinner_commands,
+}
+
+BUFFER_ENCODERS = {
+    drawings.TextDrawing: buffer_text_commands,
+    drawings.IconDrawing: buffer_icon_commands,
+    drawings.RectangleDrawing: buffer_rectangle_commands,
+    drawings.SpinnerDrawing: buffer_spinner_commands,
+}
+
+
+def before(drawing, sink):
+    for command in LEGACY_ENCODERS[type(drawing)](drawing):
+        for i in range(0, len(command.data), 20):
+            sink(command.data[i:i + 20])
+
+
+def buffer(drawing, sink, packet_size):
+    for command in BUFFER_ENCODERS[type(drawing)](drawing):
+        data = command.view()
+        for i in range(0, len(data), packet_size):
+            sink(data[i:i + packet_size])
+
+
+def current(drawing, sink, packet_size):
+    for command in drawing.to_commands():
+        data = command.view()
+        for i in range(0, len(data), packet_size):
+            sink(data[i:i + packet_size])
+
+
+def measure(name, send, samples, iterations):
+    packets = 0
+    copied = 0
+
+    def sink(packet):
+        nonlocal packets, copied
+        packets += 1
+        if not isinstance(packet, memoryview):
+            copied += len(packet)
+
+    peak = 0
+    tracemalloc.start()
+    for _ in range(iterations):
+        for drawing in samples:
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            send(drawing, sink)
+            peak += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    count = iterations * len(samples)
+    packets_count, copied_count = packets, copied
+
+    # The best of several runs, the others being slowed down by the rest of the system.
+    elapsed = float("inf")
+    for _ in range(5):
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            for drawing in samples:
+                send(drawing, sink)
+        elapsed = min(elapsed, time.perf_counter() - start_time)
+
+    packets, copied = packets_count, copied_count
+    print(f"{name:<24} {packets / count:>8.1f} {copied / count:>8.1f} {peak / count:>10.1f} {elapsed / count * 1e6:>8.2f}")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    samples = sample_drawings()
+
+    for drawing in samples:
+        expected = [bytes(c.data) for c in LEGACY_ENCODERS[type(drawing)](drawing)]
+        assert [bytes(c.data) for c in BUFFER_ENCODERS[type(drawing)](drawing)] == expected
+        assert [bytes(c.data) for c in drawing.to_commands()] == expected
+
+    print(f"{'scenario':<24} {'packets':>8} {'copied':>8} {'peak B':>10} {'us':>8}")
+    measure("before (20 B copies)", before, samples, iterations)
+    measure("buffer (20 B views)", lambda d, s: buffer(d, s, 20), samples, iterations)
+    measure("buffer (244 B views)", lambda d, s: buffer(d, s, 244), samples, iterations)
+    measure("current (244 B views)", lambda d, s: current(d, s, 244), samples, iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""
+Measure the time spent encoding each type of drawing.
+
+For each drawing type, the script compares three encodings producing the same bytes:
+- "legacy": the previous encoders, writing every field into a `BTCommandBuffer` with `int.to_bytes` and
+  `Color.to_rgba8888_bytes`,
+- "to_commands": `GYWDrawing.to_commands()`, built on the precompiled `struct.Struct` layouts of `encoders`,
+- "pack_into": the `encoders.pack_*` function alone, writing the control command into a preallocated buffer,
+- "cached": `GYWCommandCache.get()` once the drawing is in the cache.
+
+Usage: python benchmarks/encoders.py [iterations]
+"""
+
+import sys
+import timeit
+
+from pygyw.bluetooth import commands
+from pygyw.layout import cache, drawings, encoders, fonts, icons
+from pygyw.layout.color import Color, Colors
+from pygyw.layout.helpers import byte_from_scale_float, clamp, int_from_scale_float
+
+
+def legacy_rgba(color):
+    red = color.red.to_bytes(1, "little")
+    green = color.green.to_bytes(1, "little")
+    blue = color.blue.to_bytes(1, "little")
+    alpha = color.alpha.to_bytes(1, "little")
+    return red + green + blue + alpha
+
+
+def legacy_text(drawing):
+    buffer = commands.BTCommandBuffer()
+    top = drawing.top
+    for line in drawing._wrap_text():
+        buffer.write(line.encode('utf-8'))
+        buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+        buffer.write_byte(commands.ControlCodes.DRAW_TEXT)
+        buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+        buffer.write(top.to_bytes(2, 'little', signed=True))
+        buffer.write(drawing.font.filename.encode('utf-8'))
+        buffer.write_byte(drawing.size)
+        buffer.write(legacy_rgba(drawing.color))
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+        top += int(drawing.size * 1.33 + 0.999)
+    return buffer.to_commands()
+
+
+def legacy_icon(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write(f"{drawing.icon.name}.svg".encode('utf-8'))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+    buffer.write_byte(commands.ControlCodes.DRAW_IMAGE)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(legacy_rgba(drawing.color) if drawing.color is not None else bytes(4))
+    buffer.write(byte_from_scale_float(drawing.scale))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+def legacy_rectangle(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write_byte(commands.ControlCodes.DRAW_RECTANGLE)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.width.to_bytes(2, 'little'))
+    buffer.write(drawing.height.to_bytes(2, 'little'))
+    buffer.write(legacy_rgba(drawing.color) if drawing.color is not None else bytes(4))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+def legacy_spinner(drawing):
+    buffer = commands.BTCommandBuffer()
+    buffer.write(b"spinner_1.svg")
+    buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+    buffer.write_byte(commands.ControlCodes.DRAW_SPINNER)
+    buffer.write(drawing.left.to_bytes(2, 'little', signed=True))
+    buffer.write(drawing.top.to_bytes(2, 'little', signed=True))
+    buffer.write(legacy_rgba(drawing.color))
+    buffer.write(byte_from_scale_float(drawing.scale))
+    buffer.write_byte(drawing.animation_timing_function.value)
+    buffer.write_byte(int(clamp(drawing.spins_per_second, 0.0, 25.5) * 10))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()
+
+
+def legacy_clear(color):
+    data = bytearray([commands.ControlCodes.CLEAR])
+    data += legacy_rgba(color)
+    return data
+
+
+def cases():
+    text = drawings.TextDrawing("Tighten the four bolts", left=20, top=40, font=fonts.GYWFonts.ROBOTO_MONO_BOLD, size=24)
+    icon = drawings.IconDrawing(icons.GYWIcons.WARNING, left=400, top=200, color=Colors.RED, scale=2.0)
+    rectangle = drawings.RectangleDrawing(left=0, top=400, width=854, height=80, color=Colors.BLUE)
+    spinner = drawings.SpinnerDrawing(left=600, top=200, color=Colors.BLACK, scale=1.5)
+    clear_color = Color(30, 30, 30)
+    buffer = bytearray(64)
+
+    return [
+        ("text", legacy_text, text.to_commands, text,
+         lambda: encoders.pack_text(buffer, 0, text.left, text.top, text.font, text.size, text.color)),
+        ("icon", legacy_icon, icon.to_commands, icon,
+         lambda: encoders.pack_image(buffer, 0, icon.left, icon.top, icon.color, int_from_scale_float(icon.scale))),
+        ("rectangle", legacy_rectangle, rectangle.to_commands, rectangle,
+         lambda: encoders.pack_rectangle(buffer, 0, rectangle.left, rectangle.top, rectangle.width, rectangle.height,
+                                         rectangle.color)),
+        ("spinner", legacy_spinner, spinner.to_commands, spinner,
+         lambda: encoders.pack_spinner(buffer, 0, spinner.left, spinner.top, spinner.color,
+                                       int_from_scale_float(spinner.scale), spinner.animation_timing_function, 15)),
+        ("clear", legacy_clear, lambda: encoders.encode_clear(clear_color), clear_color,
+         lambda: encoders.pack_clear(buffer, 0, clear_color)),
+    ]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    def per_call(function):
+        return min(timeit.repeat(function, number=iterations, repeat=3)) / iterations * 1e9
+
+    command_cache = cache.GYWCommandCache()
+
+    print(f"{'drawing':<12} {'legacy ns':>10} {'to_commands ns':>15} {'pack_into ns':>13} {'cached ns':>10} {'speedup':>8}")
+    for name, legacy, current, subject, pack in cases():
+        if name == "clear":
+            assert bytes(legacy(subject)) == bytes(current())
+        else:
+            assert [bytes(c.data) for c in legacy(subject)] == [bytes(c.data) for c in current()]
+        legacy_ns = per_call(lambda: legacy(subject))
+        current_ns = per_call(current)
+        cached_ns = per_call(lambda: command_cache.get(subject)) if name != "clear" else float("nan")
+        print(f"{name:<12} {legacy_ns:>10.0f} {current_ns:>15.0f} {per_call(pack):>13.0f} {cached_ns:>10.0f} "
+              f"{legacy_ns / current_ns:>7.2f}x")
+
+    color = Colors.RED
+    print(f"{'rgba bytes':<12} {per_call(lambda: legacy_rgba(color)):>10.0f} "
+          f"{per_call(color.to_rgba8888_bytes):>15.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+"""
+Measure the memory footprint of drawings and commands kept resident.
+
+The "dict" scenario reproduces the previous classes, whose attributes were stored in a per-instance `__dict__`. The
+"slots" scenario uses the drawings and `BTCommand` of the library, whose attributes are stored in `__slots__`, and the
+"frozen" scenario their immutable variants (`GYWDrawing.freeze()` and `BTFrozenCommand`).
+
+For each scenario, the script reports the memory allocated to build the objects, in total and per object. The texts,
+colors, fonts, icons and data are shared by all scenarios and not counted.
+
+Usage: python benchmarks/memory.py [count]
+"""
+
+import sys
+import tracemalloc
+
+from pygyw.bluetooth import commands
+from pygyw.layout import drawings, fonts, icons
+from pygyw.layout.color import Colors
+
+
+class LegacyDrawing:
+    def __init__(self, drawing_type, left, top):
+        self.drawing_type = drawing_type
+        self.left = left
+        self.top = top
+
+
+class LegacyTextDrawing(LegacyDrawing):
+    def __init__(self, text, left, top, font, size, color, max_width, max_lines):
+        super().__init__("text", left, top)
+        self.text = text
+        self.font = font
+        self.size = size
+        self.color = color
+        self.max_width = max_width
+        self.max_lines = max_lines
+
+
+class LegacyIconDrawing(LegacyDrawing):
+    def __init__(self, icon, left, top, color, scale):
+        super().__init__("icon", left, top)
+        self.icon = icon
+        self.color = color
+        self.scale = scale
+
+
+class LegacyRectangleDrawing(LegacyDrawing):
+    def __init__(self, left, top, width, height, color):
+        super().__init__("rectangle", left, top)
+        self.width = width
+        self.height = height
+        self.color = color
+
+
+class LegacySpinnerDrawing(LegacyDrawing):
+    def __init__(self, left, top, color, scale, animation_timing_function, spins_per_second):
+        super().__init__("spinner", left, top)
+        self.color = color
+        self.scale = scale
+        self.animation_timing_function = animation_timing_function
+        self.spins_per_second = spins_per_second
+
+
+class LegacyCommand:
+    def __init__(self, characteristic, data):
+        self.characteristic = characteristic
+        self.data = data
+
+
+TEXTS = [f"Step {step}: tighten bolt #{step % 12}" for step in range(100)]
+
+
+def build_legacy(count):
+    result = []
+    for i in range(count // 4):
+        left, top = i % 800, i % 400
+        result.append(LegacyTextDrawing(TEXTS[i % 100], left, top, fonts.GYWFonts.ROBOTO_MONO, 24, Colors.BLACK, None, 1))
+        result.append(LegacyIconDrawing(icons.GYWIcons.WARNING, left, top, Colors.RED, 2.0))
+        result.append(LegacyRectangleDrawing(left, top, 100, 20, Colors.BLUE))
+        result.append(LegacySpinnerDrawing(left, top, Colors.BLACK, 1.0, drawings.AnimationTimingFunction.LINEAR, 1.0))
+    return result
+
+
+def build_slots(count):
+    result = []
+    for i in range(count // 4):
+        left, top = i % 800, i % 400
+        result.append(drawings.TextDrawing(TEXTS[i % 100], left, top, fonts.GYWFonts.ROBOTO_MONO, 24, Colors.BLACK))
+        result.append(drawings.IconDrawing(icons.GYWIcons.WARNING, left, top, Colors.RED, 2.0))
+        result.append(drawings.RectangleDrawing(left, top, 100, 20, Colors.BLUE))
+        result.append(drawings.SpinnerDrawing(left, top, Colors.BLACK, 1.0))
+    return result
+
+
+def build_frozen(count):
+    result = []
+    for i in range(count // 4):
+        left, top = i % 800, i % 400
+        result.append(drawings.FrozenTextDrawing(TEXTS[i % 100], left, top, fonts.GYWFonts.ROBOTO_MONO, 24, Colors.BLACK))
+        result.append(drawings.FrozenIconDrawing(icons.GYWIcons.WARNING, left, top, Colors.RED, 2.0))
+        result.append(drawings.FrozenRectangleDrawing(left, top, 100, 20, Colors.BLUE))
+        result.append(drawings.FrozenSpinnerDrawing(left, top, Colors.BLACK, 1.0))
+    return result
+
+
+DATA = bytes(15)
+
+
+def build_commands(command_type, count):
+    return [command_type(commands.GYWCharacteristics.DISPLAY_COMMAND, DATA) for _ in range(count)]
+
+
+def measure(name, build, count):
+    tracemalloc.start()
+    objects = build(count)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<20} {allocated / 1e6:>10.2f} {allocated / len(objects):>10.1f}")
+    return objects
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print(f"{count} drawings")
+    print(f"{'scenario':<20} {'MB':>10} {'B/object':>10}")
+    measure("dict", build_legacy, count)
+    measure("slots", build_slots, count)
+    measure("frozen", build_frozen, count)
+
+    print(f"\n{count} commands")
+    print(f"{'scenario':<20} {'MB':>10} {'B/object':>10}")
+    measure("dict", lambda n: build_commands(LegacyCommand, n), count)
+    measure("slots", lambda n: build_commands(commands.BTCommand, n), count)
+    measure("frozen", lambda n: build_commands(commands.BTFrozenCommand, n), count)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,16 @@
+from .adapters import BTAdapterScheduler, list_adapters
 from .device import BTDevice
 from .exceptions import BTException
-from .manager import BTManager
+from .fleet import BTBroadcastReport, BTBroadcastResult, BTFleet
+from .manager import BTConnectReport, BTConnectResult, BTManager
+from .notifications import BTNotification, BTNotificationStream, OverflowPolicy
+from .pacing import BTPacer, PacingMode
+from .registry import BTRegistry, BTRegistryEntry
+from .retry import BTRetryPolicy
+from .state import BTDisplayState
+from .stats import BTDeviceStats
+from .supervisor import BTSupervisor
+from .sync import BTSyncClient, BTSyncDevice
+from .transport import BTTransport, BleakTransport, LoopbackTransport, LoopbackWrite
+from .writer import BTJob, BTJobQueue, BTSendResult, BTStreamItem, BTWriter, Priority, SendStatus
 from . import settings
@@ -0,0 +1,413 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+from typing import Any, Callable, Dict, List, Optional
+
+from .device import BTDevice
+from .exceptions import BTException
+from .writer import BTSendResult, Priority
+from ..layout import drawings
+from ..layout.color import Color
+
+logger = logging.getLogger(__name__)
+
+#: Builds the device of an address on an adapter. Must be a module-level function when workers are processes.
+DeviceFactory = Callable[[str, Optional[str]], BTDevice]
+
+
+def list_adapters() -> List[str]:
+    """
+    List the Bluetooth adapters of the computer.
+
+    Only BlueZ (Linux) lets an application choose its adapter: on the other systems, the list is empty and the
+    default adapter is used.
+
+    :return: The names of the adapters, e.g. ["hci0", "hci1"].
+    :rtype: `list[str]`
+
+    """
+
+    if platform.system() != "Linux":
+        return []
+
+    try:
+        names = os.listdir("/sys/class/bluetooth")
+    except OSError:
+        return []
+
+    adapters = [name for name in names if name.startswith("hci") and name[3:].isdigit()]
+    return sorted(adapters, key=lambda name: int(name[3:]))
+
+
+def default_device_factory(address: str, adapter: Optional[str]) -> BTDevice:
+    """
+    Build a `BTDevice` communicating through the given adapter.
+
+    :param address: The MAC address of the device.
+    :type address: str
+    :param adapter: The name of the adapter, or None for the default one.
+    :type adapter: str or None
+
+    :return: The device.
+    :rtype: `BTDevice`
+
+    """
+
+    return BTDevice(address, adapter=adapter)
+
+
+class _AdapterHost:
+    """The devices of one adapter and the requests they can serve."""
+
+    def __init__(self, adapter: Optional[str], device_factory: DeviceFactory):
+        self.adapter = adapter
+        self.device_factory = device_factory
+        self.devices: Dict[str, BTDevice] = {}
+
+    def __device(self, address: str) -> BTDevice:
+        try:
+            return self.devices[address]
+        except KeyError:
+            raise BTException(f"Device {address} is not handled by adapter {self.adapter}") from None
+
+    async def connect(self, address: str) -> bool:
+        device = self.devices.get(address)
+        if device is None:
+            device = self.devices[address] = self.device_factory(address, self.adapter)
+        connected = False
+        try:
+            connected = await device.connect()
+            return connected
+        finally:
+            if not connected:
+                # The scheduler forgets the device as well.
+                self.devices.pop(address, None)
+
+    async def disconnect(self, address: str) -> bool:
+        device = self.devices.pop(address, None)
+        return await device.disconnect() if device is not None else True
+
+    async def send_drawing(self, address: str, drawing: drawings.GYWDrawing, priority: Priority, ttl: Optional[float]) -> BTSendResult:
+        return await self.__device(address).send_drawing(drawing, priority, ttl)
+
+    async def clear_screen(self, address: str, color: Optional[Color], priority: Priority) -> BTSendResult:
+        return await self.__device(address).clear_screen(color, priority)
+
+    async def close(self):
+        await asyncio.gather(*(device.disconnect() for device in self.devices.values()), return_exceptions=True)
+        self.devices.clear()
+
+
+def _serve(adapter: Optional[str], device_factory: DeviceFactory, requests: "multiprocessing.Queue", responses: "multiprocessing.Queue"):
+    # Entry point of a worker process: the requests are served concurrently by an event loop of its own.
+    async def handle(host: _AdapterHost, request_id: int, operation: str, args: tuple):
+        try:
+            payload = await getattr(host, operation)(*args)
+        except Exception as e:
+            responses.put((request_id, False, BTException(f"{type(e).__name__}: {e}")))
+        else:
+            responses.put((request_id, True, payload))
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        host = _AdapterHost(adapter, device_factory)
+        tasks = set()
+        while True:
+            request = await loop.run_in_executor(None, requests.get)
+            if request is None:
+                break
+            task = loop.create_task(handle(host, *request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await host.close()
+
+    asyncio.run(main())
+
+
+class _AdapterProcess:
+    """The front of a worker process: forwards the requests and resolves their futures."""
+
+    def __init__(self, adapter: Optional[str], device_factory: DeviceFactory):
+        context = multiprocessing.get_context("spawn")
+        self.adapter = adapter
+        self.requests = context.Queue()
+        self.responses = context.Queue()
+        self.process = context.Process(target=_serve,
+                                       args=(adapter, device_factory, self.requests, self.responses),
+                                       name=f"pygyw-{adapter or 'default'}",
+                                       daemon=True)
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count()
+        self.reader: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.process.start()
+        self.reader = asyncio.get_running_loop().create_task(self.__read())
+
+    async def __read(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                request_id, ok, payload = await loop.run_in_executor(None, self.responses.get, True, 0.5)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    break
+                continue
+            future = self.pending.pop(request_id, None)
+            if future is None or future.done():
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(payload)
+
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(BTException(f"The worker of adapter {self.adapter} stopped"))
+        self.pending.clear()
+
+    async def call(self, operation: str, *args) -> Any:
+        if not self.process.is_alive():
+            raise BTException(f"The worker of adapter {self.adapter} is not running")
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.requests.put((request_id, operation, args))
+        return await future
+
+    async def close(self):
+        if self.process.is_alive():
+            self.requests.put(None)
+            await asyncio.get_running_loop().run_in_executor(None, self.process.join)
+        if self.reader is not None:
+            await self.reader
+
+
+class _AdapterLocal:
+    """Serves the requests of one adapter in the event loop of the caller."""
+
+    def __init__(self, adapter: Optional[str], device_factory: DeviceFactory):
+        self.adapter = adapter
+        self.host = _AdapterHost(adapter, device_factory)
+
+    def start(self):
+        pass
+
+    async def call(self, operation: str, *args) -> Any:
+        return await getattr(self.host, operation)(*args)
+
+    async def close(self):
+        await self.host.close()
+
+
+class BTAdapterScheduler:
+    """
+    Spread devices across several Bluetooth adapters.
+
+    A single adapter supports a limited number of connections and shares its radio time between them. The scheduler
+    assigns each device to the adapter with the fewest devices and routes its drawings to that adapter. With
+    `processes=True`, the I/O of each adapter runs in a worker process of its own, fed through a queue, so that the
+    encoding and the event loop of one adapter do not slow down the others.
+
+    Worker processes are started with the "spawn" method: the main module of the application must be importable
+    (guarded by `if __name__ == "__main__":`) and the device factory must be a module-level function.
+
+    Attributes:
+        adapters: The names of the adapters. None stands for the default adapter.
+        processes: Whether each adapter runs in a worker process.
+        assignments: The adapter of each device address.
+
+    """
+
+    def __init__(self,
+                 adapters: Optional[List[Optional[str]]] = None,
+                 processes: bool = False,
+                 device_factory: DeviceFactory = default_device_factory):
+        """
+        Initialize a new instance of the `BTAdapterScheduler` class.
+
+        :param adapters: The names of the adapters to use. Defaults to None (all the adapters of the computer, or
+            the default adapter if they cannot be listed).
+        :type adapters: `list[str]` or None
+        :param processes: Whether to run the I/O of each adapter in a worker process. Defaults to False.
+        :type processes: bool
+        :param device_factory: Builds the device of an address on an adapter. Defaults to `default_device_factory`.
+        :type device_factory: callable
+
+        """
+
+        if adapters is None:
+            adapters = list_adapters() or [None]
+        if not adapters:
+            raise BTException("At least one adapter is required")
+
+        self.adapters: List[Optional[str]] = list(adapters)
+        self.processes = processes
+        self.assignments: Dict[str, Optional[str]] = {}
+        worker_class = _AdapterProcess if processes else _AdapterLocal
+        self.__workers = {adapter: worker_class(adapter, device_factory) for adapter in self.adapters}
+        self.__running = False
+
+    def __str__(self) -> str:
+        mode = "processes" if self.processes else "in process"
+        return f"Scheduler of {len(self.assignments)} devices on {len(self.adapters)} adapters ({mode})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def load(self) -> Dict[Optional[str], int]:
+        """
+        Count the devices assigned to each adapter.
+
+        :return: The number of devices of each adapter.
+        :rtype: `dict[str, int]`
+
+        """
+
+        load = {adapter: 0 for adapter in self.adapters}
+        for adapter in self.assignments.values():
+            load[adapter] += 1
+        return load
+
+    def assign(self, address: str) -> Optional[str]:
+        """
+        Choose the adapter of a device: the one with the fewest devices, the first one in case of a tie.
+
+        A device keeps its adapter once it has been assigned.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        :return: The name of the adapter.
+        :rtype: str or None
+
+        """
+
+        if address not in self.assignments:
+            load = self.load()
+            self.assignments[address] = min(self.adapters, key=lambda adapter: load[adapter])
+        return self.assignments[address]
+
+    async def start(self):
+        """Start the workers of the adapters."""
+
+        if not self.__running:
+            for worker in self.__workers.values():
+                worker.start()
+            self.__running = True
+
+    async def stop(self):
+        """Disconnect every device and stop the workers."""
+
+        if self.__running:
+            await asyncio.gather(*(worker.close() for worker in self.__workers.values()))
+            self.__running = False
+        self.assignments.clear()
+
+    async def __call(self, address: str, operation: str, *args) -> Any:
+        if not self.__running:
+            raise BTException("The scheduler is not started")
+        if address not in self.assignments:
+            raise BTException(f"Device {address} is not connected")
+        return await self.__workers[self.assignments[address]].call(operation, address, *args)
+
+    async def connect(self, address: str) -> bool:
+        """
+        Assign a device to an adapter and connect to it.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        :return: The result of the connection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        adapter = self.assign(address)
+        logger.debug(f"Connecting to {address} through adapter {adapter}")
+        connected = False
+        try:
+            connected = await self.__call(address, "connect")
+            return connected
+        finally:
+            if not connected:
+                self.assignments.pop(address, None)
+
+    async def disconnect(self, address: str) -> bool:
+        """
+        Disconnect a device and free its place on its adapter.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        :return: The result of the disconnection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        if address not in self.assignments:
+            return True
+        try:
+            return await self.__call(address, "disconnect")
+        finally:
+            del self.assignments[address]
+
+    async def send_drawing(self,
+                           address: str,
+                           drawing: drawings.GYWDrawing,
+                           priority: Priority = Priority.NORMAL,
+                           ttl: Optional[float] = None) -> BTSendResult:
+        """
+        Send and display a drawing on a device.
+
+        :param address: The MAC address of the device.
+        :type address: str
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the drawing could not be sent.
+
+        """
+
+        return await self.__call(address, "send_drawing", drawing, priority, ttl)
+
+    async def clear_screen(self, address: str, color: Optional[Color] = None, priority: Priority = Priority.NORMAL) -> BTSendResult:
+        """
+        Clear the screen of a device.
+
+        :param address: The MAC address of the device.
+        :type address: str
+        :param color: The color to fill the screen with. Defaults to None (the default color of the device).
+        :type color: `Color` or None
+        :param priority: The priority of the command. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the command could not be sent.
+
+        """
+
+        return await self.__call(address, "clear_screen", color, priority)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "processes": self.processes,
+            "adapters": self.adapters,
+            "assignments": dict(self.assignments),
+        }
@@ -38,10 +38,14 @@ class BTCommand:
 
     Attributes:
         characteristic: The UUID of the BLE characteristic to which the command will be sent.
-        data: The data to be sent as part of the command.
+        data: The data to be sent as part of the command. Any object supporting the buffer protocol is accepted,
+              such as `bytes`, `bytearray` or a `memoryview` over a larger buffer.
 
     """
 
+    # No "__dict__": only the attributes of the command can be set.
+    __slots__ = ("characteristic", "data", "__weakref__")
+
     def __init__(self, characteristic, data):
         """
         Initialize a new instance of the `BTCommand` class.
@@ -49,9 +53,175 @@ class BTCommand:
         :param characteristic: The UUID of the BLE characteristic to which the command will be sent.
         :type characteristic: str
         :param data: The data to be sent as part of the command.
-        :type data: bytearray or bytes
+        :type data: bytes, bytearray, memoryview or any object supporting the buffer protocol
 
         """
 
         self.characteristic = characteristic
         self.data = data
+
+    def view(self) -> memoryview:
+        """
+        Return a flat, byte-oriented view over the data of the command, without copying it.
+
+        :return: The view over the data.
+        :rtype: memoryview
+
+        """
+
+        view = memoryview(self.data)
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        return view
+
+
+class BTFrozenCommand(BTCommand):
+    """
+    An immutable `BTCommand`, equal to and hashed like the other `BTFrozenCommand` with the same characteristic and data.
+
+    A plain `BTCommand` is mutable and compared by identity, so it is never equal to a frozen command. The data is kept
+    if it is read-only (`bytes` or a read-only `memoryview`), and copied into `bytes` otherwise.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __init__(self, characteristic, data):
+        """
+        Initialize a new instance of the `BTFrozenCommand` class.
+
+        :param characteristic: The UUID of the BLE characteristic to which the command will be sent.
+        :type characteristic: str
+        :param data: The data to be sent as part of the command.
+        :type data: bytes, bytearray, memoryview or any object supporting the buffer protocol
+
+        """
+
+        if not isinstance(data, bytes) and not (isinstance(data, memoryview) and data.readonly):
+            data = bytes(data)
+        super().__init__(characteristic, data)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BTFrozenCommand):
+            return NotImplemented
+        return self.characteristic == other.characteristic and self.view() == other.view()
+
+    def __hash__(self) -> int:
+        if not hasattr(self, "_hash"):
+            self._hash = hash((self.characteristic, self.view()))
+        return self._hash
+
+
+class BTCommandBuffer:
+    """
+    Builds the commands of a frame in one contiguous buffer.
+
+    The payloads of the commands are appended to a single `bytearray` and the resulting commands hold `memoryview`
+    slices over it, so no intermediate buffer is allocated per command nor per packet. When the size of the frame is
+    known in advance, the buffer can be allocated once with that capacity and fixed-size fields packed into it in
+    place (see `reserve`).
+    """
+
+    def __init__(self, capacity: int = 0):
+        """
+        Initialize a new, empty `BTCommandBuffer`.
+
+        :param capacity: The number of bytes allocated up front. The buffer grows beyond it if needed. Defaults to 0.
+        :type capacity: int
+
+        """
+
+        self._buffer = bytearray(capacity)
+        self._length = 0
+        self._spans = []
+        self._start = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def buffer(self) -> bytearray:
+        """The underlying buffer, in which the space returned by `reserve` can be written."""
+
+        return self._buffer
+
+    def write(self, data):
+        """
+        Append data to the payload of the current command.
+
+        :param data: The data to append.
+        :type data: bytes, bytearray or memoryview
+
+        """
+
+        end = self._length + len(data)
+        self._buffer[self._length:end] = data
+        self._length = end
+
+    def write_byte(self, value: int):
+        """
+        Append a single byte to the payload of the current command.
+
+        :param value: The byte to append.
+        :type value: int
+
+        """
+
+        if self._length < len(self._buffer):
+            self._buffer[self._length] = value
+        else:
+            self._buffer.append(value)
+        self._length += 1
+
+    def reserve(self, size: int) -> int:
+        """
+        Append space to the payload of the current command, to be written in place (e.g. with `struct.pack_into`).
+
+        :param size: The number of bytes to reserve.
+        :type size: int
+
+        :return: The offset of the reserved space in `buffer`.
+        :rtype: int
+
+        """
+
+        offset = self._length
+        end = offset + size
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(end - len(self._buffer)))
+        self._length = end
+        return offset
+
+    def end(self, characteristic: str):
+        """
+        Terminate the current command.
+
+        :param characteristic: The UUID of the BLE characteristic to which the command will be sent.
+        :type characteristic: str
+
+        """
+
+        end = self._length
+        self._spans.append((characteristic, self._start, end))
+        self._start = end
+
+    def to_commands(self) -> "list[BTCommand]":
+        """
+        Return the commands that were terminated, as views over the shared buffer.
+
+        No more data can be written once this method has been called.
+
+        :return: The list of commands.
+        :rtype: `list[BTCommand]`
+
+        """
+
+        view = memoryview(self._buffer)
+        return [BTCommand(characteristic, view[start:end]) for characteristic, start, end in self._spans]
@@ -1,14 +1,24 @@
 import asyncio
 import logging
-import platform
-from typing import Optional
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Dict, Hashable, Iterable, Optional, Set, Union
 
 from bleak import BleakClient
 from bleak.backends.device import BLEDevice
-from bleak.exc import BleakError, BleakDeviceNotFoundError
-
-from . import commands, exceptions
-from ..layout import drawings
+from bleak.exc import BleakError
+
+from . import commands, exceptions, settings
+from .notifications import BTNotificationStream, OverflowPolicy, _notification_handler
+from .pacing import BTPacer
+from .probe import BTProbeResult, probe_link
+from .retry import BTRetryPolicy
+from .state import BTDisplayState
+from .stats import BTDeviceStats
+from .supervisor import BTSupervisor
+from .transport import BTTransport, BleakTransport
+from .writer import BTSendResult, BTStreamItem, BTWriter, Priority
+from ..layout import cache, drawings, encoders
+from ..layout.cache import GYWCommandCache
 from ..layout.color import Color
 
 logger = logging.getLogger(__name__)
@@ -20,41 +30,198 @@ class BTDevice:
 
     Attributes:
         device: The underlying BLE device object that is used to communicate with the device.
-        client: The `BleakClient` used to connect to and interact with the device. This attribute
-            is set to None by default and will be initialized when a connection to the device is established.
+        transport: The link used to exchange data with the device. Defaults to a `BleakTransport`.
+        mtu_override: An MTU to use instead of the negotiated one, or None to use the negotiated MTU.
+        max_packet_size: An upper bound (in bytes) on the size of the packets, or None for no limit.
+        stats: The counters of the traffic sent to the device.
+        writer: The background task writing the queued commands to the device.
+        pacer: The controller spacing the packets written to the device.
+        retry_policy: How transient errors are retried before disconnecting, or None to disconnect on the first error.
+        supervisor: The `BTSupervisor` keeping the device connected, or None.
+        command_cache: The cache of the commands of the drawings sent to the device.
+        display_state: The fields last sent to the display, used to omit them from the next commands, or None.
     """
 
-    def __init__(self, device: "BLEDevice | str"):
+    def __init__(self,
+                 device: "BLEDevice | str",
+                 mtu_override: Optional[int] = None,
+                 max_packet_size: Optional[int] = None,
+                 queue_size: int = settings.default_queue_size,
+                 transport: Optional[BTTransport] = None,
+                 pacer: Optional[BTPacer] = None,
+                 retry_policy: Optional[BTRetryPolicy] = None,
+                 adapter: Optional[str] = None,
+                 command_cache: Optional[GYWCommandCache] = None,
+                 track_display_state: bool = False):
         """
         Initialize a new instance of the `BTDevice` class.
 
         :param device: The underlying `bleak` object that is used to communicate with the device or the MAC address of the device.
         :type device: `BLEDevice` or str
+        :param mtu_override: An MTU to use instead of the one negotiated on connection. Defaults to None.
+        :type mtu_override: int or None
+        :param max_packet_size: An upper bound (in bytes) on the size of the packets written to the device. Defaults to None.
+        :type max_packet_size: int or None
+        :param queue_size: The maximum number of drawings waiting to be sent. Defaults to `settings.default_queue_size`.
+        :type queue_size: int
+        :param transport: The link used to exchange data with the device. Defaults to a `BleakTransport`.
+        :type transport: `BTTransport` or None
+        :param pacer: The controller spacing the packets. Defaults to an adaptive `BTPacer`.
+        :type pacer: `BTPacer` or None
+        :param retry_policy: How transient errors are retried before disconnecting. Defaults to None (no retry).
+        :type retry_policy: `BTRetryPolicy` or None
+        :param adapter: The Bluetooth adapter used by the default `BleakTransport` (e.g. "hci1"). Defaults to None.
+        :type adapter: str or None
+        :param command_cache: The cache of the commands of the drawings. Defaults to None (the cache shared by all the
+            devices, `cache.command_cache`). A cache of size 0 disables caching.
+        :type command_cache: `GYWCommandCache` or None
+        :param track_display_state: Whether to track the font, size and colors last sent to the display, and omit them
+            from the next commands that use the same ones. Defaults to False.
+        :type track_display_state: bool
 
         """
 
         self.device = device
-        self.client: BleakClient = None
+        self.transport = transport if transport is not None else BleakTransport(device, adapter=adapter)
+        self.mtu_override = mtu_override
+        self.max_packet_size = max_packet_size
+        self.stats = BTDeviceStats()
+        self.writer = BTWriter(self.__transmit, queue_size, self.stats)
+        self.pacer = pacer if pacer is not None else BTPacer()
+        self.retry_policy = retry_policy
+        self.supervisor: Optional[BTSupervisor] = None
+        self.command_cache = command_cache if command_cache is not None else cache.command_cache
+        self.display_state = BTDisplayState() if track_display_state else None
+        # Last clear and drawings sent since, replayed by the supervisor after a reconnection
+        self.__clear_commands: "Optional[list[commands.BTCommand]]" = None
+        self.__screen_commands: "deque[list[commands.BTCommand]]" = deque(maxlen=settings.screen_history_size)
+        # Streams of each characteristic subscribed through `notifications`, restored after a reconnection
+        self.__subscribers: Dict[str, Set[BTNotificationStream]] = {}
+        # Held while the link is in use by the writer, a probe or the supervisor restoring the screen
+        self.__link_lock: Optional[asyncio.Lock] = None
 
     def __str__(self) -> str:
-        return self.device
+        return self.address
 
     def __repr__(self) -> str:
         return self.__str__()
 
+    @property
+    def address(self) -> str:
+        """The MAC address of the device."""
+
+        return self.device if isinstance(self.device, str) else self.device.address
+
+    @property
+    def client(self) -> Optional[BleakClient]:
+        """The `BleakClient` of the current connection, or None if disconnected or not using a `BleakTransport`."""
+
+        return self.transport.client if isinstance(self.transport, BleakTransport) else None
+
+    @property
+    def mtu(self) -> Optional[int]:
+        """The ATT MTU negotiated for the current connection, or None if it is unknown."""
+
+        return self.transport.mtu if self.transport.is_connected else None
+
+    @property
+    def packet_size(self) -> int:
+        """
+        The number of bytes sent in each GATT write.
+
+        It is derived from the MTU (the override if any, the negotiated one otherwise) minus the ATT header,
+        capped by `max_packet_size`. When the MTU is unknown, `settings.default_packet_size` is used.
+
+        :return: The size (in bytes) of the packets.
+        :rtype: int
+
+        """
+
+        mtu = self.mtu_override if self.mtu_override is not None else self.mtu
+        if mtu is None:
+            size = settings.default_packet_size
+        else:
+            size = max(mtu - settings.att_header_size, settings.default_packet_size)
+
+        if self.max_packet_size is not None:
+            size = min(size, self.max_packet_size)
+
+        return max(size, 1)
+
     async def start_notify(self, char_uuid_for_notifications, handler):
-        if self.client is not None and self.client.is_connected:
+        if self.transport.is_connected:
             logger.debug(f"Listening for notifications on UUID: {char_uuid_for_notifications}...")
-            await self.client.start_notify(char_uuid_for_notifications, handler)
+            await self.transport.start_notify(char_uuid_for_notifications, handler)
         else:
             logger.warning("Client not connected or not available.")
 
     async def stop_notify(self, char_uuid):
-        if self.client is not None and self.client.is_connected:
-            await self.client.stop_notify(char_uuid)
+        if self.transport.is_connected:
+            await self.transport.stop_notify(char_uuid)
         else:
             logger.warning("Client not connected or not available.")
 
+    def notifications(self,
+                      char_uuid: str,
+                      capacity: int = settings.notification_buffer_size,
+                      policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST) -> BTNotificationStream:
+        """
+        Receive the notifications of a characteristic as an asynchronous iterator.
+
+        Each call returns an independent stream with a buffer of its own: several subscribers can read the same
+        characteristic. The characteristic is subscribed when the first stream starts and unsubscribed when the last
+        one is closed. The subscriptions are restored after a reconnection, and the streams end when the device is
+        disconnected.
+
+        :param char_uuid: The UUID of the characteristic.
+        :type char_uuid: str
+        :param capacity: The maximum number of notifications buffered. Defaults to `settings.notification_buffer_size`.
+        :type capacity: int
+        :param policy: What to drop when the buffer is full. Defaults to `OverflowPolicy.DROP_OLDEST`.
+        :type policy: `OverflowPolicy`
+
+        :return: The stream of notifications, to be used with `async for` or `async with`.
+        :rtype: `BTNotificationStream`
+
+        """
+
+        return BTNotificationStream(char_uuid, capacity, policy, self.__subscribe, self.__unsubscribe)
+
+    async def __subscribe(self, stream: BTNotificationStream):
+        characteristic = stream.characteristic
+        streams = self.__subscribers.get(characteristic)
+        if streams is None:
+            streams = self.__subscribers[characteristic] = set()
+            if self.transport.is_connected:
+                logger.debug(f"Listening for notifications on UUID: {characteristic}...")
+                try:
+                    await self.transport.start_notify(characteristic, _notification_handler(characteristic, streams))
+                except Exception:
+                    del self.__subscribers[characteristic]
+                    raise
+        streams.add(stream)
+
+    async def __unsubscribe(self, stream: BTNotificationStream):
+        characteristic = stream.characteristic
+        streams = self.__subscribers.get(characteristic)
+        if streams is None:
+            return
+        streams.discard(stream)
+        if not streams:
+            del self.__subscribers[characteristic]
+            if self.transport.is_connected:
+                try:
+                    await self.transport.stop_notify(characteristic)
+                except Exception as e:
+                    logger.warning(f"Unable to stop the notifications of {characteristic}: {e}")
+
+    async def __restore_notifications(self):
+        for characteristic, streams in self.__subscribers.items():
+            try:
+                await self.transport.start_notify(characteristic, _notification_handler(characteristic, streams))
+            except Exception as e:
+                logger.warning(f"Unable to restore the notifications of {characteristic}: {e}")
+
     async def connect(self, loop: asyncio.AbstractEventLoop = None) -> bool:
         """
         Establish a connection with the device.
@@ -68,22 +235,20 @@ class BTDevice:
         """
 
         logger.debug(f"Connecting to {self.device}")
-        client = BleakClient(self.device, timeout=5.0, loop=loop)
-        try:
-            await client.connect()
-        except BleakDeviceNotFoundError:
-            return False
+        if isinstance(self.transport, BleakTransport):
+            self.transport.loop = loop
 
-        connected = client.is_connected
-        if connected:
-            self.client = client
-
-            # BlueZ doesn't have a proper way to get the MTU, so we have this hack.
-            # https://github.com/hbldh/bleak/blob/322346d/examples/mtu_size.py
-            if client._backend.__class__.__name__ == "BleakClientBlueZDBus":
-                await client._backend._acquire_mtu()
+        # The gap learned on the previous link does not apply to the new one.
+        self.pacer.reset()
+        if self.display_state is not None:
+            # The display may have been reset or used by another host meanwhile.
+            self.display_state.reset()
 
+        connected = await self.transport.connect()
+        if connected:
+            logger.debug(f"MTU of {self.device}: {self.mtu} (packets of {self.packet_size} bytes)")
             logger.info(f"Connection to device {self.device} succeeded")
+            await self.__restore_notifications()
         else:
             logger.warning(f"Connection to device {self.device} failed")
 
@@ -99,68 +264,540 @@ class BTDevice:
         """
 
         logger.debug(f"Disconnecting from {self.device} with address: {self.device}")
-        if not self.client:
+        if self.supervisor is not None:
+            await self.supervisor.stop()
+        await self.writer.stop()
+        for streams in self.__subscribers.values():
+            for stream in streams:
+                stream._end()
+        self.__subscribers.clear()
+        if not self.transport.is_connected:
             # No connection
             logger.warning("Already disconnected")
             return True
 
-        await self.client.disconnect()
-
-        disconnected = not self.client.is_connected
+        disconnected = await self.transport.disconnect()
         if disconnected:
-            self.client = None
             logger.info(f"Disconnection from device {self.device} succeeded")
         else:
             logger.warning(f"Disconnection from device {self.device} failed")
 
         return disconnected
 
-    async def __execute_commands(self, commands: "list[commands.BTCommand]"):
-        system = platform.system()
-        for command in commands:
-            i = 0
-            data_length = len(command.data)
-            while i < data_length:
-                await self.client.write_gatt_char(command.characteristic, command.data[i:i + 20], False)
-                if system == "Darwin":  # Darwin is the name for MacOS
-                    await asyncio.sleep(0.004)
-                i += 20
+    async def __write_command(self, command: commands.BTCommand, packet_size: int, result: BTSendResult):
+        pacer = self.pacer
+        # Packets are slices of a view over the command data, so they are never copied.
+        data = command.view()
+        i = 0
+        data_length = len(data)
+        while i < data_length:
+            packet = data[i:i + packet_size]
+            await pacer.wait()
+            try:
+                await self.transport.write(command.characteristic, packet, False)
+            except Exception:
+                pacer.on_error()
+                self.stats.write_errors += 1
+                raise
+            pacer.on_success()
+            self.stats.writes += 1
+            self.stats.bytes_sent += len(packet)
+            result.writes += 1
+            result.bytes_sent += len(packet)
+            i += packet_size
+        self.stats.commands += 1
+        result.commands += 1
+
+    async def __execute_commands(self, bt_commands: "list[commands.BTCommand]") -> BTSendResult:
+        packet_size = self.packet_size
+        state = self.display_state
+        result = BTSendResult()
+
+        # Index of the first command after the last control command fully written.
+        # The data sent before a control command is only consumed by it, so this is where a retry resumes.
+        resume_at = 0
+        while True:
+            try:
+                for index in range(resume_at, len(bt_commands)):
+                    command = bt_commands[index]
+                    if state is None:
+                        await self.__write_command(command, packet_size, result)
+                    else:
+                        shortened = state.shorten(command)
+                        await self.__write_command(shortened, packet_size, result)
+                        state.update(command)
+                        self.stats.bytes_saved += len(command.view()) - len(shortened.view())
+                    if command.characteristic == commands.GYWCharacteristics.DISPLAY_COMMAND:
+                        resume_at = index + 1
+                return result
+            except (BleakError, OSError) as e:
+                if state is not None:
+                    # A command may have been partially written.
+                    state.reset()
+                policy = self.retry_policy
+                if policy is None or result.retries >= policy.max_retries or not self.transport.is_connected:
+                    raise
+
+                result.retries += 1
+                self.stats.retries += 1
+                delay = policy.delay(result.retries)
+                logger.warning(f"Error while sending data ({e}), retry {result.retries}/{policy.max_retries} in {delay:.3f}s")
+                await asyncio.sleep(delay)
+
+    @property
+    def __link(self) -> asyncio.Lock:
+        # Created lazily, in the event loop that uses the device.
+        if self.__link_lock is None:
+            self.__link_lock = asyncio.Lock()
+        return self.__link_lock
+
+    async def __transmit(self, commands: "list[commands.BTCommand]") -> BTSendResult:
+        if self.supervisor is not None:
+            return await self.__transmit_supervised(self.supervisor, commands)
+
+        async with self.__link:
+            if not self.transport.is_connected:
+                raise exceptions.BTException("Device not connected")
+
+            try:
+                return await self.__execute_commands(commands)
+            except BleakError as e:
+                logger.error(f"Bluetooth Error while sending data: {e}")
+                await self.disconnect()
+                raise exceptions.BTException(f"BT Error: {e}")
+            except OSError as e:
+                logger.error(f"OS Error while sending data: {e}")
+                await self.disconnect()
+                raise exceptions.BTException(f"OS Error: {e}")
+
+    async def __transmit_supervised(self, supervisor: BTSupervisor, commands: "list[commands.BTCommand]") -> BTSendResult:
+        failures = 0
+        while failures < settings.supervised_send_attempts:
+            # The link is not held while waiting for it: the supervisor holds it to restore the screen.
+            generation = await supervisor.wait_connected()
+            async with self.__link:
+                if generation != supervisor.generation or not supervisor.connected:
+                    # Lost and restored again while waiting for the link.
+                    continue
+                try:
+                    result = await self.__execute_commands(commands)
+                except (BleakError, OSError) as e:
+                    logger.warning(f"Link error while sending data: {e}")
+                    failures += 1
+                    await supervisor.link_lost(generation)
+                else:
+                    # The writer sends one instruction at a time, so this is what is now on the screen.
+                    self.__record(commands)
+                    return result
+
+        raise exceptions.BTException(f"Data could not be sent after {settings.supervised_send_attempts} reconnections")
+
+    def __record(self, instruction: "list[commands.BTCommand]"):
+        control = instruction[-1] if instruction else None
+        if control is not None and control.characteristic == commands.GYWCharacteristics.DISPLAY_COMMAND:
+            data = control.view()
+            if data[0] == commands.ControlCodes.CLEAR:
+                # A clear without color reuses the last color, so the last clear with a color is what must be replayed.
+                if len(data) > 1 or self.__clear_commands is None:
+                    self.__clear_commands = instruction
+                self.__screen_commands.clear()
+                return
+
+        self.__screen_commands.append(instruction)
+
+    async def _restore_screen(self):
+        """Send again the last clear and the instructions sent since, bypassing the queue."""
+
+        async with self.__link:
+            if self.__clear_commands is not None:
+                await self.__execute_commands(self.__clear_commands)
+            for screen_commands in list(self.__screen_commands):
+                await self.__execute_commands(screen_commands)
+
+    async def submit(self,
+                     drawing: drawings.GYWDrawing,
+                     priority: Priority = Priority.NORMAL,
+                     ttl: Optional[float] = None,
+                     deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Queue a drawing to be sent by the background writer, waiting for a free slot if the queue is full.
+
+        Drawings are sent by priority, then in order. A more urgent drawing may be sent between two instructions of
+        a drawing (e.g. two lines of a `TextDrawing`), but the packets of a command are never interleaved.
+
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawing is dropped if it has not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `asyncio.Future`
+
+        """
+
+        return await self.submit_commands(self.command_cache.get(drawing), priority, ttl, deadline)
+
+    async def submit_commands(self,
+                              commands: "list[commands.BTCommand]",
+                              priority: Priority = Priority.NORMAL,
+                              ttl: Optional[float] = None,
+                              deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Queue commands already encoded to be sent by the background writer, waiting for a free slot if the queue is full.
+
+        This allows encoding a drawing once and sending it to several devices.
+
+        :param commands: The commands to send, as returned by `GYWDrawing.to_commands()`.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the commands are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the commands are dropped if they have
+            not been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the commands have been sent or have expired,
+            or with a `BTException` if they could not be sent.
+        :rtype: `asyncio.Future`
+
+        """
+
+        return await self.writer.put(commands, priority, self.__deadline(ttl, deadline))
+
+    async def send_commands(self,
+                            commands: "list[commands.BTCommand]",
+                            priority: Priority = Priority.NORMAL,
+                            ttl: Optional[float] = None,
+                            deadline: Optional[float] = None) -> BTSendResult:
+        """
+        Send commands already encoded to the device.
+
+        :param commands: The commands to send, as returned by `GYWDrawing.to_commands()`.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the commands are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the commands are dropped if they have
+            not been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: The outcome of the transmission. Its status is `SendStatus.EXPIRED` if the commands were dropped.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the commands could not be sent.
+
+        """
+
+        return await (await self.submit_commands(commands, priority, ttl, deadline))
 
-    async def send_drawing(self, drawing: drawings.GYWDrawing):
+    def submit_nowait(self,
+                      drawing: drawings.GYWDrawing,
+                      priority: Priority = Priority.NORMAL,
+                      ttl: Optional[float] = None,
+                      deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Queue a drawing to be sent by the background writer without waiting.
+
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawing is dropped if it has not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `asyncio.Future`
+
+        :raises `BTException`: If the queue is full.
+
+        """
+
+        return self.writer.put_nowait(self.command_cache.get(drawing), priority, self.__deadline(ttl, deadline))
+
+    async def update(self,
+                     key: Hashable,
+                     drawing: drawings.GYWDrawing,
+                     priority: Priority = Priority.NORMAL,
+                     ttl: Optional[float] = None,
+                     deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Queue a drawing on the channel of a key, replacing the drawing of this channel that is still waiting.
+
+        This is meant for values refreshed frequently (counters, timers, sensor readouts): when the link cannot keep up,
+        only the latest drawing of each key is sent. At most one drawing per key waits in the queue, in the place of
+        the first one queued, unless its priority changed: it then waits at the end of the lane of its new priority.
+        The futures of the replaced drawings are resolved with `SendStatus.REPLACED`.
+
+        :param key: The key of the channel, e.g. "torque".
+        :type key: Hashable
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawing is dropped if it has not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent, replaced or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `asyncio.Future`
+
+        """
+
+        return await self.writer.update(key, self.command_cache.get(drawing), priority, self.__deadline(ttl, deadline))
+
+    def update_nowait(self,
+                      key: Hashable,
+                      drawing: drawings.GYWDrawing,
+                      priority: Priority = Priority.NORMAL,
+                      ttl: Optional[float] = None,
+                      deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Queue a drawing on the channel of a key without waiting, replacing the drawing of this channel that is still waiting.
+
+        :param key: The key of the channel, e.g. "torque".
+        :type key: Hashable
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawing is dropped if it has not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent, replaced or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `asyncio.Future`
+
+        :raises `BTException`: If no drawing of this channel is waiting and the queue is full.
+
+        """
+
+        return self.writer.update_nowait(key, self.command_cache.get(drawing), priority, self.__deadline(ttl, deadline))
+
+    @staticmethod
+    def __deadline(ttl: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        if ttl is not None:
+            expires_at = asyncio.get_running_loop().time() + ttl
+            deadline = expires_at if deadline is None else min(deadline, expires_at)
+        return deadline
+
+    async def flush(self):
+        """Wait until all the queued drawings have been processed."""
+
+        await self.writer.join()
+
+    async def send_drawing(self,
+                           drawing: drawings.GYWDrawing,
+                           priority: Priority = Priority.NORMAL,
+                           ttl: Optional[float] = None,
+                           deadline: Optional[float] = None) -> BTSendResult:
         """
         Send and display a drawing on the device.
 
         :param drawing:The drawing to show on the screen.
         :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawing is dropped if it has not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: The outcome of the transmission. Its status is `SendStatus.EXPIRED` if the drawing was dropped.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the drawing could not be sent.
 
         """
 
-        commands = drawing.to_commands()
+        return await (await self.submit(drawing, priority, ttl, deadline))
 
-        try:
-            await self.__execute_commands(commands)
-        except BleakError as e:
-            logger.error(f"Bluetooth Error while sending data: {e}")
-            await self.disconnect()
-            raise exceptions.BTException(f"BT Error: {e}")
-        except OSError as e:
-            logger.error(f"OS Error while sending data: {e}")
-            await self.disconnect()
-            raise exceptions.BTException(f"OS Error: {e}")
-
-    async def send_drawings(self, drawings: "list[drawings.GYWDrawing]"):
+    async def send_drawings(self,
+                            drawings: "list[drawings.GYWDrawing]",
+                            priority: Priority = Priority.NORMAL,
+                            ttl: Optional[float] = None,
+                            deadline: Optional[float] = None) -> "list[BTSendResult]":
         """
         Send and display several drawings consecutively on the device.
 
         :param drawings: The list of drawings to show.
         :type drawings: `list[drawings.GYWDrawing]`
+        :param priority: The priority of the drawings. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawings are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param deadline: The loop time (as returned by `loop.time()`) after which the drawings are dropped if they have not
+            been sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: The outcome of the transmission of each drawing.
+        :rtype: `list[BTSendResult]`
+
+        :raises `BTException`: If a drawing could not be sent.
+
+        """
+
+        # The deadline is computed once so that all the drawings expire together.
+        deadline = self.__deadline(ttl, deadline)
+        futures = [await self.submit(drawing, priority, deadline=deadline) for drawing in drawings]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return results
+
+    async def probe(self,
+                    rtt_samples: int = 20,
+                    chunk_sizes: "Optional[list[int]]" = None,
+                    packets: int = 20,
+                    characteristic: str = commands.GYWCharacteristics.DISPLAY_DATA) -> BTProbeResult:
+        """
+        Measure the round-trip time and the sustained throughput of the link with the device.
+
+        The probe waits for the drawing being sent, if any, and holds the link until it is done: queued drawings are
+        sent afterwards. Nothing is displayed. See `probe.probe_link` for the details of the measures.
+
+        :param rtt_samples: The number of writes with response timed. Defaults to 20.
+        :type rtt_samples: int
+        :param chunk_sizes: The sizes (in bytes) of the chunks written without response, at most `packet_size`.
+            Defaults to None (20 bytes, half the packet size and the packet size).
+        :type chunk_sizes: `list[int]` or None
+        :param packets: The number of chunks written for each size. Defaults to 20.
+        :type packets: int
+        :param characteristic: The UUID of the characteristic written. Defaults to `GYWCharacteristics.DISPLAY_DATA`.
+        :type characteristic: str
+
+        :return: The measures: percentiles of the round-trip time, throughput per chunk size and effective MTU.
+        :rtype: `BTProbeResult`
+
+        :raises `BTException`: If the device is not connected or the link failed during the probe.
 
         """
 
-        for drawing in drawings:
-            await self.send_drawing(drawing)
+        async with self.__link:
+            if not self.transport.is_connected:
+                raise exceptions.BTException("Device not connected")
+            try:
+                return await probe_link(self.transport, self.packet_size, characteristic, rtt_samples, chunk_sizes, packets)
+            except (BleakError, OSError) as e:
+                raise exceptions.BTException(f"Probe failed: {e}") from e
+            finally:
+                if self.display_state is not None:
+                    # The probe data is consumed by a text command of its own.
+                    self.display_state.reset()
+
+    async def stream(self,
+                     drawings: "Union[AsyncIterable[drawings.GYWDrawing], Iterable[drawings.GYWDrawing]]",
+                     prefetch: int = settings.stream_prefetch,
+                     priority: Priority = Priority.NORMAL,
+                     ttl: Optional[float] = None) -> AsyncIterator[BTStreamItem]:
+        """
+        Send drawings as they are produced by a source, such as a message feed or a database cursor.
+
+        While a drawing is being sent, the next ones are taken from the source, encoded and queued, up to `prefetch`
+        drawings ahead, so that producing and encoding them overlaps with the radio time. The outcome of each drawing
+        is yielded in order once it has been sent. The source is not read further ahead while the outcomes are not
+        consumed.
+
+        :param drawings: The source of the drawings, asynchronous or not.
+        :type drawings: `AsyncIterable[drawings.GYWDrawing]` or `Iterable[drawings.GYWDrawing]`
+        :param prefetch: The maximum number of drawings taken from the source and not sent yet. Defaults to
+            `settings.stream_prefetch`.
+        :type prefetch: int
+        :param priority: The priority of the drawings. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which a drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: An asynchronous iterator over the outcome of each drawing, with its latency.
+        :rtype: `AsyncIterator[BTStreamItem]`
 
-    async def clear_screen(self, color: Optional[Color] = None):
+        :raises `BTException`: If a drawing could not be sent. The drawings already queued are still sent.
+
+        """
+
+        assert prefetch > 0
+
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(prefetch)
+        queued: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                if isinstance(drawings, AsyncIterable):
+                    source = drawings
+                else:
+                    async def source_of(iterable):
+                        for drawing in iterable:
+                            yield drawing
+                    source = source_of(drawings)
+
+                index = 0
+                async for drawing in source:
+                    await slots.acquire()
+                    started_at = loop.time()
+                    future = await self.submit(drawing, priority, ttl)
+                    finished_at = []
+                    future.add_done_callback(lambda _, finished_at=finished_at: finished_at.append(loop.time()))
+                    queued.put_nowait((index, drawing, started_at, finished_at, future))
+                    index += 1
+                queued.put_nowait(None)
+            except Exception as e:
+                queued.put_nowait(e)
+
+        producer = loop.create_task(produce())
+        try:
+            while True:
+                entry = await queued.get()
+                if entry is None:
+                    break
+                if isinstance(entry, Exception):
+                    raise entry
+
+                index, drawing, started_at, finished_at, future = entry
+                try:
+                    result = await future
+                finally:
+                    slots.release()
+                sent_at = finished_at[0] if finished_at else loop.time()
+                yield BTStreamItem(index, drawing, result, sent_at - started_at)
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+            # Nobody waits for the drawings left behind: their errors are only logged.
+            def log_error(future: asyncio.Future):
+                if not future.cancelled() and future.exception() is not None:
+                    logger.warning(f"Drawing of the stream not sent to {self}: {future.exception()}")
+
+            while not queued.empty():
+                entry = queued.get_nowait()
+                if isinstance(entry, tuple):
+                    entry[-1].add_done_callback(log_error)
+
+    async def clear_screen(self, color: Optional[Color] = None, priority: Priority = Priority.NORMAL) -> BTSendResult:
         """
         Reset what is displayed.
 
@@ -169,16 +806,18 @@ class BTDevice:
 
         :param color: The color to use to clear the screen. Defaults to None.
         :type color: Color or None
+        :param priority: The priority of the clear. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
 
-        """
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
 
-        ctrl_bytes = bytearray([commands.ControlCodes.CLEAR])
-        if color:
-            ctrl_bytes += color.to_rgba8888_bytes()
+        """
 
-        await self.__execute_commands([
+        clear_commands = [
             commands.BTCommand(
                 commands.GYWCharacteristics.DISPLAY_COMMAND,
-                ctrl_bytes,
+                encoders.encode_clear(color),
             ),
-        ])
+        ]
+        return await (await self.writer.put(clear_commands, priority))
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import commands
+from .device import BTDevice
+from .writer import BTSendResult, Priority, SendStatus
+from ..layout import cache, drawings
+from ..layout.color import Color
+
+logger = logging.getLogger(__name__)
+
+
+class BTBroadcastResult:
+    """
+    The outcome of a broadcast on one device.
+
+    Attributes:
+        device: The device.
+        result: The outcome of the transmission, or None if it failed.
+        error: The exception raised by the transmission, or None if it succeeded.
+        latency: The time (in seconds) between the start of the broadcast and the end of the transmission.
+
+    """
+
+    def __init__(self,
+                 device: BTDevice,
+                 result: Optional[BTSendResult] = None,
+                 error: Optional[BaseException] = None,
+                 latency: float = 0.0):
+        self.device = device
+        self.result = result
+        self.error = error
+        self.latency = latency
+
+    def __str__(self) -> str:
+        outcome = self.result if self.error is None else f"Error: {self.error}"
+        return f"{self.device}: {outcome} in {self.latency * 1000:.1f} ms"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def ok(self) -> bool:
+        """Whether the drawing was sent to the device."""
+
+        return self.error is None and self.result is not None and self.result.status == SendStatus.SENT
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "device": str(self.device),
+            "result": self.result.to_json() if self.result is not None else None,
+            "error": str(self.error) if self.error is not None else None,
+            "latency": self.latency,
+        }
+
+
+class BTBroadcastReport:
+    """
+    The outcome of a broadcast on every device of a fleet.
+
+    Attributes:
+        results: The outcome on each device.
+        duration: The time (in seconds) taken by the whole broadcast.
+
+    """
+
+    def __init__(self, results: List[BTBroadcastResult], duration: float):
+        self.results = results
+        self.duration = duration
+
+    def __str__(self) -> str:
+        return f"Sent to {len(self.succeeded)}/{len(self.results)} devices in {self.duration * 1000:.1f} ms"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def succeeded(self) -> List[BTBroadcastResult]:
+        """The outcome on the devices that received the drawing."""
+
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[BTBroadcastResult]:
+        """The outcome on the devices that did not receive the drawing."""
+
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def max_latency(self) -> float:
+        """The highest latency among the devices."""
+
+        return max((result.latency for result in self.results), default=0.0)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "duration": self.duration,
+            "results": [result.to_json() for result in self.results],
+        }
+
+
+class BTFleet:
+    """
+    A group of devices displaying the same drawings.
+
+    A drawing broadcast to the fleet is encoded once and the same commands are sent to every connected device
+    concurrently. An error on one device does not affect the others.
+
+    Attributes:
+        devices: The devices of the fleet.
+        concurrency: The maximum number of devices sent to at the same time.
+        timeout: The maximum time (in seconds) given to each device, or None.
+
+    """
+
+    def __init__(self, devices: Iterable[BTDevice], concurrency: int = 8, timeout: Optional[float] = None):
+        """
+        Initialize a new instance of the `BTFleet` class.
+
+        :param devices: The devices of the fleet, e.g. `BTManager.devices`.
+        :type devices: `list[BTDevice]`
+        :param concurrency: The maximum number of devices sent to at the same time. Defaults to 8.
+        :type concurrency: int
+        :param timeout: The maximum time (in seconds) given to each device. Defaults to None (no limit).
+        :type timeout: float or None
+
+        """
+
+        assert concurrency > 0
+
+        self.devices = list(devices)
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def __str__(self) -> str:
+        return f"Fleet of {len(self.devices)} devices"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def connected_devices(self) -> List[BTDevice]:
+        """The devices able to receive drawings: the connected and the supervised ones."""
+
+        return [device for device in self.devices if device.transport.is_connected or device.supervisor is not None]
+
+    async def broadcast(self,
+                        drawing: drawings.GYWDrawing,
+                        priority: Priority = Priority.NORMAL,
+                        ttl: Optional[float] = None) -> BTBroadcastReport:
+        """
+        Send a drawing to every connected device.
+
+        :param drawing: The drawing to show on the screens.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome on each device.
+        :rtype: `BTBroadcastReport`
+
+        """
+
+        return await self.broadcast_commands(cache.command_cache.get(drawing), priority, ttl)
+
+    async def broadcast_commands(self,
+                                 commands: "list[commands.BTCommand]",
+                                 priority: Priority = Priority.NORMAL,
+                                 ttl: Optional[float] = None) -> BTBroadcastReport:
+        """
+        Send commands already encoded to every connected device.
+
+        The commands are shared by all the devices: they are neither copied nor encoded again.
+
+        :param commands: The commands to send.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the commands are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome on each device.
+        :rtype: `BTBroadcastReport`
+
+        """
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ttl if ttl is not None else None
+        return await self.__run(lambda device: device.send_commands(commands, priority, deadline=deadline))
+
+    async def clear_screen(self, color: Optional[Color] = None, priority: Priority = Priority.NORMAL) -> BTBroadcastReport:
+        """
+        Clear the screen of every connected device.
+
+        :param color: The color to use to clear the screens. Defaults to None.
+        :type color: Color or None
+        :param priority: The priority of the clear. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+
+        :return: The outcome on each device.
+        :rtype: `BTBroadcastReport`
+
+        """
+
+        return await self.__run(lambda device: device.clear_screen(color, priority))
+
+    async def __run(self, send) -> BTBroadcastReport:
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started_at = loop.time()
+
+        async def send_to(device: BTDevice) -> BTBroadcastResult:
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(send(device), self.timeout)
+                except Exception as e:
+                    logger.warning(f"Broadcast to {device} failed: {e!r}")
+                    return BTBroadcastResult(device, error=e, latency=loop.time() - started_at)
+
+                return BTBroadcastResult(device, result=result, latency=loop.time() - started_at)
+
+        results = await asyncio.gather(*(send_to(device) for device in self.connected_devices))
+        return BTBroadcastReport(list(results), loop.time() - started_at)
@@ -1,15 +1,113 @@
 from bleak import BleakScanner
+from bleak.backends.device import BLEDevice
+import asyncio
 import logging
 import os
 import platform
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
 
 from .exceptions import BTException
 from .device import BTDevice
+from .fleet import BTFleet
+from .registry import BTRegistry
+from .retry import BTRetryPolicy
+from .transport import BleakTransport
 from . import settings
 
 logger = logging.getLogger(__name__)
 
 
+class BTConnectResult:
+    """
+    The outcome of the connection to one device.
+
+    Attributes:
+        device: The device.
+        connected: Whether the device is connected.
+        attempts: The number of connection attempts.
+        latency: The time (in seconds) between the first attempt and the outcome, retries included.
+        error: The exception raised by the last attempt, or None.
+
+    """
+
+    def __init__(self,
+                 device: BTDevice,
+                 connected: bool,
+                 attempts: int,
+                 latency: float,
+                 error: Optional[BaseException] = None):
+        self.device = device
+        self.connected = connected
+        self.attempts = attempts
+        self.latency = latency
+        self.error = error
+
+    def __str__(self) -> str:
+        outcome = "Connected" if self.connected else f"Failed ({self.error})" if self.error else "Failed"
+        return f"{self.device}: {outcome} after {self.attempts} attempts in {self.latency * 1000:.1f} ms"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "device": str(self.device),
+            "connected": self.connected,
+            "attempts": self.attempts,
+            "latency": self.latency,
+            "error": str(self.error) if self.error is not None else None,
+        }
+
+
+class BTConnectReport:
+    """
+    The outcome of the connection to several devices.
+
+    Attributes:
+        results: The outcome for each device.
+        duration: The time (in seconds) taken to connect all the devices.
+
+    """
+
+    def __init__(self, results: List[BTConnectResult], duration: float):
+        self.results = results
+        self.duration = duration
+
+    def __str__(self) -> str:
+        return f"Connected {len(self.connected)}/{len(self.results)} devices in {self.duration * 1000:.1f} ms"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def connected(self) -> List[BTDevice]:
+        """The devices that are connected."""
+
+        return [result.device for result in self.results if result.connected]
+
+    @property
+    def failed(self) -> List[BTConnectResult]:
+        """The outcome for the devices that could not be connected."""
+
+        return [result for result in self.results if not result.connected]
+
+    @property
+    def max_latency(self) -> float:
+        """The highest latency among the devices."""
+
+        return max((result.latency for result in self.results), default=0.0)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "duration": self.duration,
+            "results": [result.to_json() for result in self.results],
+        }
+
+
 class BTManager:
     """
     A class to manage Bluetooth Low Energy (BLE) devices and their connections.
@@ -17,14 +115,133 @@ class BTManager:
     Attributes:
         devices: A list of `BTDevice` objects representing devices that have been discovered.
         is_scanning: A flag indicating whether a scan is currently in progress.
+        adapter: The Bluetooth adapter used to scan and connect, or None for the default one.
 
     """
 
-    def __init__(self):
-        """Initialize a new instance of the `BTManager` class."""
+    def __init__(self, adapter: Optional[str] = None, registry_path: Optional[str] = None):
+        """
+        Initialize a new instance of the `BTManager` class.
+
+        :param adapter: The Bluetooth adapter used to scan and connect (e.g. "hci1"). Only supported by BlueZ.
+            Defaults to None (the default adapter).
+        :type adapter: str or None
+        :param registry_path: The path of the registry of the devices seen in the past. Defaults to None
+            (devices.json in the local storage of the library).
+        :type registry_path: str or None
+
+        """
 
         self.devices: "list[BTDevice]" = []
         self.is_scanning: bool = False
+        self.adapter = adapter
+        self.__registry_path = registry_path
+        self.__registry: Optional[BTRegistry] = None
+
+    @property
+    def registry(self) -> BTRegistry:
+        """The devices seen in the past, loaded from the local file system on first use."""
+
+        if self.__registry is None:
+            path = self.__registry_path
+            if path is None:
+                path = os.path.join(self.__get_device_local_storage(), "devices.json")
+            self.__registry = BTRegistry(path)
+            if not self.__registry.load():
+                self.__import_legacy_storage()
+        return self.__registry
+
+    def __import_legacy_storage(self):
+        # Versions up to 2.0.3 only stored addresses, one per line, in devices.txt.
+        legacy_path = os.path.join(os.path.dirname(self.__registry.path), "devices.txt")
+        if not os.path.exists(legacy_path):
+            return
+
+        with open(legacy_path, "r") as f:
+            addresses = [line.strip() for line in f.read().split("\n")]
+        for address in addresses:
+            if address:
+                self.__registry.record(address)
+
+    def __record(self, device: BTDevice, rssi: Optional[int] = None):
+        name = getattr(device.device, "name", None)
+        adapter = getattr(device.transport, "adapter", None)
+        self.registry.record(device.address, name=name, rssi=rssi, mtu=device.mtu, adapter=adapter)
+
+    def fleet(self, concurrency: int = 8, timeout: Optional[float] = None) -> BTFleet:
+        """
+        Group the devices currently known by the manager in a fleet, to send them the same drawings.
+
+        :param concurrency: The maximum number of devices sent to at the same time. Defaults to 8.
+        :type concurrency: int
+        :param timeout: The maximum time (in seconds) given to each device. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The fleet of devices.
+        :rtype: `BTFleet`
+
+        """
+
+        return BTFleet(self.devices, concurrency=concurrency, timeout=timeout)
+
+    async def connect_all(self,
+                          devices: Optional[Iterable[BTDevice]] = None,
+                          concurrency: int = settings.connect_concurrency,
+                          retry_policy: Optional[BTRetryPolicy] = None) -> BTConnectReport:
+        """
+        Connect several devices concurrently.
+
+        At most `concurrency` connections are attempted at the same time: BlueZ fails when too many connections are
+        pending. A device that could not be connected releases its slot while waiting before its next attempt.
+
+        :param devices: The devices to connect. Defaults to None (the devices of the manager).
+        :type devices: `list[BTDevice]` or None
+        :param concurrency: The maximum number of connections attempted at the same time. Defaults to
+            `settings.connect_concurrency`.
+        :type concurrency: int
+        :param retry_policy: How failed connections are retried. Defaults to None (2 retries after 0.5 and 1 second).
+        :type retry_policy: `BTRetryPolicy` or None
+
+        :return: The outcome for each device.
+        :rtype: `BTConnectReport`
+
+        """
+
+        assert concurrency > 0
+
+        devices = list(devices) if devices is not None else list(self.devices)
+        if retry_policy is None:
+            retry_policy = BTRetryPolicy(max_retries=2, backoff=0.5, max_backoff=5.0)
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        started_at = loop.time()
+
+        async def connect(device: BTDevice) -> BTConnectResult:
+            attempts = 0
+            error = None
+            first_attempt_at = None
+            while True:
+                async with semaphore:
+                    if first_attempt_at is None:
+                        first_attempt_at = loop.time()
+                    attempts += 1
+                    try:
+                        connected = device.transport.is_connected or await device.connect()
+                        error = None
+                    except Exception as e:
+                        logger.warning(f"Connection to device {device} failed: {e!r}")
+                        connected = False
+                        error = e
+
+                if connected or attempts > retry_policy.max_retries:
+                    return BTConnectResult(device, connected, attempts, loop.time() - first_attempt_at, error)
+                await asyncio.sleep(retry_policy.delay(attempts))
+
+        results = await asyncio.gather(*(connect(device) for device in devices))
+        report = BTConnectReport(list(results), loop.time() - started_at)
+        logger.info(str(report))
+        return report
 
     def __get_device_local_storage(self):
         system = platform.system()
@@ -58,41 +275,231 @@ class BTManager:
         self.is_scanning = True
         logger.debug("Scanning for BLE devices...")
 
-        device_local_storage = self.__get_device_local_storage()
         try:
-            devices = await BleakScanner.discover(timeout=timeout)
+            kwargs = {"adapter": self.adapter} if self.adapter is not None else {}
+            discovered = await BleakScanner.discover(timeout=timeout, return_adv=True, **kwargs)
             self.devices = []
-            for device in devices:
-                if not filter or device.name in settings.device_names:
-                    logger.debug(f"BLE device {device.name} found! Address: {device.address}")
-                    self.devices.append(BTDevice(device))
-
-            if store:
-                if not os.path.exists(device_local_storage):
-                    os.makedirs(device_local_storage)
+            for device, advertisement_data in discovered.values():
+                name = device.name or advertisement_data.local_name
+                if not filter or name in settings.device_names:
+                    logger.debug(f"BLE device {name} found! Address: {device.address}")
+                    bt_device = BTDevice(device, adapter=self.adapter)
+                    self.devices.append(bt_device)
+                    if store:
+                        self.__record(bt_device, advertisement_data.rssi)
 
-                with open(os.path.join(device_local_storage, "devices.txt"), "w") as f:
-                    f.write("\n".join(device.address))
+            if store and self.devices:
+                self.registry.save()
 
             if not self.devices:
                 logger.warning("No BLE device found found...")
         finally:
             self.is_scanning = False
 
+    async def stream_devices(self,
+                             filter: bool = True,
+                             timeout: Optional[float] = 3.0,
+                             store: bool = True) -> AsyncIterator[BTDevice]:
+        """
+        Scan for BLE devices and yield each one as soon as its first advertisement is received.
+
+        Unlike `scan_devices`, the caller does not wait for the end of the scan: breaking out of the iteration stops
+        the scan. The devices found are added to `devices`. A device already in `devices` is yielded again, refreshed
+        with its new advertisement unless it is connected.
+
+        :param filter: A flag indicating whether to filter discovered devices by their names. Defaults to True.
+        :type filter: bool
+        :param timeout: The maximum duration (in seconds) of the scan. Defaults to 3.0. None scans until the iteration stops.
+        :type timeout: float or None
+        :param store: A flag indicating whether to add the discovered devices to the registry. Defaults to True.
+        :type store: bool
+
+        :return: An asynchronous iterator over the discovered devices.
+        :rtype: `AsyncIterator[BTDevice]`
+
+        :raises `BTException`: If a scan is already in progress.
+
+        """
+
+        if self.is_scanning:
+            raise BTException("A scan is already in progress")
+
+        self.is_scanning = True
+        logger.debug("Streaming BLE devices...")
+
+        found: "asyncio.Queue[tuple[BLEDevice, int]]" = asyncio.Queue()
+        known = {device.address.upper(): device for device in self.devices}
+        seen = set()
+
+        def on_detection(device, advertisement_data):
+            if device.address in seen:
+                return
+            name = device.name or advertisement_data.local_name
+            if not filter or name in settings.device_names:
+                seen.add(device.address)
+                found.put_nowait((device, advertisement_data.rssi))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        kwargs = {"adapter": self.adapter} if self.adapter is not None else {}
+        scanner = BleakScanner(detection_callback=on_detection, **kwargs)
+        started = False
+        try:
+            await scanner.start()
+            started = True
+            while True:
+                remaining = deadline - loop.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    device, rssi = await asyncio.wait_for(found.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+                logger.debug(f"BLE device {device.name} found! Address: {device.address}")
+                bt_device = known.get(device.address.upper())
+                if bt_device is None:
+                    bt_device = BTDevice(device, adapter=self.adapter)
+                    known[device.address.upper()] = bt_device
+                    self.devices.append(bt_device)
+                elif not bt_device.transport.is_connected:
+                    # A device known by its address alone connects faster from its fresh advertisement.
+                    bt_device.device = device
+                    if isinstance(bt_device.transport, BleakTransport):
+                        bt_device.transport.device = device
+                if store:
+                    self.__record(bt_device, rssi)
+                yield bt_device
+        finally:
+            try:
+                if started:
+                    await scanner.stop()
+            finally:
+                self.is_scanning = False
+            if store and seen:
+                self.registry.save()
+
+    async def find(self,
+                   target: Union[str, Callable[[BTDevice], bool]],
+                   filter: bool = True,
+                   timeout: Optional[float] = 10.0,
+                   store: bool = True) -> Optional[BTDevice]:
+        """
+        Scan until a given device is found.
+
+        The scan stops as soon as an advertisement of the device is received.
+
+        :param target: The MAC address of the device, or a function returning True for the wanted device.
+        :type target: str or callable
+        :param filter: A flag indicating whether to filter discovered devices by their names. Defaults to True.
+        :type filter: bool
+        :param timeout: The maximum duration (in seconds) of the scan. Defaults to 10.0.
+        :type timeout: float or None
+        :param store: A flag indicating whether to add the discovered devices to the registry. Defaults to True.
+        :type store: bool
+
+        :return: The device, or None if it was not found before the timeout.
+        :rtype: `BTDevice` or None
+
+        :raises `BTException`: If a scan is already in progress.
+
+        """
+
+        if isinstance(target, str):
+            address = target.upper()
+
+            def match(device: BTDevice) -> bool:
+                return device.address.upper() == address
+        else:
+            match = target
+
+        devices = self.stream_devices(filter=filter, timeout=timeout, store=store)
+        try:
+            async for device in devices:
+                if match(device):
+                    return device
+        finally:
+            await devices.aclose()
+
+        logger.warning(f"Device {target} not found")
+        return None
+
     async def pull_devices(self):
-        """Load previously saved device information from the local file system."""
+        """Load the devices of the registry, most recently seen first."""
 
         logger.debug("Pulling devices...")
         self.devices = []
 
-        device_local_storage = os.path.join(self.__get_device_local_storage(), "devices.txt")
-
-        if not os.path.exists(device_local_storage):
+        if not self.registry.entries:
             logger.error("Device local storage not setup")
             return
 
-        with open(device_local_storage, "r") as f:
-            devices = f.read().split("\n")
-            for device in devices:
-                self.devices.append(BTDevice(device))
-                logger.debug(f"{device} pulled")
+        for entry in self.registry.entries:
+            adapter = entry.adapter if entry.adapter is not None else self.adapter
+            self.devices.append(BTDevice(entry.address, adapter=adapter))
+            logger.debug(f"{entry} pulled")
+
+    async def connect_registered(self,
+                                 scan_timeout: Optional[float] = 5.0,
+                                 concurrency: int = settings.connect_concurrency) -> "list[BTDevice]":
+        """
+        Connect to the devices of the registry without scanning first.
+
+        The registered devices are connected in parallel. Only the devices that could not be reached are looked for
+        with a scan, which stops as soon as they have all advertised. The registry is updated with the MTU of each
+        connection.
+
+        :param scan_timeout: The maximum duration (in seconds) of the scan for the missed devices. Defaults to 5.0.
+            None or 0 disables the scan.
+        :type scan_timeout: float or None
+        :param concurrency: The maximum number of connections attempted at the same time. Defaults to
+            `settings.connect_concurrency`.
+        :type concurrency: int
+
+        :return: The connected devices.
+        :rtype: `list[BTDevice]`
+
+        """
+
+        await self.pull_devices()
+
+        # A registered device that is not around fails fast: it is not worth retrying before scanning.
+        no_retry = BTRetryPolicy(max_retries=0)
+        # Addresses are compared in upper case: the legacy registry may hold addresses written by hand.
+        devices = {device.address.upper(): device for device in self.devices}
+        report = await self.connect_all(devices.values(), concurrency, no_retry)
+        connected = {device.address.upper() for device in report.connected}
+        missed = set(devices) - connected
+
+        if missed and scan_timeout:
+            logger.debug(f"Scanning for {len(missed)} missed devices...")
+            found = []
+            scanned = self.stream_devices(filter=False, timeout=scan_timeout, store=False)
+            try:
+                async for device in scanned:
+                    address = device.address.upper()
+                    if address in missed:
+                        missed.discard(address)
+                        devices[address] = device
+                        found.append(device)
+                        if not missed:
+                            break
+            finally:
+                await scanned.aclose()
+            # The scan is stopped first: BlueZ connects unreliably while scanning.
+            report = await self.connect_all(found, concurrency, no_retry)
+            connected.update(device.address.upper() for device in report.connected)
+            missed = set(devices) - connected
+
+        # The scan adds every advertising device: only keep the registered ones.
+        self.devices = list(devices.values())
+        connected = [device for device in self.devices if device.address.upper() in connected]
+
+        for device in connected:
+            self.__record(device)
+        if connected:
+            self.registry.save()
+
+        if missed:
+            logger.warning(f"{len(missed)} registered devices not found: {', '.join(sorted(missed))}")
+        return connected
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from .exceptions import BTException
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What a notification stream does with a new notification when its buffer is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+class BTNotification:
+    """
+    A notification received from a device.
+
+    Attributes:
+        characteristic: The UUID of the characteristic that sent the notification.
+        data: The value of the characteristic.
+        timestamp: The time (as returned by `time.monotonic()`) at which the notification was received.
+
+    """
+
+    def __init__(self, characteristic: str, data: bytes, timestamp: float):
+        self.characteristic = characteristic
+        self.data = data
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return f"Notification from {self.characteristic}: {self.data.hex()}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class BTNotificationStream:
+    """
+    The notifications of a characteristic, buffered for one subscriber.
+
+    Notifications are stored in a ring buffer of fixed size as they arrive, without waiting for the subscriber, so
+    a slow subscriber never delays the others nor the reception. When the buffer is full, the oldest or the newest
+    notification is dropped depending on the policy, and counted in `dropped`.
+
+    The stream is an asynchronous iterator, subscribed on first use. Close it (or use it as an asynchronous context
+    manager) to unsubscribe.
+
+    Attributes:
+        characteristic: The UUID of the characteristic.
+        capacity: The maximum number of notifications waiting in the buffer.
+        policy: What to drop when the buffer is full.
+        received: The number of notifications received.
+        dropped: The number of notifications dropped because the buffer was full.
+
+    """
+
+    def __init__(self,
+                 characteristic: str,
+                 capacity: int,
+                 policy: OverflowPolicy,
+                 subscribe: Callable[["BTNotificationStream"], Awaitable[None]],
+                 unsubscribe: Callable[["BTNotificationStream"], Awaitable[None]]):
+        """
+        Initialize a new instance of the `BTNotificationStream` class. Use `BTDevice.notifications` instead.
+
+        :param characteristic: The UUID of the characteristic.
+        :type characteristic: str
+        :param capacity: The maximum number of notifications waiting in the buffer.
+        :type capacity: int
+        :param policy: What to drop when the buffer is full.
+        :type policy: `OverflowPolicy`
+        :param subscribe: Called with the stream to start receiving the notifications.
+        :type subscribe: callable
+        :param unsubscribe: Called with the stream to stop receiving the notifications.
+        :type unsubscribe: callable
+
+        """
+
+        assert capacity > 0
+
+        self.characteristic = characteristic
+        self.capacity = capacity
+        self.policy = policy
+        self.received = 0
+        self.dropped = 0
+        self.__buffer: Deque[BTNotification] = deque()
+        # One future per coroutine waiting in `get`, the oldest first
+        self.__waiters: Deque[asyncio.Future] = deque()
+        self.__subscribe = subscribe
+        self.__unsubscribe = unsubscribe
+        self.__subscribed = False
+        self.__closed = False
+
+    def __str__(self) -> str:
+        return f"Notifications from {self.characteristic} ({len(self.__buffer)}/{self.capacity}, {self.dropped} dropped)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.__buffer)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream is closed."""
+
+        return self.__closed
+
+    def _push(self, notification: BTNotification):
+        """Buffer a notification, called for each notification of the characteristic."""
+
+        if self.__closed:
+            return
+
+        self.received += 1
+        if len(self.__buffer) >= self.capacity:
+            self.dropped += 1
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                return
+            self.__buffer.popleft()
+        self.__buffer.append(notification)
+        self.__wake()
+
+    def __wake(self):
+        # Each notification wakes the coroutine waiting for the longest time.
+        for waiter in self.__waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _end(self):
+        """End the iteration once the buffered notifications are consumed."""
+
+        self.__closed = True
+        self.__subscribed = False
+        for waiter in self.__waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def start(self):
+        """Subscribe to the notifications, if not subscribed yet."""
+
+        if self.__closed:
+            raise BTException("The notification stream is closed")
+        if not self.__subscribed:
+            await self.__subscribe(self)
+            self.__subscribed = True
+
+    async def close(self):
+        """Unsubscribe from the notifications. The buffered notifications can still be read."""
+
+        if self.__closed:
+            return
+        subscribed = self.__subscribed
+        self._end()
+        if subscribed:
+            await self.__unsubscribe(self)
+
+    def get_nowait(self) -> BTNotification:
+        """
+        Take the oldest buffered notification without waiting.
+
+        :return: The notification.
+        :rtype: `BTNotification`
+
+        :raises `BTException`: If no notification is buffered.
+
+        """
+
+        if not self.__buffer:
+            raise BTException("No notification buffered")
+        return self.__buffer.popleft()
+
+    async def get(self) -> BTNotification:
+        """
+        Wait for the next notification.
+
+        Several coroutines can wait at the same time: each notification goes to one of them, the one waiting for the
+        longest time first.
+
+        :return: The notification.
+        :rtype: `BTNotification`
+
+        :raises `StopAsyncIteration`: If the stream is closed and its buffer is empty.
+
+        """
+
+        if not self.__closed:
+            await self.start()
+        while not self.__buffer:
+            if self.__closed:
+                raise StopAsyncIteration
+            waiter = asyncio.get_running_loop().create_future()
+            self.__waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                self.__waiters.remove(waiter)
+                # A getter cancelled after being woken leaves its notification to the next one.
+                if self.__buffer:
+                    self.__wake()
+        return self.__buffer.popleft()
+
+    def __aiter__(self) -> "BTNotificationStream":
+        return self
+
+    async def __anext__(self) -> BTNotification:
+        return await self.get()
+
+    async def __aenter__(self) -> "BTNotificationStream":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "characteristic": self.characteristic,
+            "capacity": self.capacity,
+            "policy": self.policy.value,
+            "buffered": len(self.__buffer),
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+
+def _notification_handler(characteristic: str, streams: "set[BTNotificationStream]") -> Callable[[Any, bytearray], None]:
+    """Build the handler passed to the transport, dispatching each notification to the streams."""
+
+    def handler(sender: Any, data: bytearray):
+        notification = BTNotification(characteristic, bytes(data), time.monotonic())
+        for stream in tuple(streams):
+            stream._push(notification)
+
+    return handler
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import platform
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PacingMode(Enum):
+    """The strategy used to space the packets written to a device."""
+
+    NONE = "none"
+    FIXED = "fixed"
+    ADAPTIVE = "adaptive"
+
+
+def platform_write_interval() -> float:
+    """Return the default time (in seconds) between two packets on the current platform."""
+
+    return settings.write_intervals.get(platform.system(), 0.0)
+
+
+class BTPacer:
+    """
+    Spaces the packets written to a device so that the Bluetooth controller buffers are not overrun.
+
+    In `PacingMode.FIXED`, a constant gap is kept between two packets. In `PacingMode.ADAPTIVE`, the gap starts from
+    `min_interval`, grows when a write fails or takes much longer than usual and shrinks back after a series of
+    normal writes. Writes without response are not acknowledged, so the gap never goes below `min_interval`.
+
+    Attributes:
+        mode: The pacing strategy.
+        interval: The current time (in seconds) kept between two packets.
+        min_interval: The lowest gap (in seconds) used in adaptive mode.
+        max_interval: The highest gap (in seconds) used in adaptive mode.
+        increases: The number of times the gap was increased.
+        decreases: The number of times the gap was decreased.
+
+    """
+
+    # Gap (in seconds) used when increasing from no gap at all
+    STEP = 0.001
+    # A write slower than this factor times the average write is a sign of congestion
+    CONGESTION_FACTOR = 4.0
+    # Number of normal writes before the gap is decreased
+    RECOVERY_WRITES = 50
+
+    def __init__(self,
+                 mode: PacingMode = PacingMode.ADAPTIVE,
+                 interval: Optional[float] = None,
+                 max_interval: float = 0.05):
+        """
+        Initialize a new instance of the `BTPacer` class.
+
+        :param mode: The pacing strategy. Defaults to `PacingMode.ADAPTIVE`.
+        :type mode: `PacingMode`
+        :param interval: The gap (in seconds) kept between two packets in fixed mode and the lowest gap in adaptive
+            mode. Defaults to the value of the platform in `settings.write_intervals`.
+        :type interval: float or None
+        :param max_interval: The highest gap (in seconds) used in adaptive mode. Defaults to 0.05.
+        :type max_interval: float
+
+        """
+
+        self.mode = PacingMode(mode)
+        self.min_interval = platform_write_interval() if interval is None else interval
+        self.max_interval = max(max_interval, self.min_interval)
+        self.interval = self.min_interval if self.mode != PacingMode.NONE else 0.0
+        self.increases = 0
+        self.decreases = 0
+        self._average_write: Optional[float] = None
+        self._normal_writes = 0
+        self._next_write_at = 0.0
+        self._write_started_at = 0.0
+
+    def __str__(self) -> str:
+        rate = self.rate
+        return f"{self.mode.value} pacing ({'unlimited' if rate is None else f'{rate:.0f} packets/s'})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def rate(self) -> Optional[float]:
+        """The maximum number of packets per second currently allowed, or None if unlimited."""
+
+        return 1.0 / self.interval if self.interval > 0 else None
+
+    async def wait(self):
+        """Wait until the next packet can be written."""
+
+        loop = asyncio.get_running_loop()
+        delay = self._next_write_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._write_started_at = loop.time()
+
+    def on_success(self):
+        """Record a packet written successfully."""
+
+        now = asyncio.get_running_loop().time()
+        self._next_write_at = now + self.interval
+        if self.mode != PacingMode.ADAPTIVE:
+            return
+
+        duration = now - self._write_started_at
+        average = self._average_write
+        if average is not None and duration > self.CONGESTION_FACTOR * average and duration > self.STEP:
+            self.__increase(1.5)
+        else:
+            self._normal_writes += 1
+            if self._normal_writes >= self.RECOVERY_WRITES:
+                self.__decrease()
+
+        self._average_write = duration if average is None else 0.9 * average + 0.1 * duration
+
+    def on_error(self):
+        """Record a packet that could not be written."""
+
+        if self.mode == PacingMode.ADAPTIVE:
+            self.__increase(2.0)
+        self._next_write_at = asyncio.get_running_loop().time() + self.interval
+
+    def reset(self):
+        """Go back to the initial gap, e.g. after a new connection."""
+
+        self.interval = self.min_interval if self.mode != PacingMode.NONE else 0.0
+        self._average_write = None
+        self._normal_writes = 0
+        self._next_write_at = 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "mode": self.mode.value,
+            "interval": self.interval,
+            "rate": self.rate,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+    def __increase(self, factor: float):
+        interval = min(max(self.interval * factor, self.STEP), self.max_interval)
+        self._normal_writes = 0
+        if interval > self.interval:
+            logger.debug(f"Increasing the gap between packets to {interval * 1000:.1f} ms")
+            self.interval = interval
+            self.increases += 1
+
+    def __decrease(self):
+        self._normal_writes = 0
+        if self.interval <= self.min_interval:
+            return
+
+        interval = self.interval * 0.8
+        self.interval = interval if interval - self.min_interval >= self.STEP / 2 else self.min_interval
+        self.decreases += 1
@@ -0,0 +1,201 @@
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from . import commands, settings
+from .transport import BTTransport
+from ..layout import encoders, fonts
+from ..layout.color import Color
+from ..layout.settings import screen_width
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class BTProbeResult:
+    """
+    The measures of the link with a device, taken by `BTDevice.probe`.
+
+    Attributes:
+        rtt_samples: The duration (in seconds) of each write with response.
+        throughputs: The sustained throughput (in bytes per second) of writes without response, per chunk size. The
+            sizes whose writes took no measurable time are left out.
+        mtu: The MTU negotiated for the connection, or None if it is unknown.
+        packet_size: The size (in bytes) of the packets used by the device.
+
+    """
+
+    def __init__(self, rtt_samples: List[float], throughputs: Dict[int, float], mtu: Optional[int], packet_size: int):
+        self.rtt_samples = rtt_samples
+        self.throughputs = throughputs
+        self.mtu = mtu
+        self.packet_size = packet_size
+
+    def __str__(self) -> str:
+        return (f"RTT {self.rtt(50) * 1000:.1f} ms (p99 {self.rtt(99) * 1000:.1f} ms), "
+                f"{self.throughput:.0f} bytes/s with chunks of {self.best_chunk_size} bytes")
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def rtt(self, percent: float) -> float:
+        """
+        Return a percentile of the round-trip times.
+
+        :param percent: The percentile, between 0 and 100 (e.g. 50 for the median).
+        :type percent: float
+
+        :return: The round-trip time (in seconds).
+        :rtype: float
+
+        """
+
+        return _percentile(self.rtt_samples, percent)
+
+    @property
+    def best_chunk_size(self) -> int:
+        """The chunk size (in bytes) that gave the highest throughput."""
+
+        return max(self.throughputs, key=self.throughputs.get) if self.throughputs else self.packet_size
+
+    @property
+    def throughput(self) -> float:
+        """The highest sustained throughput measured, in bytes per second."""
+
+        return max(self.throughputs.values(), default=0.0)
+
+    @property
+    def effective_mtu(self) -> int:
+        """The MTU (in bytes) to use for the highest throughput: the best chunk size plus the ATT header."""
+
+        return self.best_chunk_size + settings.att_header_size
+
+    @property
+    def write_interval(self) -> float:
+        """
+        The time (in seconds) taken by a packet at the highest throughput.
+
+        This is the gap to use with a `BTPacer` in `PacingMode.FIXED` to send at the measured rate.
+        """
+
+        throughput = self.throughput
+        return self.best_chunk_size / throughput if throughput > 0 else 0.0
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "rtt": {
+                "samples": len(self.rtt_samples),
+                "min": min(self.rtt_samples, default=0.0),
+                "p50": self.rtt(50),
+                "p90": self.rtt(90),
+                "p99": self.rtt(99),
+                "max": max(self.rtt_samples, default=0.0),
+            },
+            "throughputs": {str(size): throughput for size, throughput in self.throughputs.items()},
+            "throughput": self.throughput,
+            "mtu": self.mtu,
+            "packet_size": self.packet_size,
+            "effective_mtu": self.effective_mtu,
+            "write_interval": self.write_interval,
+        }
+
+
+def _discard_command() -> commands.BTCommand:
+    """Build a control command consuming the probe data without showing anything: transparent text off the screen."""
+
+    buffer = commands.BTCommandBuffer(encoders.TEXT_LAYOUT.size)
+    offset = buffer.reserve(encoders.TEXT_LAYOUT.size)
+    encoders.pack_text(buffer.buffer, offset, screen_width, 0, fonts.GYWFonts.ROBOTO_MONO, 1, Color(0, 0, 0, 0))
+    buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+    return buffer.to_commands()[0]
+
+
+async def probe_link(transport: BTTransport,
+                     packet_size: int,
+                     characteristic: str = commands.GYWCharacteristics.DISPLAY_DATA,
+                     rtt_samples: int = 20,
+                     chunk_sizes: Optional[List[int]] = None,
+                     packets: int = 20) -> BTProbeResult:
+    """
+    Measure the round-trip time and the sustained throughput of a link.
+
+    The round-trip time is the duration of a write with response. The throughput is measured by writing `packets`
+    chunks without response, followed by a write with response: as writes are processed in order, its completion means
+    that every chunk was received.
+
+    The probe writes spaces. On the data characteristic of the display, they are then consumed by a transparent text
+    drawn off the screen, so nothing is displayed and the next drawing is not affected.
+
+    :param transport: The connected transport.
+    :type transport: `BTTransport`
+    :param packet_size: The size (in bytes) of the packets used by the device.
+    :type packet_size: int
+    :param characteristic: The UUID of the characteristic written. Defaults to `GYWCharacteristics.DISPLAY_DATA`.
+    :type characteristic: str
+    :param rtt_samples: The number of writes with response. Defaults to 20.
+    :type rtt_samples: int
+    :param chunk_sizes: The sizes (in bytes) of the chunks written without response. Defaults to None (20 bytes,
+        half the packet size and the packet size).
+    :type chunk_sizes: `list[int]` or None
+    :param packets: The number of chunks written for each size. Defaults to 20.
+    :type packets: int
+
+    :return: The measures.
+    :rtype: `BTProbeResult`
+
+    """
+
+    if chunk_sizes is None:
+        chunk_sizes = sorted({settings.default_packet_size, max(packet_size // 2, 1), packet_size})
+
+    data = b" " * max(chunk_sizes + [1])
+    discard = _discard_command() if characteristic == commands.GYWCharacteristics.DISPLAY_DATA else None
+
+    async def consume():
+        if discard is not None:
+            await transport.write(discard.characteristic, discard.view(), True)
+
+    samples = []
+    try:
+        for _ in range(rtt_samples):
+            started_at = time.perf_counter()
+            await transport.write(characteristic, data[:1], True)
+            samples.append(time.perf_counter() - started_at)
+        await consume()
+
+        throughputs = {}
+        for size in chunk_sizes:
+            chunk = data[:size]
+            started_at = time.perf_counter()
+            for _ in range(packets):
+                await transport.write(characteristic, chunk, False)
+            await transport.write(characteristic, chunk, True)
+            duration = time.perf_counter() - started_at
+            if duration > 0:
+                throughputs[size] = size * (packets + 1) / duration
+            else:
+                logger.warning(f"Writes of {size} bytes too fast to be timed")
+            await consume()
+    except Exception:
+        # Do not leave probe data behind for the next drawing.
+        try:
+            await consume()
+        except Exception as e:
+            logger.debug(f"Unable to discard the probe data: {e}")
+        raise
+
+    result = BTProbeResult(samples, throughputs, transport.mtu, packet_size)
+    logger.info(f"Link probed: {result}")
+    return result
@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from .exceptions import BTException
+
+logger = logging.getLogger(__name__)
+
+
+class BTRegistryEntry:
+    """
+    What is known about a device seen in the past.
+
+    Attributes:
+        address: The MAC address of the device.
+        name: The advertised name of the device, or None.
+        last_seen: The time (as returned by `time.time()`) at which the device was last seen or connected.
+        rssi: The signal strength (in dBm) of the last advertisement, or None.
+        mtu: The MTU negotiated on the last connection, or None.
+        adapter: The adapter used to reach the device, or None for the default one.
+
+    """
+
+    def __init__(self,
+                 address: str,
+                 name: Optional[str] = None,
+                 last_seen: Optional[float] = None,
+                 rssi: Optional[int] = None,
+                 mtu: Optional[int] = None,
+                 adapter: Optional[str] = None):
+        self.address = address
+        self.name = name
+        self.last_seen = last_seen if last_seen is not None else time.time()
+        self.rssi = rssi
+        self.mtu = mtu
+        self.adapter = adapter
+
+    def __str__(self) -> str:
+        return f"{self.address} ({self.name})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "address": self.address,
+            "name": self.name,
+            "last_seen": self.last_seen,
+            "rssi": self.rssi,
+            "mtu": self.mtu,
+            "adapter": self.adapter,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "BTRegistryEntry":
+        """
+        Build an entry from a dictionary returned by `to_json`.
+
+        :param data: The dictionary.
+        :type data: dict
+
+        :return: The entry.
+        :rtype: `BTRegistryEntry`
+
+        """
+
+        return cls(
+            data["address"],
+            name=data.get("name"),
+            last_seen=data.get("last_seen"),
+            rssi=data.get("rssi"),
+            mtu=data.get("mtu"),
+            adapter=data.get("adapter"),
+        )
+
+
+class BTRegistry:
+    """
+    The devices seen in the past, stored on the local file system.
+
+    The registry is saved as a JSON file. The file is replaced atomically, so that a crash while saving never leaves
+    a truncated registry behind.
+
+    Attributes:
+        path: The path of the JSON file.
+
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize a new instance of the `BTRegistry` class.
+
+        :param path: The path of the JSON file.
+        :type path: str
+
+        """
+
+        self.path = path
+        self.__entries: Dict[str, BTRegistryEntry] = {}
+
+    def __str__(self) -> str:
+        return f"Registry of {len(self.__entries)} devices ({self.path})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __iter__(self) -> Iterator[BTRegistryEntry]:
+        return iter(list(self.__entries.values()))
+
+    def __contains__(self, address: str) -> bool:
+        return address.upper() in self.__entries
+
+    @property
+    def entries(self) -> List[BTRegistryEntry]:
+        """The entries, most recently seen first."""
+
+        return sorted(self.__entries.values(), key=lambda entry: entry.last_seen, reverse=True)
+
+    def get(self, address: str) -> Optional[BTRegistryEntry]:
+        """
+        Get the entry of a device.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        :return: The entry, or None if the device is unknown.
+        :rtype: `BTRegistryEntry` or None
+
+        """
+
+        return self.__entries.get(address.upper())
+
+    def record(self, address: str, **fields) -> BTRegistryEntry:
+        """
+        Add a device or update its entry, and mark it as seen now.
+
+        Fields set to None keep their previous value.
+
+        :param address: The MAC address of the device.
+        :type address: str
+        :param fields: The fields of `BTRegistryEntry` to update (name, rssi, mtu, adapter).
+
+        :return: The entry of the device.
+        :rtype: `BTRegistryEntry`
+
+        """
+
+        # The addresses are compared in upper case, as reported by the Bluetooth stacks.
+        address = address.upper()
+        entry = self.__entries.get(address)
+        if entry is None:
+            entry = self.__entries[address] = BTRegistryEntry(address)
+        for field, value in fields.items():
+            if not hasattr(entry, field) or field in ("address", "last_seen"):
+                raise BTException(f"Unknown registry field: {field}")
+            if value is not None:
+                setattr(entry, field, value)
+        entry.last_seen = time.time()
+        return entry
+
+    def remove(self, address: str):
+        """
+        Forget a device.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        """
+
+        self.__entries.pop(address.upper(), None)
+
+    def clear(self):
+        """Forget every device."""
+
+        self.__entries.clear()
+
+    def load(self) -> bool:
+        """
+        Load the registry from the file system, replacing the entries in memory.
+
+        :return: Whether the file exists and could be read.
+        :rtype: bool
+
+        """
+
+        self.__entries.clear()
+        if not os.path.exists(self.path):
+            return False
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            entries = [BTRegistryEntry.from_json(item) for item in data["devices"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Cannot read the registry {self.path}: {e}")
+            return False
+
+        for entry in entries:
+            entry.address = entry.address.upper()
+        self.__entries = {entry.address: entry for entry in entries}
+        return True
+
+    def save(self):
+        """Write the registry on the file system atomically."""
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        data = {"devices": [entry.to_json() for entry in self.entries]}
+        fd, temporary_path = tempfile.mkstemp(prefix=".devices-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "path": self.path,
+            "devices": [entry.to_json() for entry in self.entries],
+        }
@@ -0,0 +1,74 @@
+from typing import Any, Dict
+
+
+class BTRetryPolicy:
+    """
+    How a `BTDevice` retries a drawing after a transient Bluetooth error.
+
+    Each retry waits for an exponentially growing delay, then resumes the drawing after the last control command that
+    was fully written, so that the data of the interrupted instruction is sent again before its control command.
+
+    Attributes:
+        max_retries: The maximum number of retries for a single drawing.
+        backoff: The delay (in seconds) before the first retry.
+        backoff_factor: The factor applied to the delay after each retry.
+        max_backoff: The maximum delay (in seconds) between two retries.
+
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff: float = 0.05,
+                 backoff_factor: float = 2.0,
+                 max_backoff: float = 1.0):
+        """
+        Initialize a new instance of the `BTRetryPolicy` class.
+
+        :param max_retries: The maximum number of retries for a single drawing. Defaults to 3.
+        :type max_retries: int
+        :param backoff: The delay (in seconds) before the first retry. Defaults to 0.05.
+        :type backoff: float
+        :param backoff_factor: The factor applied to the delay after each retry. Defaults to 2.0.
+        :type backoff_factor: float
+        :param max_backoff: The maximum delay (in seconds) between two retries. Defaults to 1.0.
+        :type max_backoff: float
+
+        """
+
+        assert max_retries >= 0
+        assert backoff >= 0 and backoff_factor >= 1.0
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def __str__(self) -> str:
+        return f"Up to {self.max_retries} retries"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def delay(self, retry: int) -> float:
+        """
+        Return the time to wait before a retry.
+
+        :param retry: The number of the retry, starting at 1.
+        :type retry: int
+
+        :return: The delay (in seconds).
+        :rtype: float
+
+        """
+
+        return min(self.backoff * self.backoff_factor ** (retry - 1), self.max_backoff)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "max_retries": self.max_retries,
+            "backoff": self.backoff,
+            "backoff_factor": self.backoff_factor,
+            "max_backoff": self.max_backoff,
+        }
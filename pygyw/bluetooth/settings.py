@@ -1,2 +1,32 @@
 # Bluetooth names for the aRdent smart glasses
 device_names = ["GYWeNRG", "bluenrg!", "GYW aRdent"]
+
+# Size (in bytes) of the ATT header that is subtracted from the MTU to get the usable payload of a write
+att_header_size = 3
+
+# Size (in bytes) of the packets used when the MTU of the connection is unknown (default ATT MTU of 23 bytes)
+default_packet_size = 20
+
+# Maximum number of drawings waiting in the queue of a device
+default_queue_size = 32
+
+# Default time (in seconds) between two packets, per platform (as returned by `platform.system()`)
+write_intervals = {
+    "Darwin": 0.004,  # Darwin is the name for MacOS
+}
+
+# Maximum number of instructions sent since the last clear that a supervised device replays after a reconnection
+screen_history_size = 256
+
+# Number of times a supervised device reconnects to send the same drawing before giving up
+supervised_send_attempts = 3
+
+# Maximum number of connections attempted at the same time by `BTManager.connect_all` (BlueZ fails when too many
+# connections are pending on the same adapter)
+connect_concurrency = 4
+
+# Number of drawings of a `BTDevice.stream` encoded and queued ahead of the one being sent
+stream_prefetch = 4
+
+# Maximum number of notifications buffered for each subscriber of `BTDevice.notifications`
+notification_buffer_size = 64
@@ -0,0 +1,128 @@
+import logging
+from typing import Any, Dict, Optional
+
+from . import commands
+
+logger = logging.getLogger(__name__)
+
+# Offsets of the fields of a DRAW_TEXT command: control code, left, top, font filename, font size, RGBA color
+_TEXT_FONT = 5
+_TEXT_SIZE = 10
+_TEXT_COLOR = 11
+_TEXT_END = 15
+
+
+class BTDisplayState:
+    """
+    What the display of a device currently uses when a command omits some of its fields.
+
+    A DRAW_TEXT command without its trailing fields (color, then size, then font) uses the last ones sent, and so does
+    a CLEAR command without color. Knowing the fields last sent to a device, `shorten` drops the trailing fields that
+    it already has. Only the fields of the commands fully written are tracked, and a field is forgotten whenever it
+    is uncertain: on connection, after an error and, for the text fields, after a clear.
+
+    Attributes:
+        font: The filename of the font of the texts, or None if it is unknown.
+        size: The font size of the texts, or None if it is unknown.
+        color: The RGBA color of the texts, or None if it is unknown.
+        background: The RGBA color of the clears, or None if it is unknown.
+
+    """
+
+    def __init__(self):
+        """Initialize a new instance of the `BTDisplayState` class, where every field is unknown."""
+
+        self.reset()
+
+    def __str__(self) -> str:
+        font = self.font.decode('utf-8', 'replace') if self.font is not None else None
+        color = self.color.hex() if self.color is not None else None
+        background = self.background.hex() if self.background is not None else None
+        return f"Display state (font {font}, size {self.size}, color {color}, background {background})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def reset(self):
+        """Forget every field."""
+
+        self.font: Optional[bytes] = None
+        self.size: Optional[int] = None
+        self.color: Optional[bytes] = None
+        self.background: Optional[bytes] = None
+
+    def shorten(self, command: commands.BTCommand) -> commands.BTCommand:
+        """
+        Return the shortest command with the same effect on the display, given the current state.
+
+        The shortened command is a view over the data of the original command, which is not copied.
+
+        :param command: The command.
+        :type command: `commands.BTCommand`
+
+        :return: The shortened command, or the command itself if no field can be omitted.
+        :rtype: `commands.BTCommand`
+
+        """
+
+        if command.characteristic != commands.GYWCharacteristics.DISPLAY_COMMAND:
+            return command
+
+        data = command.view()
+        length = len(data)
+        if length == _TEXT_END and data[0] == commands.ControlCodes.DRAW_TEXT:
+            if self.color is None or data[_TEXT_COLOR:_TEXT_END] != self.color:
+                return command
+            length = _TEXT_COLOR
+            if self.size is not None and data[_TEXT_SIZE] == self.size:
+                length = _TEXT_SIZE
+                if self.font is not None and data[_TEXT_FONT:_TEXT_SIZE] == self.font:
+                    length = _TEXT_FONT
+        elif length == 5 and data[0] == commands.ControlCodes.CLEAR:
+            if self.background is None or data[1:5] != self.background:
+                return command
+            length = 1
+        else:
+            return command
+
+        return commands.BTCommand(command.characteristic, data[:length])
+
+    def update(self, command: commands.BTCommand):
+        """
+        Record the fields of a command fully written to the device.
+
+        :param command: The command, as given to `shorten`.
+        :type command: `commands.BTCommand`
+
+        """
+
+        if command.characteristic != commands.GYWCharacteristics.DISPLAY_COMMAND:
+            return
+
+        data = command.view()
+        if not data:
+            return
+        if data[0] == commands.ControlCodes.DRAW_TEXT:
+            if len(data) >= _TEXT_SIZE:
+                self.font = bytes(data[_TEXT_FONT:_TEXT_SIZE])
+            if len(data) > _TEXT_SIZE:
+                self.size = data[_TEXT_SIZE]
+            if len(data) >= _TEXT_END:
+                self.color = bytes(data[_TEXT_COLOR:_TEXT_END])
+        elif data[0] == commands.ControlCodes.CLEAR:
+            if len(data) >= 5:
+                self.background = bytes(data[1:5])
+            # Whether the texts keep their font and color after a clear is not specified.
+            self.font = None
+            self.size = None
+            self.color = None
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "font": self.font.decode('utf-8', 'replace') if self.font is not None else None,
+            "size": self.size,
+            "color": self.color.hex() if self.color is not None else None,
+            "background": self.background.hex() if self.background is not None else None,
+        }
@@ -0,0 +1,61 @@
+from typing import Any, Dict, Hashable
+
+
+class BTDeviceStats:
+    """
+    Counters describing the traffic sent to an aRdent device.
+
+    Attributes:
+        commands: The number of `commands.BTCommand` sent to the device.
+        writes: The number of GATT writes performed (one per packet).
+        bytes_sent: The number of payload bytes written to the device.
+        write_errors: The number of GATT writes that failed.
+        retries: The number of retries performed after transient errors.
+        preemptions: The number of times a drawing was interrupted by a more urgent one.
+        coalesced: The number of updates replaced by a newer update of the same key before being sent.
+        coalesced_by_key: The number of updates replaced, per key.
+        expired: The number of drawings dropped because their deadline passed before they were sent.
+        bytes_saved: The number of bytes omitted from the commands because the display already had their fields.
+
+    """
+
+    def __init__(self):
+        """Initialize a new instance of the `BTDeviceStats` class with all counters set to zero."""
+
+        self.reset()
+
+    def __str__(self) -> str:
+        return f"{self.commands} commands, {self.writes} writes, {self.bytes_sent} bytes"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def reset(self):
+        """Reset all the counters to zero."""
+
+        self.commands = 0
+        self.writes = 0
+        self.bytes_sent = 0
+        self.write_errors = 0
+        self.retries = 0
+        self.preemptions = 0
+        self.coalesced = 0
+        self.coalesced_by_key: Dict[Hashable, int] = {}
+        self.expired = 0
+        self.bytes_saved = 0
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "commands": self.commands,
+            "writes": self.writes,
+            "bytes_sent": self.bytes_sent,
+            "write_errors": self.write_errors,
+            "retries": self.retries,
+            "preemptions": self.preemptions,
+            "coalesced": self.coalesced,
+            "coalesced_by_key": {str(key): count for key, count in self.coalesced_by_key.items()},
+            "expired": self.expired,
+            "bytes_saved": self.bytes_saved,
+        }
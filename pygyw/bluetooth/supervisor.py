@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import random
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from .exceptions import BTException
+
+if TYPE_CHECKING:
+    from .device import BTDevice
+
+logger = logging.getLogger(__name__)
+
+
+class BTSupervisor:
+    """
+    Keeps a `BTDevice` connected.
+
+    The supervisor watches the link of the device. When it is lost, it reconnects with an exponential backoff and
+    jitter, then restores the screen by replaying the last clear and the drawings sent since. Meanwhile, drawings sent
+    to the device wait in its queue (bounded by its `queue_size`) instead of failing.
+
+    Attributes:
+        device: The supervised device.
+        backoff: The delay (in seconds) before the first reconnection attempt.
+        backoff_factor: The factor applied to the delay after each failed attempt.
+        max_backoff: The maximum delay (in seconds) between two attempts.
+        jitter: The relative random variation (between 0 and 1) applied to each delay.
+        max_attempts: The maximum number of consecutive attempts before giving up, or None to never give up.
+        reconnections: The number of successful reconnections.
+        generation: A number incremented each time the link is restored.
+        running: Whether the supervisor is running.
+
+    """
+
+    def __init__(self,
+                 device: "BTDevice",
+                 backoff: float = 0.5,
+                 backoff_factor: float = 2.0,
+                 max_backoff: float = 30.0,
+                 jitter: float = 0.2,
+                 max_attempts: Optional[int] = None):
+        """
+        Initialize a new instance of the `BTSupervisor` class.
+
+        :param device: The device to supervise.
+        :type device: `BTDevice`
+        :param backoff: The delay (in seconds) before the first reconnection attempt. Defaults to 0.5.
+        :type backoff: float
+        :param backoff_factor: The factor applied to the delay after each failed attempt. Defaults to 2.0.
+        :type backoff_factor: float
+        :param max_backoff: The maximum delay (in seconds) between two attempts. Defaults to 30.0.
+        :type max_backoff: float
+        :param jitter: The relative random variation (between 0 and 1) applied to each delay. Defaults to 0.2.
+        :type jitter: float
+        :param max_attempts: The maximum number of consecutive attempts before giving up. Defaults to None (never).
+        :type max_attempts: int or None
+
+        """
+
+        assert 0.0 <= jitter <= 1.0
+
+        self.device = device
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.reconnections = 0
+        self.generation = 0
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+        self._up: Optional[asyncio.Event] = None
+        self._down: Optional[asyncio.Event] = None
+
+    def __str__(self) -> str:
+        return f"Supervisor of {self.device} ({'running' if self.running else 'stopped'})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the link is up and the screen has been restored."""
+
+        return self._up is not None and self._up.is_set() and self.device.transport.is_connected
+
+    async def start(self):
+        """Start supervising the device, connecting it if needed."""
+
+        if self.running:
+            return
+
+        if self.device.supervisor is not None and self.device.supervisor is not self:
+            raise BTException("The device is already supervised")
+
+        self._up = asyncio.Event()
+        self._down = asyncio.Event()
+        if self.device.transport.is_connected:
+            self._up.set()
+
+        self.running = True
+        self.device.supervisor = self
+        self.device.transport.disconnected_callback = self.__on_disconnected
+        self._task = asyncio.get_running_loop().create_task(self.__run())
+
+    async def stop(self):
+        """Stop supervising the device. The connection is left as is."""
+
+        if not self.running:
+            return
+
+        self.running = False
+        self.device.transport.disconnected_callback = None
+        if self.device.supervisor is self:
+            self.device.supervisor = None
+
+        # Wake up the senders waiting for the link, they will fail.
+        self._up.set()
+
+        task = self._task
+        self._task = None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def wait_connected(self) -> int:
+        """
+        Wait until the link is up and the screen has been restored.
+
+        :return: The generation of the link.
+        :rtype: int
+
+        :raises `BTException`: If the supervisor stops before.
+
+        """
+
+        while True:
+            await self._up.wait()
+            if not self.running:
+                raise BTException("Device not connected")
+            if self.device.transport.is_connected:
+                return self.generation
+            self.__on_disconnected()
+
+    async def link_lost(self, generation: Optional[int] = None):
+        """
+        Report an unrecoverable error on the link, so that the device is reconnected.
+
+        :param generation: The generation of the link on which the error occurred. The report is ignored if the link
+            has been restored since. Defaults to None (the current link).
+        :type generation: int or None
+
+        """
+
+        if generation is not None and generation != self.generation:
+            return
+
+        self._up.clear()
+        try:
+            await self.device.transport.disconnect()
+        except Exception as e:
+            logger.debug(f"Error while closing the link of {self.device}: {e}")
+        self._down.set()
+
+    def delay(self, attempt: int) -> float:
+        """
+        Return the time to wait before a reconnection attempt.
+
+        :param attempt: The number of the attempt, starting at 1.
+        :type attempt: int
+
+        :return: The delay (in seconds).
+        :rtype: float
+
+        """
+
+        delay = min(self.backoff * self.backoff_factor ** (attempt - 1), self.max_backoff)
+        return delay * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "reconnections": self.reconnections,
+        }
+
+    def __on_disconnected(self):
+        if self.running and self._up is not None:
+            self._up.clear()
+            self._down.set()
+
+    async def __reconnect(self) -> bool:
+        attempt = 0
+        while self.running:
+            attempt += 1
+            try:
+                connected = await self.device.connect()
+            except Exception as e:
+                logger.debug(f"Reconnection to {self.device} failed: {e}")
+                connected = False
+
+            if connected:
+                try:
+                    await self.device._restore_screen()
+                    return True
+                except Exception as e:
+                    # Counted as a failed attempt, so that a link failing every write is retried with the backoff.
+                    logger.warning(f"Error while restoring the screen of {self.device}: {e}")
+                    await self.link_lost()
+
+            if self.max_attempts is not None and attempt >= self.max_attempts:
+                logger.error(f"Giving up reconnecting to {self.device} after {attempt} attempts")
+                return False
+
+            delay = self.delay(attempt)
+            logger.info(f"Reconnecting to {self.device} in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+        return False
+
+    async def __run(self):
+        while self.running:
+            if not self.device.transport.is_connected:
+                self._up.clear()
+                if not await self.__reconnect():
+                    await self.stop()
+                    return
+
+                if self.generation > 0:
+                    self.reconnections += 1
+                    logger.info(f"Link to {self.device} restored")
+
+            self.generation += 1
+            self._down.clear()
+            self._up.set()
+            await self._down.wait()
@@ -0,0 +1,419 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Hashable, List, Optional, Union
+
+from .device import BTDevice
+from .exceptions import BTException
+from .manager import BTManager
+from .stats import BTDeviceStats
+from .writer import BTSendResult, Priority
+from ..layout import drawings
+from ..layout.color import Color
+
+logger = logging.getLogger(__name__)
+
+
+class BTSyncClient:
+    """
+    A synchronous interface to the devices, for applications that do not use `asyncio`.
+
+    The client runs an event loop in a background thread, which owns every device. Its methods can be called from
+    any thread: they either block until the operation is done, or return a `concurrent.futures.Future`. The
+    connections stay open between two calls.
+
+    Attributes:
+        manager: The `BTManager` used to scan for devices, run by the event loop of the client.
+
+    """
+
+    def __init__(self, adapter: Optional[str] = None):
+        """
+        Initialize a new instance of the `BTSyncClient` class and start its event loop.
+
+        :param adapter: The Bluetooth adapter used to scan and connect (e.g. "hci1"). Defaults to None.
+        :type adapter: str or None
+
+        """
+
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(target=self.__run, name="pygyw-loop", daemon=True)
+        # The interfaces of the devices, by upper case address
+        self.__devices: Dict[str, "BTSyncDevice"] = {}
+        self.__lock = threading.Lock()
+        self.__thread.start()
+        self.manager = BTManager(adapter=adapter)
+
+    def __str__(self) -> str:
+        return f"Synchronous client of {len(self.__devices)} devices ({'running' if self.running else 'closed'})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __enter__(self) -> "BTSyncClient":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __run(self):
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.run_forever()
+
+    @property
+    def running(self) -> bool:
+        """Whether the event loop of the client is running."""
+
+        return self.__thread.is_alive() and not self.__loop.is_closed()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop running in the background thread."""
+
+        return self.__loop
+
+    def submit(self, awaitable: Awaitable) -> concurrent.futures.Future:
+        """
+        Run a coroutine in the event loop of the client.
+
+        :param awaitable: The coroutine.
+        :type awaitable: coroutine
+
+        :return: A future resolved with the result of the coroutine.
+        :rtype: `concurrent.futures.Future`
+
+        :raises `BTException`: If the client is closed.
+
+        """
+
+        if not self.running:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise BTException("The client is closed")
+        return asyncio.run_coroutine_threadsafe(awaitable, self.__loop)
+
+    def run(self, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine in the event loop of the client and wait for its result.
+
+        :param awaitable: The coroutine.
+        :type awaitable: coroutine
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The result of the coroutine.
+        :rtype: Any
+
+        :raises `BTException`: If called from the event loop of the client, which would block it forever.
+        :raises `concurrent.futures.TimeoutError`: If the coroutine did not complete in time. It is cancelled.
+
+        """
+
+        if threading.current_thread() is self.__thread:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise BTException("Blocking call from the event loop of the client")
+
+        future = self.submit(awaitable)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def device(self, device: "Union[BTDevice, str]", **kwargs) -> "BTSyncDevice":
+        """
+        Get a synchronous interface to a device.
+
+        The interface of a device is created once: the next calls with the same address return it, with the
+        `BTDevice` it was created with.
+
+        :param device: A `BTDevice`, or the MAC address of the device.
+        :type device: `BTDevice` or str
+        :param kwargs: The arguments given to `BTDevice` when an address is given for the first time.
+
+        :return: The device.
+        :rtype: `BTSyncDevice`
+
+        """
+
+        address = (device if isinstance(device, str) else device.address).upper()
+        with self.__lock:
+            sync_device = self.__devices.get(address)
+        if sync_device is not None:
+            return sync_device
+
+        if not isinstance(device, BTDevice):
+            device = self.run(self.__create_device(device, kwargs))
+
+        with self.__lock:
+            return self.__devices.setdefault(address, BTSyncDevice(self, device))
+
+    @staticmethod
+    async def __create_device(address: str, kwargs) -> BTDevice:
+        # The device is built in the event loop, which owns its queue.
+        return BTDevice(address, **kwargs)
+
+    def scan_devices(self, timeout: float = 3.0) -> List["BTSyncDevice"]:
+        """
+        Scan for the aRdent smart glasses around.
+
+        :param timeout: The duration (in seconds) of the scan. Defaults to 3.0.
+        :type timeout: float
+
+        :return: The devices found.
+        :rtype: `list[BTSyncDevice]`
+
+        """
+
+        self.run(self.manager.scan_devices(timeout=timeout))
+        return [self.device(device) for device in self.manager.devices]
+
+    def find(self, address: str, timeout: float = 10.0) -> Optional["BTSyncDevice"]:
+        """
+        Scan until a given device is found.
+
+        :param address: The MAC address of the device.
+        :type address: str
+        :param timeout: The maximum duration (in seconds) of the scan. Defaults to 10.0.
+        :type timeout: float
+
+        :return: The device, or None if it was not found.
+        :rtype: `BTSyncDevice` or None
+
+        """
+
+        device = self.run(self.manager.find(address, timeout=timeout))
+        return self.device(device) if device is not None else None
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Disconnect every device and stop the event loop.
+
+        :param timeout: The maximum time (in seconds) given to the disconnections. Defaults to 10.0.
+        :type timeout: float or None
+
+        """
+
+        if not self.running:
+            return
+
+        with self.__lock:
+            devices, self.__devices = list(self.__devices.values()), {}
+
+        async def disconnect_all():
+            await asyncio.gather(*(device.device.disconnect() for device in devices), return_exceptions=True)
+
+        try:
+            self.run(disconnect_all(), timeout)
+        except concurrent.futures.TimeoutError:
+            logger.warning("Devices not disconnected in time")
+        finally:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+            self.__thread.join()
+            self.__loop.close()
+
+
+class BTSyncDevice:
+    """
+    A synchronous interface to a `BTDevice`, created by `BTSyncClient.device`.
+
+    The methods can be called from any thread. Those named after `BTDevice` methods block until the operation is done;
+    `submit` and `update` return a `concurrent.futures.Future` instead.
+
+    Attributes:
+        client: The client running the event loop of the device.
+        device: The underlying device.
+
+    """
+
+    def __init__(self, client: BTSyncClient, device: BTDevice):
+        self.client = client
+        self.device = device
+
+    def __str__(self) -> str:
+        return str(self.device)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def address(self) -> str:
+        """The MAC address of the device."""
+
+        return self.device.address
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the device is connected."""
+
+        return self.device.transport.is_connected
+
+    @property
+    def stats(self) -> BTDeviceStats:
+        """The counters of the traffic sent to the device."""
+
+        return self.device.stats
+
+    def connect(self, timeout: Optional[float] = None) -> bool:
+        """
+        Connect to the device.
+
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (the timeout of the transport).
+        :type timeout: float or None
+
+        :return: The result of the connection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        return self.client.run(self.device.connect(self.client.loop), timeout)
+
+    def disconnect(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the connection with the device.
+
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The result of the disconnection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        return self.client.run(self.device.disconnect(), timeout)
+
+    def submit(self,
+               drawing: drawings.GYWDrawing,
+               priority: Priority = Priority.NORMAL,
+               ttl: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        Queue a drawing without waiting for it to be sent.
+
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `concurrent.futures.Future`
+
+        """
+
+        return self.client.submit(self.device.send_drawing(drawing, priority, ttl))
+
+    def update(self,
+               key: Hashable,
+               drawing: drawings.GYWDrawing,
+               priority: Priority = Priority.NORMAL,
+               ttl: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        Queue a drawing on the channel of a key, replacing the drawing of this channel that is still waiting.
+
+        :param key: The channel of the drawing.
+        :type key: Hashable
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: A future resolved with a `BTSendResult` once the drawing has been sent, replaced or has expired,
+            or with a `BTException` if it could not be sent.
+        :rtype: `concurrent.futures.Future`
+
+        """
+
+        async def update() -> BTSendResult:
+            return await (await self.device.update(key, drawing, priority, ttl))
+
+        return self.client.submit(update())
+
+    def send_drawing(self,
+                     drawing: drawings.GYWDrawing,
+                     priority: Priority = Priority.NORMAL,
+                     ttl: Optional[float] = None,
+                     timeout: Optional[float] = None) -> BTSendResult:
+        """
+        Send and display a drawing on the device.
+
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the drawing could not be sent.
+
+        """
+
+        return self.client.run(self.device.send_drawing(drawing, priority, ttl), timeout)
+
+    def send_drawings(self,
+                      drawings: "list[drawings.GYWDrawing]",
+                      priority: Priority = Priority.NORMAL,
+                      ttl: Optional[float] = None,
+                      timeout: Optional[float] = None) -> "list[BTSendResult]":
+        """
+        Send and display several drawings consecutively on the device.
+
+        :param drawings: The list of drawings to show.
+        :type drawings: `list[drawings.GYWDrawing]`
+        :param priority: The priority of the drawings. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawings are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The outcome of the transmission of each drawing.
+        :rtype: `list[BTSendResult]`
+
+        :raises `BTException`: If a drawing could not be sent.
+
+        """
+
+        return self.client.run(self.device.send_drawings(drawings, priority, ttl), timeout)
+
+    def clear_screen(self,
+                     color: Optional[Color] = None,
+                     priority: Priority = Priority.NORMAL,
+                     timeout: Optional[float] = None) -> BTSendResult:
+        """
+        Reset what is displayed.
+
+        :param color: The color to use to clear the screen. Defaults to None.
+        :type color: Color or None
+        :param priority: The priority of the clear. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        """
+
+        return self.client.run(self.device.clear_screen(color, priority), timeout)
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Wait until every queued drawing has been sent.
+
+        :param timeout: The maximum time (in seconds) to wait. Defaults to None (no limit).
+        :type timeout: float or None
+
+        """
+
+        self.client.run(self.device.flush(), timeout)
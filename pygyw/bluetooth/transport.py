@@ -0,0 +1,408 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from bleak import BleakClient
+from bleak.backends.device import BLEDevice
+from bleak.exc import BleakError, BleakDeviceNotFoundError
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BTTransport:
+    """
+    The link used by a `BTDevice` to exchange data with an aRdent device.
+
+    Subclasses implement the actual connection. Everything above the transport (drawings, queue, ...) is independent of it.
+
+    Attributes:
+        disconnected_callback: A function called without arguments when the link is lost, or None.
+    """
+
+    disconnected_callback: Optional[Callable[[], None]] = None
+
+    def _notify_disconnected(self):
+        if self.disconnected_callback is not None:
+            self.disconnected_callback()
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the link is established."""
+
+        raise NotImplementedError
+
+    @property
+    def mtu(self) -> Optional[int]:
+        """The ATT MTU of the link, or None if it is unknown."""
+
+        return None
+
+    async def connect(self) -> bool:
+        """
+        Establish the link.
+
+        :return: The result of the connection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        raise NotImplementedError
+
+    async def disconnect(self) -> bool:
+        """
+        Close the link.
+
+        :return: The result of the disconnection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        raise NotImplementedError
+
+    async def write(self, characteristic: str, data: bytes, response: bool = False):
+        """
+        Write a single packet to a characteristic.
+
+        :param characteristic: The UUID of the characteristic.
+        :type characteristic: str
+        :param data: The packet to write. It must fit in the MTU of the link. It may be a view over a larger
+            buffer that is only valid until the write completes.
+        :type data: bytes or memoryview
+        :param response: Whether to wait for a response from the device. Defaults to False.
+        :type response: bool
+
+        """
+
+        raise NotImplementedError
+
+    async def start_notify(self, characteristic: str, handler: Callable[[Any, bytearray], None]):
+        """
+        Subscribe to the notifications of a characteristic.
+
+        :param characteristic: The UUID of the characteristic.
+        :type characteristic: str
+        :param handler: The function called with the characteristic and the data of each notification.
+        :type handler: Callable
+
+        """
+
+        raise NotImplementedError
+
+    async def stop_notify(self, characteristic: str):
+        """
+        Unsubscribe from the notifications of a characteristic.
+
+        :param characteristic: The UUID of the characteristic.
+        :type characteristic: str
+
+        """
+
+        raise NotImplementedError
+
+
+class BleakTransport(BTTransport):
+    """
+    Transport over Bluetooth Low Energy, backed by a `BleakClient`.
+
+    Attributes:
+        device: The underlying `bleak` object or the MAC address of the device.
+        timeout: The timeout (in seconds) of the connection.
+        adapter: The name of the Bluetooth adapter to use (e.g. "hci1"), or None for the default one.
+        loop: The event loop used in the global app, or None.
+        client: The `BleakClient` of the current connection, or None when disconnected.
+
+    """
+
+    def __init__(self, device: "BLEDevice | str", timeout: float = 5.0, adapter: Optional[str] = None):
+        """
+        Initialize a new instance of the `BleakTransport` class.
+
+        :param device: The underlying `bleak` object or the MAC address of the device.
+        :type device: `BLEDevice` or str
+        :param timeout: The timeout (in seconds) of the connection. Defaults to 5.0.
+        :type timeout: float
+        :param adapter: The name of the Bluetooth adapter to use (e.g. "hci1"). Only supported by BlueZ.
+            Defaults to None (the default adapter).
+        :type adapter: str or None
+
+        """
+
+        self.device = device
+        self.timeout = timeout
+        self.adapter = adapter
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.client: Optional[BleakClient] = None
+        self._mtu: Optional[int] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None and self.client.is_connected
+
+    @property
+    def mtu(self) -> Optional[int]:
+        return self._mtu if self.client is not None else None
+
+    async def connect(self) -> bool:
+        kwargs = {"adapter": self.adapter} if self.adapter is not None else {}
+        client = BleakClient(self.device, disconnected_callback=self.__on_disconnected, timeout=self.timeout, loop=self.loop, **kwargs)
+        try:
+            await client.connect()
+        except BleakDeviceNotFoundError:
+            return False
+
+        if not client.is_connected:
+            return False
+
+        self.client = client
+
+        # BlueZ doesn't have a proper way to get the MTU, so we have this hack.
+        # https://github.com/hbldh/bleak/blob/322346d/examples/mtu_size.py
+        if client._backend.__class__.__name__ == "BleakClientBlueZDBus":
+            await client._backend._acquire_mtu()
+
+        self._mtu = self.__read_mtu(client)
+        return True
+
+    async def disconnect(self) -> bool:
+        if self.client is None:
+            return True
+
+        await self.client.disconnect()
+
+        disconnected = not self.client.is_connected
+        if disconnected:
+            self.client = None
+            self._mtu = None
+
+        return disconnected
+
+    async def write(self, characteristic: str, data: bytes, response: bool = False):
+        await self.client.write_gatt_char(characteristic, data, response)
+
+    async def start_notify(self, characteristic: str, handler: Callable[[Any, bytearray], None]):
+        await self.client.start_notify(characteristic, handler)
+
+    async def stop_notify(self, characteristic: str):
+        await self.client.stop_notify(characteristic)
+
+    def __on_disconnected(self, client: BleakClient):
+        if client is self.client:
+            logger.debug(f"Link to {self.device} lost")
+            self._notify_disconnected()
+
+    @staticmethod
+    def __read_mtu(client: BleakClient) -> Optional[int]:
+        try:
+            mtu = client.mtu_size
+        except (BleakError, NotImplementedError, AttributeError) as e:
+            logger.debug(f"Unable to read the MTU: {e}")
+            return None
+
+        return mtu if mtu and mtu > settings.att_header_size else None
+
+
+class LoopbackWrite:
+    """
+    A packet received by a `LoopbackTransport`.
+
+    Attributes:
+        timestamp: The monotonic time (in seconds) at which the write completed.
+        characteristic: The UUID of the characteristic written.
+        data: The packet written.
+        response: Whether a response was requested.
+
+    """
+
+    def __init__(self, timestamp: float, characteristic: str, data: bytes, response: bool):
+        self.timestamp = timestamp
+        self.characteristic = characteristic
+        self.data = data
+        self.response = response
+
+    def __str__(self) -> str:
+        return f"{len(self.data)} bytes on {self.characteristic} at {self.timestamp:.6f}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "timestamp": self.timestamp,
+            "characteristic": self.characteristic,
+            "data": self.data.hex(),
+            "response": self.response,
+        }
+
+
+class LoopbackTransport(BTTransport):
+    """
+    An in-process peripheral that records every write instead of sending it over the air.
+
+    It can simulate the latency of each write, a limited throughput and write errors, which makes it possible to
+    exercise and benchmark the send path without real glasses.
+
+    Attributes:
+        writes: The packets received, in order.
+        latency: The time (in seconds) each write takes on top of the throughput limit.
+        throughput: The maximum number of bytes per second accepted, or None for no limit.
+        error_rate: The probability (between 0 and 1) for each write to fail.
+
+    """
+
+    def __init__(self,
+                 mtu: Optional[int] = 247,
+                 latency: float = 0.0,
+                 throughput: Optional[float] = None,
+                 error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Initialize a new instance of the `LoopbackTransport` class.
+
+        :param mtu: The ATT MTU reported by the link. Defaults to 247.
+        :type mtu: int or None
+        :param latency: The time (in seconds) each write takes on top of the throughput limit. Defaults to 0.0.
+        :type latency: float
+        :param throughput: The maximum number of bytes per second accepted. Defaults to None (no limit).
+        :type throughput: float or None
+        :param error_rate: The probability (between 0 and 1) for each write to fail. Defaults to 0.0.
+        :type error_rate: float
+        :param seed: The seed of the random generator used for the errors. Defaults to None.
+        :type seed: int or None
+
+        """
+
+        assert 0.0 <= error_rate <= 1.0
+        assert throughput is None or throughput > 0
+
+        self.writes: List[LoopbackWrite] = []
+        self.latency = latency
+        self.throughput = throughput
+        self.error_rate = error_rate
+        self._mtu = mtu
+        self._connected = False
+        self._handlers: Dict[str, Callable[[Any, bytearray], None]] = {}
+        self._injected_errors: List[Exception] = []
+        self._connect_failures = 0
+        self._random = random.Random(seed)
+        self._busy_until = 0.0
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    @property
+    def mtu(self) -> Optional[int]:
+        return self._mtu if self._connected else None
+
+    async def connect(self) -> bool:
+        if self._connect_failures > 0:
+            self._connect_failures -= 1
+            return False
+
+        self._connected = True
+        return True
+
+    async def disconnect(self) -> bool:
+        self._connected = False
+        self._handlers = {}
+        return True
+
+    def drop(self):
+        """Simulate the loss of the link, as if the device went out of range."""
+
+        if self._connected:
+            self._connected = False
+            self._handlers = {}
+            self._notify_disconnected()
+
+    def fail_connects(self, count: int = 1):
+        """
+        Make the next connection attempts fail.
+
+        :param count: The number of connection attempts that will fail. Defaults to 1.
+        :type count: int
+
+        """
+
+        self._connect_failures += count
+
+    async def write(self, characteristic: str, data: bytes, response: bool = False):
+        if not self._connected:
+            raise BleakError("Loopback transport not connected")
+
+        if self.throughput is not None:
+            now = time.monotonic()
+            self._busy_until = max(now, self._busy_until) + len(data) / self.throughput
+            delay = self._busy_until - now + self.latency
+        else:
+            delay = self.latency
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._injected_errors:
+            raise self._injected_errors.pop(0)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise BleakError("Injected write error")
+
+        self.writes.append(LoopbackWrite(time.monotonic(), characteristic, bytes(data), response))
+
+    async def start_notify(self, characteristic: str, handler: Callable[[Any, bytearray], None]):
+        self._handlers[characteristic] = handler
+
+    async def stop_notify(self, characteristic: str):
+        self._handlers.pop(characteristic, None)
+
+    def inject_errors(self, count: int = 1, error: Optional[Exception] = None):
+        """
+        Make the next writes fail.
+
+        :param count: The number of writes that will fail. Defaults to 1.
+        :type count: int
+        :param error: The exception raised by these writes. Defaults to a `BleakError`.
+        :type error: Exception or None
+
+        """
+
+        for _ in range(count):
+            self._injected_errors.append(error if error is not None else BleakError("Injected write error"))
+
+    def notify(self, characteristic: str, data: bytes):
+        """
+        Simulate a notification sent by the device.
+
+        :param characteristic: The UUID of the characteristic.
+        :type characteristic: str
+        :param data: The data of the notification.
+        :type data: bytes
+
+        """
+
+        handler = self._handlers.get(characteristic)
+        if handler is not None:
+            handler(characteristic, bytearray(data))
+
+    def received(self, characteristic: Optional[str] = None) -> bytes:
+        """
+        Return the concatenation of the packets received.
+
+        :param characteristic: Only keep the packets written to this characteristic. Defaults to None (all packets).
+        :type characteristic: str or None
+
+        :return: The data received.
+        :rtype: bytes
+
+        """
+
+        return b"".join(w.data for w in self.writes if characteristic is None or w.characteristic == characteristic)
+
+    def reset(self):
+        """Forget the packets received."""
+
+        self.writes = []
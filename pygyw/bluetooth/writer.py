@@ -0,0 +1,663 @@
+import asyncio
+import logging
+from collections import deque
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from . import commands
+from .exceptions import BTException
+from .stats import BTDeviceStats
+
+logger = logging.getLogger(__name__)
+
+
+class SendStatus(Enum):
+    """What happened to a drawing queued on a device."""
+
+    SENT = "sent"
+    REPLACED = "replaced"
+    EXPIRED = "expired"
+
+
+class BTSendResult:
+    """
+    The outcome of a list of commands flushed to an aRdent device.
+
+    Attributes:
+        status: What happened to the commands.
+        commands: The number of `commands.BTCommand` sent.
+        writes: The number of GATT writes performed.
+        bytes_sent: The number of payload bytes written.
+        retries: The number of retries needed after transient errors.
+        queued_time: The time (in seconds) spent waiting in the queue of the device.
+        send_time: The time (in seconds) spent writing the commands to the device.
+
+    """
+
+    def __init__(self, commands: int = 0, writes: int = 0, bytes_sent: int = 0, status: SendStatus = SendStatus.SENT):
+        """
+        Initialize a new instance of the `BTSendResult` class.
+
+        :param commands: The number of commands sent. Defaults to 0.
+        :type commands: int
+        :param writes: The number of GATT writes performed. Defaults to 0.
+        :type writes: int
+        :param bytes_sent: The number of payload bytes written. Defaults to 0.
+        :type bytes_sent: int
+        :param status: What happened to the commands. Defaults to `SendStatus.SENT`.
+        :type status: `SendStatus`
+
+        """
+
+        self.status = status
+        self.commands = commands
+        self.writes = writes
+        self.bytes_sent = bytes_sent
+        self.retries = 0
+        self.queued_time = 0.0
+        self.send_time = 0.0
+
+    def __str__(self) -> str:
+        if self.status != SendStatus.SENT:
+            return self.status.value.capitalize()
+        return f"{self.commands} commands in {self.writes} writes ({self.bytes_sent} bytes)"
+
+    def add(self, other: "BTSendResult"):
+        """
+        Add the counters of another result to this one.
+
+        :param other: The result to add.
+        :type other: `BTSendResult`
+
+        """
+
+        self.commands += other.commands
+        self.writes += other.writes
+        self.bytes_sent += other.bytes_sent
+        self.retries += other.retries
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "status": self.status.value,
+            "commands": self.commands,
+            "writes": self.writes,
+            "bytes_sent": self.bytes_sent,
+            "retries": self.retries,
+            "queued_time": self.queued_time,
+            "send_time": self.send_time,
+        }
+
+
+class BTStreamItem:
+    """
+    The outcome of a drawing sent by `BTDevice.stream`.
+
+    Attributes:
+        index: The position of the drawing in the stream, starting at 0.
+        drawing: The drawing.
+        result: The outcome of the transmission.
+        latency: The time (in seconds) between the moment the drawing was taken from the stream and the end of its
+            transmission, encoding and queuing included.
+
+    """
+
+    def __init__(self, index: int, drawing: Any, result: BTSendResult, latency: float):
+        self.index = index
+        self.drawing = drawing
+        self.result = result
+        self.latency = latency
+
+    def __str__(self) -> str:
+        return f"#{self.index} {self.drawing}: {self.result} in {self.latency * 1000:.1f} ms"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "index": self.index,
+            "drawing": str(self.drawing),
+            "result": self.result.to_json(),
+            "latency": self.latency,
+        }
+
+
+class Priority(IntEnum):
+    """The priority of a drawing in the queue of a device. Lower values are sent first."""
+
+    URGENT = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class BTJob:
+    """
+    A list of commands waiting in the queue of a `BTWriter`.
+
+    A job is written instruction by instruction, an instruction being the commands up to and including the next
+    control command. A job of higher priority may be written between two instructions, but the packets of a command
+    are never interleaved with those of another command.
+
+    Attributes:
+        commands: The commands to write.
+        future: The future resolved with a `BTSendResult` once the commands have been written.
+        priority: The priority of the job.
+        key: The key of the channel of the job, or None. A pending job is replaced by a newer job with the same key.
+        deadline: The loop time after which the job is dropped if it has not started yet, or None.
+        enqueued_at: The loop time at which the job was created.
+        position: The index of the first command not written yet.
+        result: The outcome of the commands written so far.
+
+    """
+
+    def __init__(self,
+                 commands: "List[commands.BTCommand]",
+                 future: asyncio.Future,
+                 enqueued_at: float,
+                 priority: Priority = Priority.NORMAL,
+                 key: Optional[Hashable] = None,
+                 deadline: Optional[float] = None):
+        self.commands = commands
+        self.future = future
+        self.priority = Priority(priority)
+        self.key = key
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.position = 0
+        self.result = BTSendResult()
+        self.started_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether all the commands have been written."""
+
+        return self.position >= len(self.commands)
+
+    def next_instruction(self) -> int:
+        """Return the index following the end of the next instruction to write."""
+
+        for index in range(self.position, len(self.commands)):
+            if self.commands[index].characteristic == commands.GYWCharacteristics.DISPLAY_COMMAND:
+                return index + 1
+
+        return len(self.commands)
+
+
+class BTJobQueue:
+    """
+    A bounded queue of `BTJob` with one FIFO lane per `Priority`.
+
+    It mirrors the interface of `asyncio.Queue`, with `get` returning the oldest job of the most urgent lane.
+    Jobs with a key can be replaced while they are waiting, so there is at most one pending job per key.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        """
+        Initialize a new instance of the `BTJobQueue` class. It must be created within the event loop using it.
+
+        :param maxsize: The maximum number of jobs in the queue. 0 means unbounded.
+        :type maxsize: int
+
+        """
+
+        self.maxsize = maxsize
+        self._lanes: "Dict[Priority, Deque[BTJob]]" = {priority: deque() for priority in Priority}
+        self._keyed: "Dict[Hashable, BTJob]" = {}
+        self._size = 0
+        self._unfinished = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        """Return the number of jobs in the queue."""
+
+        return self._size
+
+    def empty(self) -> bool:
+        """Return whether the queue is empty."""
+
+        return self._size == 0
+
+    def full(self) -> bool:
+        """Return whether the queue is full."""
+
+        return 0 < self.maxsize <= self._size
+
+    async def put(self, job: BTJob):
+        """Add a job at the end of its lane, waiting for a free slot if the queue is full."""
+
+        while self.full():
+            self._not_full.clear()
+            await self._not_full.wait()
+        self.put_nowait(job)
+
+    def put_nowait(self, job: BTJob):
+        """
+        Add a job at the end of its lane.
+
+        :raises `asyncio.QueueFull`: If the queue is full.
+
+        """
+
+        if self.full():
+            raise asyncio.QueueFull
+        self._lanes[job.priority].append(job)
+        if job.key is not None:
+            self._keyed[job.key] = job
+        self.__added()
+        self._unfinished += 1
+        self._finished.clear()
+
+    async def put_or_replace(self, job: BTJob) -> Optional[BTJob]:
+        """
+        Replace the pending job having the same key as the given one, or add the job if there is none.
+
+        :param job: The new job. It must have a key.
+        :type job: `BTJob`
+
+        :return: The job replaced, or None if the new job was added.
+        :rtype: `BTJob` or None
+
+        """
+
+        while True:
+            old = self.replace(job)
+            if old is not None or not self.full():
+                break
+            self._not_full.clear()
+            await self._not_full.wait()
+
+        if old is None:
+            self.put_nowait(job)
+        return old
+
+    def put_back(self, job: BTJob):
+        """Put a job that was already taken from the queue back at the front of its lane, ignoring the size limit."""
+
+        self._lanes[job.priority].appendleft(job)
+        self.__added()
+
+    async def get(self) -> BTJob:
+        """Remove and return the next job, waiting for one if the queue is empty."""
+
+        while self.empty():
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def get_nowait(self) -> BTJob:
+        """
+        Remove and return the next job.
+
+        :raises `asyncio.QueueEmpty`: If the queue is empty.
+
+        """
+
+        for lane in self._lanes.values():
+            if lane:
+                job = lane.popleft()
+                if job.key is not None and self._keyed.get(job.key) is job:
+                    del self._keyed[job.key]
+                self.__removed()
+                return job
+        raise asyncio.QueueEmpty
+
+    def replace(self, job: BTJob) -> Optional[BTJob]:
+        """
+        Replace the pending job having the same key as the given one.
+
+        The new job takes the place of the pending job if they have the same priority. Otherwise, it is added at the
+        end of the lane of its own priority.
+
+        :param job: The new job. It must have a key.
+        :type job: `BTJob`
+
+        :return: The job replaced, or None if no job with this key is pending (the new job is then not added).
+        :rtype: `BTJob` or None
+
+        """
+
+        old = self._keyed.get(job.key)
+        if old is None:
+            return None
+
+        lane = self._lanes[old.priority]
+        if job.priority == old.priority:
+            lane[lane.index(old)] = job
+        else:
+            lane.remove(old)
+            self._lanes[job.priority].append(job)
+        self._keyed[job.key] = job
+        return old
+
+    def has_before(self, priority: Priority) -> bool:
+        """Return whether a job more urgent than the given priority is waiting."""
+
+        return any(self._lanes[p] for p in Priority if p < priority)
+
+    def task_done(self):
+        """Indicate that a job taken from the queue is complete."""
+
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        """Wait until all the jobs added to the queue are complete."""
+
+        await self._finished.wait()
+
+    def __added(self):
+        self._size += 1
+        self._not_empty.set()
+
+    def __removed(self):
+        self._size -= 1
+        if not self.full():
+            self._not_full.set()
+
+
+class BTWriter:
+    """
+    A background task that drains a bounded queue of commands and writes them to a device.
+
+    Jobs are taken by priority, then in order. Between two instructions of a job, the writer switches to a more urgent
+    job if one is waiting.
+
+    Attributes:
+        transmit: The coroutine function writing a list of commands to the device.
+        maxsize: The maximum number of jobs waiting in the queue.
+        stats: The counters updated with the preemptions and the replaced jobs.
+
+    """
+
+    def __init__(self,
+                 transmit: "Callable[[List[commands.BTCommand]], Awaitable[BTSendResult]]",
+                 maxsize: int,
+                 stats: Optional[BTDeviceStats] = None):
+        """
+        Initialize a new instance of the `BTWriter` class.
+
+        :param transmit: The coroutine function writing a list of commands to the device.
+        :type transmit: Callable
+        :param maxsize: The maximum number of jobs waiting in the queue. 0 means unbounded.
+        :type maxsize: int
+        :param stats: The counters updated with the preemptions and the replaced jobs. Defaults to new counters.
+        :type stats: `BTDeviceStats` or None
+
+        """
+
+        self.transmit = transmit
+        self.maxsize = maxsize
+        self.stats = stats if stats is not None else BTDeviceStats()
+        self._queue: Optional[BTJobQueue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is running."""
+
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """The number of jobs waiting in the queue."""
+
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the background task in the running event loop, if it is not already running there."""
+
+        loop = asyncio.get_running_loop()
+        if self.running and self._task.get_loop() is loop:
+            return
+
+        self._queue = BTJobQueue(maxsize=self.maxsize)
+        self._task = loop.create_task(self.__run())
+
+    async def stop(self):
+        """
+        Stop the background task.
+
+        Jobs that were not written yet are failed with a `BTException`.
+        This has no effect when called from the background task itself.
+
+        """
+
+        task = self._task
+        if task is None or task is asyncio.current_task():
+            return
+
+        self._task = None
+        if task.get_loop() is not asyncio.get_running_loop():
+            # The task belongs to a loop that is gone, so are its jobs.
+            self._queue = None
+            return
+
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        self.__fail_pending(BTException("The writer was stopped"))
+
+    async def put(self,
+                  commands: "List[commands.BTCommand]",
+                  priority: Priority = Priority.NORMAL,
+                  deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Add commands to the queue, waiting for a free slot if the queue is full.
+
+        :param commands: The commands to write.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param deadline: The loop time after which the commands are dropped if not sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the commands are written or expired.
+        :rtype: `asyncio.Future`
+
+        """
+
+        self.start()
+        job = self._new_job(commands, priority, deadline=deadline)
+        await self._queue.put(job)
+        return job.future
+
+    def put_nowait(self,
+                   commands: "List[commands.BTCommand]",
+                   priority: Priority = Priority.NORMAL,
+                   deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Add commands to the queue without waiting.
+
+        :param commands: The commands to write.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param deadline: The loop time after which the commands are dropped if not sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the commands are written or expired.
+        :rtype: `asyncio.Future`
+
+        :raises `BTException`: If the queue is full.
+
+        """
+
+        self.start()
+        job = self._new_job(commands, priority, deadline=deadline)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise BTException("The queue of the device is full")
+        return job.future
+
+    async def update(self,
+                     key: Hashable,
+                     commands: "List[commands.BTCommand]",
+                     priority: Priority = Priority.NORMAL,
+                     deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Add commands to the channel of a key, replacing the commands of this channel that are still waiting.
+
+        The new commands take the place of the replaced ones in the queue, or go to the end of the lane of their priority
+        if it differs. The future of the replaced commands is resolved with `SendStatus.REPLACED`.
+        If no commands of this channel are waiting, this behaves like `put`.
+
+        :param key: The key of the channel.
+        :type key: Hashable
+        :param commands: The commands to write.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param deadline: The loop time after which the commands are dropped if not sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the commands are written, replaced or expired.
+        :rtype: `asyncio.Future`
+
+        """
+
+        self.start()
+        job = self._new_job(commands, priority, key, deadline)
+        self.__replaced(job, await self._queue.put_or_replace(job))
+        return job.future
+
+    def update_nowait(self,
+                      key: Hashable,
+                      commands: "List[commands.BTCommand]",
+                      priority: Priority = Priority.NORMAL,
+                      deadline: Optional[float] = None) -> asyncio.Future:
+        """
+        Add commands to the channel of a key without waiting, replacing the commands of this channel that are still waiting.
+
+        :param key: The key of the channel.
+        :type key: Hashable
+        :param commands: The commands to write.
+        :type commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param deadline: The loop time after which the commands are dropped if not sent yet. Defaults to None.
+        :type deadline: float or None
+
+        :return: A future resolved with a `BTSendResult` once the commands are written, replaced or expired.
+        :rtype: `asyncio.Future`
+
+        :raises `BTException`: If no commands of this channel are waiting and the queue is full.
+
+        """
+
+        self.start()
+        job = self._new_job(commands, priority, key, deadline)
+        old = self._queue.replace(job)
+        if old is None:
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                raise BTException("The queue of the device is full")
+        self.__replaced(job, old)
+        return job.future
+
+    async def join(self):
+        """Wait until all the jobs of the queue have been processed."""
+
+        if self.running:
+            await self._queue.join()
+
+    def _new_job(self,
+                 commands: "List[commands.BTCommand]",
+                 priority: Priority,
+                 key: Optional[Hashable] = None,
+                 deadline: Optional[float] = None) -> BTJob:
+        loop = asyncio.get_running_loop()
+        return BTJob(commands, loop.create_future(), loop.time(), priority, key, deadline)
+
+    def __replaced(self, job: BTJob, old: Optional[BTJob]):
+        if old is None:
+            return
+
+        self.stats.coalesced += 1
+        self.stats.coalesced_by_key[job.key] = self.stats.coalesced_by_key.get(job.key, 0) + 1
+        if not old.future.done():
+            old.future.set_result(BTSendResult(status=SendStatus.REPLACED))
+
+    def __fail_pending(self, error: Exception):
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._queue.task_done()
+            if not job.future.done():
+                job.future.set_exception(error)
+
+    async def __write(self, job: BTJob) -> bool:
+        """Write the job until it is complete (True) or interrupted by a more urgent job (False)."""
+
+        loop = asyncio.get_running_loop()
+        if job.started_at is None:
+            job.started_at = loop.time()
+            job.result.queued_time = job.started_at - job.enqueued_at
+
+        while not job.done:
+            end = job.next_instruction()
+            started_at = loop.time()
+            result = await self.transmit(job.commands[job.position:end])
+            job.result.add(result)
+            job.result.send_time += loop.time() - started_at
+            job.position = end
+
+            if not job.done and self._queue.has_before(job.priority):
+                return False
+
+        return True
+
+    async def __run(self):
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                # Cancelled by the producer before being written
+                self._queue.task_done()
+                continue
+
+            if job.started_at is None and job.deadline is not None and asyncio.get_running_loop().time() > job.deadline:
+                # Too late to be useful, never started so nothing is half drawn
+                self.stats.expired += 1
+                job.future.set_result(BTSendResult(status=SendStatus.EXPIRED))
+                self._queue.task_done()
+                continue
+
+            try:
+                complete = await self.__write(job)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_exception(BTException("The writer was stopped"))
+                self._queue.task_done()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+                self._queue.task_done()
+                continue
+
+            if not complete:
+                self.stats.preemptions += 1
+                self._queue.put_back(job)
+                continue
+
+            if not job.future.done():
+                job.future.set_result(job.result)
+            self._queue.task_done()
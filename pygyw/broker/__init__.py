@@ -0,0 +1,4 @@
+from .client import BTBrokerClient, BTRemoteDevice
+from .server import BTBroker
+from . import protocol
+from . import settings
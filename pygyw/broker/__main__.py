@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import logging
+
+from . import settings
+from .server import BTBroker
+
+logger = logging.getLogger(__name__)
+
+
+async def main(path: str, addresses: "list[str]"):
+    broker = BTBroker(path)
+    await broker.start()
+    for address in addresses:
+        try:
+            await broker.add_device(address)
+        except Exception as e:
+            logger.warning(f"Device {address} not connected yet: {e}")
+    await broker.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pygyw.broker", description="Share aRdent glasses between processes.")
+    parser.add_argument("addresses", nargs="*", help="MAC addresses of the devices to connect on startup")
+    parser.add_argument("--socket", default=settings.socket_path, help=f"Unix domain socket (default: {settings.socket_path})")
+    parser.add_argument("--verbose", action="store_true", help="Log the activity of the broker")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(main(args.socket, args.addresses))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,341 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional
+
+from . import protocol, settings
+from ..bluetooth import commands
+from ..bluetooth.exceptions import BTException
+from ..bluetooth.writer import BTSendResult, Priority
+from ..layout import cache, drawings
+from ..layout.color import Color
+
+logger = logging.getLogger(__name__)
+
+
+class BTBrokerClient:
+    """
+    A connection to a `BTBroker`.
+
+    Requests are sent without waiting for the previous ones to be answered: several coroutines can use the same
+    client at the same time.
+
+    Attributes:
+        path: The path of the Unix domain socket of the broker.
+
+    """
+
+    def __init__(self, path: str = settings.socket_path):
+        """
+        Initialize a new instance of the `BTBrokerClient` class.
+
+        :param path: The path of the Unix domain socket of the broker. Defaults to `settings.socket_path`.
+        :type path: str
+
+        """
+
+        self.path = path
+        self.__reader: Optional[asyncio.StreamReader] = None
+        self.__writer: Optional[asyncio.StreamWriter] = None
+        self.__task: Optional[asyncio.Task] = None
+        self.__pending: Dict[int, asyncio.Future] = {}
+        self.__ids = itertools.count(1)
+
+    def __str__(self) -> str:
+        return f"Client of the broker on {self.path}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    async def __aenter__(self) -> "BTBrokerClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether the client is connected to the broker."""
+
+        return self.__writer is not None and not self.__writer.is_closing() and not self.__task.done()
+
+    async def connect(self):
+        """
+        Connect to the broker.
+
+        :raises `BTException`: If the broker is not running.
+
+        """
+
+        if self.is_connected:
+            return
+
+        try:
+            self.__reader, self.__writer = await asyncio.open_unix_connection(self.path, limit=settings.message_size_limit)
+        except OSError as e:
+            raise BTException(f"Cannot connect to the broker on {self.path}: {e}") from e
+        self.__task = asyncio.get_running_loop().create_task(self.__read())
+
+    async def close(self):
+        """Close the connection with the broker. The devices stay connected to the broker."""
+
+        if self.__writer is None:
+            return
+
+        self.__writer.close()
+        try:
+            await self.__writer.wait_closed()
+        except ConnectionError:
+            pass
+        if self.__task is not None:
+            await self.__task
+        self.__writer = None
+        self.__task = None
+
+    async def __read(self):
+        try:
+            while True:
+                message = await protocol.read_message(self.__reader)
+                if message is None:
+                    break
+                future = self.__pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    if message.get("error"):
+                        logger.error(f"Broker error: {message['error']}")
+                    continue
+                if "error" in message:
+                    future.set_exception(BTException(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        except (BTException, ConnectionError) as e:
+            logger.error(f"Connection with the broker lost: {e}")
+        finally:
+            # The broker is gone: the next requests fail instead of waiting for an answer that never comes.
+            self.__writer.close()
+            for future in self.__pending.values():
+                if not future.done():
+                    future.set_exception(BTException("Connection with the broker closed"))
+            self.__pending.clear()
+
+    async def request(self, op: str, **fields) -> Any:
+        """
+        Send a request to the broker and wait for its answer.
+
+        :param op: The operation.
+        :type op: str
+        :param fields: The fields of the request.
+
+        :return: The result of the request.
+        :rtype: Any
+
+        :raises `BTException`: If the request failed, or if the connection with the broker is closed.
+
+        """
+
+        if self.__task is not None and self.__task.done():
+            raise BTException("Connection with the broker closed")
+        if not self.is_connected:
+            raise BTException("Not connected to the broker")
+
+        request_id = next(self.__ids)
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[request_id] = future
+        self.__writer.write(protocol.encode_message({"id": request_id, "op": op, **fields}))
+        await self.__writer.drain()
+        return await future
+
+    async def devices(self) -> List[Dict[str, Any]]:
+        """
+        List the devices handled by the broker.
+
+        :return: The address of each device and whether it is connected.
+        :rtype: `list[dict]`
+
+        """
+
+        return await self.request("devices")
+
+    def device(self, address: str) -> "BTRemoteDevice":
+        """
+        Get a device through the broker.
+
+        :param address: The MAC address of the device.
+        :type address: str
+
+        :return: The device.
+        :rtype: `BTRemoteDevice`
+
+        """
+
+        return BTRemoteDevice(self, address)
+
+
+class BTRemoteDevice:
+    """
+    A device connected to a `BTBroker`, with the same methods as a `BTDevice`.
+
+    Drawings are encoded by the client and sent to the broker as commands.
+
+    Attributes:
+        client: The connection to the broker.
+        address: The MAC address of the device.
+
+    """
+
+    def __init__(self, client: BTBrokerClient, address: str):
+        """
+        Initialize a new instance of the `BTRemoteDevice` class.
+
+        :param client: The connection to the broker.
+        :type client: `BTBrokerClient`
+        :param address: The MAC address of the device.
+        :type address: str
+
+        """
+
+        self.client = client
+        self.address = address
+
+    def __str__(self) -> str:
+        return self.address
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    async def connect(self, timeout: float = settings.connect_timeout) -> bool:
+        """
+        Ask the broker to connect the device, if it is not connected yet.
+
+        :param timeout: The maximum time (in seconds) to wait for the connection. Defaults to
+            `settings.connect_timeout`. The broker keeps trying to connect after the timeout.
+        :type timeout: float
+
+        :return: The result of the connection (True if success, False otherwise).
+        :rtype: bool
+
+        """
+
+        await self.client.connect()
+        try:
+            await self.client.request("connect", device=self.address, timeout=timeout)
+        except BTException as e:
+            logger.warning(f"Connection to device {self.address} failed: {e}")
+            return False
+        return True
+
+    async def disconnect(self) -> bool:
+        """
+        Release the device. The broker keeps it connected for the other clients.
+
+        :return: Always True.
+        :rtype: bool
+
+        """
+
+        return True
+
+    async def send_commands(self,
+                            bt_commands: "list[commands.BTCommand]",
+                            priority: Priority = Priority.NORMAL,
+                            ttl: Optional[float] = None) -> BTSendResult:
+        """
+        Send commands already encoded to the device.
+
+        :param bt_commands: The commands to send, as returned by `GYWDrawing.to_commands()`.
+        :type bt_commands: `list[commands.BTCommand]`
+        :param priority: The priority of the commands. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the commands are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the commands could not be sent.
+
+        """
+
+        result = await self.client.request("send_commands",
+                                           device=self.address,
+                                           commands=protocol.commands_to_json(bt_commands),
+                                           priority=int(priority),
+                                           ttl=ttl)
+        return protocol.result_from_json(result)
+
+    async def send_drawing(self,
+                           drawing: drawings.GYWDrawing,
+                           priority: Priority = Priority.NORMAL,
+                           ttl: Optional[float] = None) -> BTSendResult:
+        """
+        Send and display a drawing on the device.
+
+        :param drawing: The drawing to show on the screen.
+        :type drawing: `drawings.GYWDrawing`
+        :param priority: The priority of the drawing. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawing is dropped if it has not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        :raises `BTException`: If the drawing could not be sent.
+
+        """
+
+        return await self.send_commands(cache.command_cache.get(drawing), priority, ttl)
+
+    async def send_drawings(self,
+                            drawings: "list[drawings.GYWDrawing]",
+                            priority: Priority = Priority.NORMAL,
+                            ttl: Optional[float] = None) -> "list[BTSendResult]":
+        """
+        Send and display several drawings consecutively on the device.
+
+        :param drawings: The list of drawings to show.
+        :type drawings: `list[drawings.GYWDrawing]`
+        :param priority: The priority of the drawings. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+        :param ttl: The time (in seconds) after which the drawings are dropped if they have not been sent yet. Defaults to None.
+        :type ttl: float or None
+
+        :return: The outcome of the transmission of each drawing.
+        :rtype: `list[BTSendResult]`
+
+        :raises `BTException`: If a drawing could not be sent.
+
+        """
+
+        return [await self.send_drawing(drawing, priority, ttl) for drawing in drawings]
+
+    async def clear_screen(self, color: Optional[Color] = None, priority: Priority = Priority.NORMAL) -> BTSendResult:
+        """
+        Reset what is displayed.
+
+        :param color: The color to use to clear the screen. Defaults to None.
+        :type color: Color or None
+        :param priority: The priority of the clear. Defaults to `Priority.NORMAL`.
+        :type priority: `Priority`
+
+        :return: The outcome of the transmission.
+        :rtype: `BTSendResult`
+
+        """
+
+        result = await self.client.request("clear_screen",
+                                           device=self.address,
+                                           color=protocol.color_to_json(color),
+                                           priority=int(priority))
+        return protocol.result_from_json(result)
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Get the counters of the traffic sent to the device by all the clients.
+
+        :return: The counters, as returned by `BTDeviceStats.to_json`.
+        :rtype: dict
+
+        """
+
+        return await self.client.request("stats", device=self.address)
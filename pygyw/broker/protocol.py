@@ -0,0 +1,247 @@
+"""
+Messages exchanged between the broker and its clients.
+
+Each message is a JSON object on a single line. A request holds an "id", chosen by the client, and an "op". The
+broker answers each request with a message holding the same "id" and either "result" or "error":
+
+    {"id": 1, "op": "send_drawing", "device": "AA:BB:CC:DD:EE:FF", "drawing": {"type": "text", "text": "Hi"}}
+    {"id": 1, "result": {"status": "sent", "commands": 2, ...}}
+
+Encoded commands are sent as [characteristic, base64 data] pairs and colors as "RRGGBBAA" hexadecimal strings.
+
+"""
+import asyncio
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+from ..bluetooth import commands
+from ..bluetooth.exceptions import BTException
+from ..bluetooth.writer import BTSendResult, SendStatus
+from ..layout import drawings, fonts, icons
+from ..layout.color import Color
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    Serialize a message.
+
+    :param message: The message.
+    :type message: dict
+
+    :return: The line to write on the socket.
+    :rtype: bytes
+
+    """
+
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read the next message from a socket.
+
+    :param reader: The reading end of the socket.
+    :type reader: `asyncio.StreamReader`
+
+    :return: The message, or None once the socket is closed.
+    :rtype: dict or None
+
+    :raises `BTException`: If the message is malformed or too long.
+
+    """
+
+    try:
+        line = await reader.readline()
+    except (asyncio.LimitOverrunError, ValueError) as e:
+        raise BTException(f"Message too long: {e}") from e
+
+    if not line:
+        return None
+
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise BTException(f"Malformed message: {e}") from e
+    if not isinstance(message, dict):
+        raise BTException("Malformed message: not an object")
+    return message
+
+
+def commands_to_json(bt_commands: "list[commands.BTCommand]") -> List[List[str]]:
+    """
+    Serialize encoded commands.
+
+    :param bt_commands: The commands.
+    :type bt_commands: `list[commands.BTCommand]`
+
+    :return: A [characteristic, base64 data] pair per command.
+    :rtype: `list[list[str]]`
+
+    """
+
+    return [[command.characteristic, base64.b64encode(command.view()).decode("ascii")] for command in bt_commands]
+
+
+def commands_from_json(data: List[List[str]]) -> "list[commands.BTCommand]":
+    """
+    Deserialize encoded commands.
+
+    :param data: A [characteristic, base64 data] pair per command.
+    :type data: `list[list[str]]`
+
+    :return: The commands.
+    :rtype: `list[commands.BTCommand]`
+
+    :raises `BTException`: If the commands are malformed.
+
+    """
+
+    try:
+        return [commands.BTCommand(characteristic, base64.b64decode(payload, validate=True))
+                for characteristic, payload in data]
+    except (TypeError, ValueError) as e:
+        raise BTException(f"Malformed commands: {e}") from e
+
+
+def color_to_json(color: Optional[Color]) -> Optional[str]:
+    """
+    Serialize a color.
+
+    :param color: The color, or None.
+    :type color: `Color` or None
+
+    :return: The color as a "RRGGBBAA" hexadecimal string, or None.
+    :rtype: str or None
+
+    """
+
+    if color is None:
+        return None
+    return f"{color.red:02x}{color.green:02x}{color.blue:02x}{color.alpha:02x}"
+
+
+def color_from_json(data: Optional[str]) -> Optional[Color]:
+    """
+    Deserialize a color.
+
+    :param data: The color as a RGB, RGBA, RRGGBB or RRGGBBAA hexadecimal string, or None.
+    :type data: str or None
+
+    :return: The color, or None.
+    :rtype: `Color` or None
+
+    """
+
+    return Color.from_hex(data.lstrip("#")) if data is not None else None
+
+
+def _font_from_json(name: str) -> fonts.GYWFont:
+    for font in fonts.GYWFonts.values:
+        if name in (font.filename, font.name):
+            return font
+    raise BTException(f"Unknown font: {name}")
+
+
+def _icon_from_json(name: str) -> icons.GYWIcon:
+    for icon in icons.GYWIcons.values:
+        if icon.name == name:
+            return icon
+    return icons.GYWIcon(name)
+
+
+def drawing_to_json(drawing: drawings.GYWDrawing) -> Dict[str, Any]:
+    """
+    Serialize a drawing.
+
+    :param drawing: The drawing.
+    :type drawing: `drawings.GYWDrawing`
+
+    :return: The drawing as a JSON object.
+    :rtype: dict
+
+    :raises `BTException`: If the type of drawing is not supported.
+
+    """
+
+    data: Dict[str, Any] = {"type": drawing.drawing_type, "left": drawing.left, "top": drawing.top}
+    if isinstance(drawing, drawings.TextDrawing):
+        data.update(text=drawing.text, font=drawing.font.filename, size=drawing.size, color=color_to_json(drawing.color),
+                    max_width=drawing.max_width, max_lines=drawing.max_lines)
+    elif isinstance(drawing, drawings.IconDrawing):
+        data.update(icon=drawing.icon.name, color=color_to_json(drawing.color), scale=drawing.scale)
+    elif isinstance(drawing, drawings.RectangleDrawing):
+        data.update(width=drawing.width, height=drawing.height, color=color_to_json(drawing.color))
+    elif isinstance(drawing, drawings.SpinnerDrawing):
+        data.update(color=color_to_json(drawing.color), scale=drawing.scale,
+                    animation_timing_function=int(drawing.animation_timing_function),
+                    spins_per_second=drawing.spins_per_second)
+    else:
+        raise BTException(f"Unsupported drawing: {drawing}")
+    return data
+
+
+def drawing_from_json(data: Dict[str, Any]) -> drawings.GYWDrawing:
+    """
+    Deserialize a drawing.
+
+    Omitted fields take the default values of the drawing.
+
+    :param data: The drawing as a JSON object.
+    :type data: dict
+
+    :return: The drawing.
+    :rtype: `drawings.GYWDrawing`
+
+    :raises `BTException`: If the drawing is malformed.
+
+    """
+
+    try:
+        fields = dict(data)
+        drawing_type = fields.pop("type")
+        if "color" in fields:
+            fields["color"] = color_from_json(fields["color"])
+
+        if drawing_type == "text":
+            if "font" in fields:
+                fields["font"] = _font_from_json(fields["font"])
+            if fields.get("color") is None:
+                fields.pop("color", None)
+            return drawings.TextDrawing(**fields)
+        elif drawing_type == "icon":
+            fields["icon"] = _icon_from_json(fields["icon"])
+            return drawings.IconDrawing(**fields)
+        elif drawing_type == "rectangle":
+            return drawings.RectangleDrawing(**fields)
+        elif drawing_type == "spinner":
+            if "animation_timing_function" in fields:
+                fields["animation_timing_function"] = drawings.AnimationTimingFunction(fields["animation_timing_function"])
+            if fields.get("color") is None:
+                fields.pop("color", None)
+            return drawings.SpinnerDrawing(**fields)
+    except BTException:
+        raise
+    except (AssertionError, KeyError, TypeError, ValueError) as e:
+        raise BTException(f"Malformed drawing: {e!r}") from e
+
+    raise BTException(f"Unknown drawing type: {drawing_type}")
+
+
+def result_from_json(data: Dict[str, Any]) -> BTSendResult:
+    """
+    Deserialize the outcome of a transmission, as returned by `BTSendResult.to_json`.
+
+    :param data: The outcome as a JSON object.
+    :type data: dict
+
+    :return: The outcome.
+    :rtype: `BTSendResult`
+
+    """
+
+    result = BTSendResult(data["commands"], data["writes"], data["bytes_sent"], SendStatus(data["status"]))
+    result.retries = data["retries"]
+    result.queued_time = data["queued_time"]
+    result.send_time = data["send_time"]
+    return result
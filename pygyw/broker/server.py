@@ -0,0 +1,322 @@
+import asyncio
+import itertools
+import logging
+import os
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from . import protocol, settings
+from ..bluetooth import commands
+from ..bluetooth.device import BTDevice
+from ..bluetooth.exceptions import BTException
+from ..bluetooth.supervisor import BTSupervisor
+from ..bluetooth.writer import BTSendResult, Priority
+from ..layout import cache, encoders
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingJob:
+    """Commands of a client waiting for their turn on a device."""
+
+    def __init__(self, bt_commands: "list[commands.BTCommand]", priority: Priority, deadline: Optional[float]):
+        self.commands = bt_commands
+        self.priority = priority
+        self.deadline = deadline
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _DeviceChannel:
+    """
+    Shares a device between the clients of the broker.
+
+    The commands of each client wait in a queue of their own. The channel hands them over to the queue of the device
+    in turn, one client after the other, so that a client sending many drawings does not delay the others. The most
+    urgent drawings are handed over first, and only `settings.device_window` drawings are in the queue of the device
+    at the same time, so that the turns are decided as late as possible.
+    """
+
+    def __init__(self, device: BTDevice):
+        self.device = device
+        self.queues: "OrderedDict[int, Deque[_PendingJob]]" = OrderedDict()
+        self.__ready = asyncio.Event()
+        self.__window = asyncio.Semaphore(settings.device_window)
+        self.__task = asyncio.get_running_loop().create_task(self.__run())
+
+    def put(self, client_id: int, job: _PendingJob) -> asyncio.Future:
+        self.queues.setdefault(client_id, deque()).append(job)
+        self.__ready.set()
+        return job.future
+
+    def drop_client(self, client_id: int):
+        for job in self.queues.pop(client_id, ()):
+            job.future.cancel()
+
+    async def close(self):
+        self.__task.cancel()
+        try:
+            await self.__task
+        except asyncio.CancelledError:
+            pass
+        for client_id in list(self.queues):
+            self.drop_client(client_id)
+
+    def __next_job(self) -> Optional[_PendingJob]:
+        # The first client in turn among those whose next drawing is the most urgent.
+        chosen = None
+        for client_id, queue in self.queues.items():
+            if queue and (chosen is None or queue[0].priority < self.queues[chosen][0].priority):
+                chosen = client_id
+        if chosen is None:
+            return None
+
+        self.queues.move_to_end(chosen)
+        return self.queues[chosen].popleft()
+
+    async def __run(self):
+        while True:
+            job = self.__next_job()
+            if job is None:
+                self.__ready.clear()
+                await self.__ready.wait()
+                continue
+
+            await self.__window.acquire()
+            if job.future.done():
+                self.__window.release()
+                continue
+
+            try:
+                device_future = await self.device.submit_commands(job.commands, job.priority, deadline=job.deadline)
+            except Exception as e:
+                self.__window.release()
+                job.future.set_exception(e)
+                continue
+
+            device_future.add_done_callback(lambda future, job=job: self.__on_sent(future, job))
+
+    def __on_sent(self, device_future: asyncio.Future, job: _PendingJob):
+        self.__window.release()
+        if job.future.done():
+            return
+        if device_future.cancelled():
+            job.future.cancel()
+        elif device_future.exception() is not None:
+            job.future.set_exception(device_future.exception())
+        else:
+            job.future.set_result(device_future.result())
+
+
+class BTBroker:
+    """
+    A service owning the connections to the devices and sharing them between local processes.
+
+    Only one process can be connected to a device. The broker keeps the devices connected and supervised, and
+    accepts drawings (encoded commands or JSON drawings) from any number of clients on a Unix domain socket. The
+    drawings sent to the same device by different clients are sent in turn. See `protocol` for the messages.
+
+    Attributes:
+        path: The path of the Unix domain socket.
+        devices: The devices handled by the broker, by address.
+
+    """
+
+    def __init__(self,
+                 path: str = settings.socket_path,
+                 device_factory: Callable[[str], BTDevice] = BTDevice):
+        """
+        Initialize a new instance of the `BTBroker` class.
+
+        :param path: The path of the Unix domain socket. Defaults to `settings.socket_path`.
+        :type path: str
+        :param device_factory: Builds the device of an address. Defaults to `BTDevice`.
+        :type device_factory: callable
+
+        """
+
+        self.path = path
+        self.devices: Dict[str, BTDevice] = {}
+        self.__device_factory = device_factory
+        self.__channels: Dict[str, _DeviceChannel] = {}
+        self.__clients: Dict[int, asyncio.StreamWriter] = {}
+        self.__client_ids = itertools.count(1)
+        self.__server: Optional[asyncio.AbstractServer] = None
+
+    def __str__(self) -> str:
+        return f"Broker of {len(self.devices)} devices on {self.path} ({len(self.__clients)} clients)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    async def start(self):
+        """
+        Listen on the socket.
+
+        :raises `BTException`: If another broker is already listening on the socket.
+
+        """
+
+        if self.__server is not None:
+            return
+
+        if os.path.exists(self.path):
+            try:
+                _, writer = await asyncio.open_unix_connection(self.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # A socket left behind by a broker that did not stop cleanly.
+                if os.path.exists(self.path):
+                    os.unlink(self.path)
+            else:
+                writer.close()
+                raise BTException(f"A broker is already listening on {self.path}")
+        self.__server = await asyncio.start_unix_server(self.__serve, self.path, limit=settings.message_size_limit)
+        logger.info(f"Broker listening on {self.path}")
+
+    async def stop(self):
+        """Stop listening, close the connections with the clients and disconnect the devices."""
+
+        if self.__server is None:
+            return
+
+        self.__server.close()
+        for writer in list(self.__clients.values()):
+            writer.close()
+        await self.__server.wait_closed()
+        self.__server = None
+        for channel in self.__channels.values():
+            await channel.close()
+        await asyncio.gather(*(device.disconnect() for device in self.devices.values()), return_exceptions=True)
+        self.__channels.clear()
+        self.devices.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        logger.info("Broker stopped")
+
+    async def serve_forever(self):
+        """Listen on the socket until cancelled."""
+
+        await self.start()
+        try:
+            await asyncio.Future()
+        finally:
+            await self.stop()
+
+    async def add_device(self, address: str, timeout: Optional[float] = settings.connect_timeout) -> BTDevice:
+        """
+        Connect a device and keep it connected.
+
+        :param address: The MAC address of the device.
+        :type address: str
+        :param timeout: The maximum time (in seconds) to wait for the connection. Defaults to
+            `settings.connect_timeout`. The broker keeps trying to connect after the timeout.
+        :type timeout: float or None
+
+        :return: The device.
+        :rtype: `BTDevice`
+
+        :raises `BTException`: If the device could not be connected before the timeout.
+
+        """
+
+        if address not in self.devices:
+            device = self.__device_factory(address)
+            self.devices[address] = device
+            self.__channels[address] = _DeviceChannel(device)
+            await BTSupervisor(device).start()
+
+        device = self.devices[address]
+        try:
+            await asyncio.wait_for(asyncio.shield(device.supervisor.wait_connected()), timeout)
+        except asyncio.TimeoutError:
+            raise BTException(f"Device {address} not connected yet") from None
+        return device
+
+    def __channel(self, address: str) -> _DeviceChannel:
+        try:
+            return self.__channels[address]
+        except KeyError:
+            raise BTException(f"Device {address} is not connected to the broker") from None
+
+    def __job(self, request: Dict[str, Any], bt_commands: "list[commands.BTCommand]") -> _PendingJob:
+        ttl = request.get("ttl")
+        deadline = asyncio.get_running_loop().time() + ttl if ttl is not None else None
+        return _PendingJob(bt_commands, Priority(request.get("priority", Priority.NORMAL)), deadline)
+
+    async def __send(self, client_id: int, request: Dict[str, Any], bt_commands: "list[commands.BTCommand]") -> Dict[str, Any]:
+        channel = self.__channel(request["device"])
+        result: BTSendResult = await channel.put(client_id, self.__job(request, bt_commands))
+        return result.to_json()
+
+    async def __handle(self, client_id: int, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "devices":
+            return [{"address": address, "connected": device.transport.is_connected}
+                    for address, device in self.devices.items()]
+        elif op == "connect":
+            device = await self.add_device(request["device"], request.get("timeout", settings.connect_timeout))
+            return {"mtu": device.mtu, "packet_size": device.packet_size}
+        elif op == "send_commands":
+            return await self.__send(client_id, request, protocol.commands_from_json(request["commands"]))
+        elif op == "send_drawing":
+            drawing = protocol.drawing_from_json(request["drawing"])
+            return await self.__send(client_id, request, cache.command_cache.get(drawing))
+        elif op == "clear_screen":
+            data = encoders.encode_clear(protocol.color_from_json(request.get("color")))
+            clear_commands = [commands.BTCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, data)]
+            return await self.__send(client_id, request, clear_commands)
+        elif op == "stats":
+            return self.__channel(request["device"]).device.stats.to_json()
+        raise BTException(f"Unknown operation: {op}")
+
+    async def __answer(self, client_id: int, writer: asyncio.StreamWriter, lock: asyncio.Lock, request: Dict[str, Any]):
+        try:
+            response = {"id": request.get("id"), "result": await self.__handle(client_id, request)}
+        except asyncio.CancelledError:
+            response = {"id": request.get("id"), "error": "Cancelled"}
+        except Exception as e:
+            if not isinstance(e, BTException):
+                logger.exception(f"Request {request.get('op')} of client {client_id} failed")
+            response = {"id": request.get("id"), "error": f"{type(e).__name__}: {e}"}
+
+        try:
+            await self.__reply(writer, lock, response)
+        except ConnectionError as e:
+            logger.debug(f"Answer to client {client_id} lost: {e}")
+
+    @staticmethod
+    async def __reply(writer: asyncio.StreamWriter, lock: asyncio.Lock, message: Dict[str, Any]):
+        # The requests of a client are answered concurrently, but concurrent drains of the same writer fail before
+        # Python 3.10: the answers are written in turn.
+        async with lock:
+            if not writer.is_closing():
+                writer.write(protocol.encode_message(message))
+                await writer.drain()
+
+    async def __serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client_id = next(self.__client_ids)
+        self.__clients[client_id] = writer
+        logger.debug(f"Client {client_id} connected")
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request = await protocol.read_message(reader)
+                except BTException as e:
+                    await self.__reply(writer, lock, {"id": None, "error": str(e)})
+                    break
+                if request is None:
+                    break
+                task = asyncio.get_running_loop().create_task(self.__answer(client_id, writer, lock, request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            del self.__clients[client_id]
+            for channel in self.__channels.values():
+                channel.drop_client(client_id)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            logger.debug(f"Client {client_id} disconnected")
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# Path of the Unix domain socket on which the broker listens
+socket_path = os.path.join(os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(), "pygyw.sock")
+
+# Maximum size (in bytes) of a message exchanged with the broker
+message_size_limit = 16 * 1024 * 1024
+
+# Maximum number of drawings handed over to the queue of a device at the same time. The others wait in the queues of
+# their clients, from which the broker picks them in turn.
+device_window = 2
+
+# Time (in seconds) given to the broker to connect a device before answering a client
+connect_timeout = 10.0
@@ -4,3 +4,6 @@ from . import helpers
 from . import icons
 from . import settings
 from . import color
+from . import cache
+from . import encoders
+from . import templates
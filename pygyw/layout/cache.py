@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+from . import settings
+from .drawings import GYWDrawing
+from ..bluetooth import commands
+
+
+class GYWCommandCache:
+    """
+    A least-recently-used cache of the commands of drawings.
+
+    The commands are stored under the `cache_key()` of the drawing, built from the current values of its attributes:
+    two drawings with the same content share the same commands, and a drawing modified after it was encoded is
+    encoded again. Drawings without a key (e.g. custom drawings) are always encoded.
+
+    The cache is bounded both in number of drawings and in total size of their commands. The cached commands are
+    immutable commands over read-only views, shared by every caller.
+
+    Attributes:
+        max_entries: The maximum number of drawings in the cache.
+        max_bytes: The maximum total size (in bytes) of the commands in the cache.
+        hits: The number of drawings found in the cache.
+        misses: The number of drawings encoded.
+        evictions: The number of drawings removed from the cache to respect its bounds.
+
+    """
+
+    def __init__(self, max_entries: int = settings.command_cache_size, max_bytes: int = settings.command_cache_bytes):
+        """
+        Initialize a new, empty `GYWCommandCache`.
+
+        :param max_entries: The maximum number of drawings in the cache. Defaults to `settings.command_cache_size`.
+        :type max_entries: int
+        :param max_bytes: The maximum total size (in bytes) of the commands in the cache. Defaults to
+            `settings.command_cache_bytes`.
+        :type max_bytes: int
+
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries: "OrderedDict[Hashable, Tuple[Tuple[commands.BTCommand, ...], int]]" = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"Command cache of {len(self)} drawings ({self.__bytes} bytes, {self.hit_ratio:.0%} hits)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """The total size (in bytes) of the commands in the cache."""
+
+        return self.__bytes
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of the drawings found in the cache, between 0 and 1."""
+
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, drawing: GYWDrawing) -> "list[commands.BTCommand]":
+        """
+        Return the commands of a drawing, encoding it only if its content is not in the cache.
+
+        :param drawing: The drawing.
+        :type drawing: `GYWDrawing`
+
+        :return: The commands of the drawing.
+        :rtype: `list[commands.BTCommand]`
+
+        """
+
+        key = drawing.cache_key()
+        if key is None:
+            return drawing.to_commands()
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[0])
+            self.misses += 1
+
+        bt_commands = tuple(commands.BTFrozenCommand(command.characteristic, command.view().toreadonly())
+                            for command in drawing.to_commands())
+        size = sum(len(command.data) for command in bt_commands)
+
+        with self.__lock:
+            if size <= self.max_bytes and self.max_entries > 0 and key not in self.__entries:
+                self.__entries[key] = (bt_commands, size)
+                self.__bytes += size
+                self.__evict()
+
+        return list(bt_commands)
+
+    def __evict(self):
+        while len(self.__entries) > self.max_entries or self.__bytes > self.max_bytes:
+            _, (_, size) = self.__entries.popitem(last=False)
+            self.__bytes -= size
+            self.evictions += 1
+
+    def invalidate(self, drawing: GYWDrawing) -> bool:
+        """
+        Remove the commands of a drawing from the cache.
+
+        Modifying a drawing is enough for its new content to be encoded: this only frees the space of its current
+        content.
+
+        :param drawing: The drawing.
+        :type drawing: `GYWDrawing`
+
+        :return: Whether the drawing was in the cache.
+        :rtype: bool
+
+        """
+
+        key = drawing.cache_key()
+        with self.__lock:
+            entry = self.__entries.pop(key, None) if key is not None else None
+            if entry is None:
+                return False
+            self.__bytes -= entry[1]
+            return True
+
+    def clear(self):
+        """Remove every drawing from the cache. The statistics are kept."""
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def reset_stats(self):
+        """Reset the statistics to zero."""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return a JSON-serializable dictionary of the object."""
+
+        return {
+            "entries": len(self),
+            "bytes": self.__bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "evictions": self.evictions,
+        }
+
+
+# The cache shared by the devices, the fleets and the broker.
+command_cache = GYWCommandCache()
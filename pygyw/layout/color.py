@@ -52,11 +52,7 @@ class Color:
                        int(color[6:8], 16))
 
     def to_rgba8888_bytes(self) -> bytes:
-        red = self.red.to_bytes(1, "little")
-        green = self.green.to_bytes(1, "little")
-        blue = self.blue.to_bytes(1, "little")
-        alpha = self.alpha.to_bytes(1, "little")
-        return red + green + blue + alpha
+        return bytes((self.red, self.green, self.blue, self.alpha))
 
 
 class Colors:
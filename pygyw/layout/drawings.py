@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import copy
 import textwrap
 from enum import IntEnum
 from math import ceil
-from typing import Any
+from typing import Any, Hashable, Optional
 
+from . import encoders
 from . import fonts
 from . import icons
-from .helpers import byte_from_scale_float, clamp
+from .helpers import clamp, int_from_scale_float
 from .settings import screen_width
 from ..bluetooth import commands
 from .color import Color, Colors
@@ -24,6 +26,9 @@ class GYWDrawing:
 
     """
 
+    # No "__dict__": only the attributes of the drawing can be set.
+    __slots__ = ("drawing_type", "left", "top", "__weakref__")
+
     def __init__(self, drawing_type: str, left: int = 0, top: int = 0):
         """
         Initialize a `GYWDrawing` object.
@@ -54,6 +59,54 @@ class GYWDrawing:
             "top": self.top,
         }
 
+    def freeze(self) -> "GYWDrawing":
+        """
+        Return an immutable copy of the drawing, equal to and hashed like the immutable drawings with the same content.
+
+        Immutable drawings can be used as dictionary keys.
+
+        :return: The immutable drawing, e.g. a `FrozenTextDrawing` for a `TextDrawing`.
+        :rtype: `GYWDrawing`
+
+        :raises `TypeError`: If the type of the drawing has no immutable variant.
+
+        """
+
+        frozen_type = _FROZEN_TYPES.get(type(self))
+        if frozen_type is None:
+            raise TypeError(f"{type(self).__name__} has no immutable variant")
+        return _copy_slots(self, frozen_type)
+
+    def replace(self, **changes) -> "GYWDrawing":
+        """
+        Return a copy of the drawing with some attributes changed.
+
+        :param changes: The new values of the attributes, by name.
+
+        :return: The new drawing, of the same type.
+        :rtype: `GYWDrawing`
+
+        """
+
+        drawing = copy.copy(self)
+        for name, value in changes.items():
+            setattr(drawing, name, value)
+        return drawing
+
+    def cache_key(self) -> Optional[Hashable]:
+        """
+        Return a key identifying the content of the drawing, used to cache its commands.
+
+        The key is built from the current values of the attributes, so a drawing modified after it was encoded gets
+        a new key. Drawings with the same key are encoded into the same commands.
+
+        :return: The key, or None if the commands of the drawing must not be cached.
+        :rtype: Hashable or None
+
+        """
+
+        return None
+
     def to_commands(self) -> "list[commands.BTCommand]":
         """
         Convert the `GYWDrawing` into a list of commands understood by the aRdent Bluetooth device.
@@ -66,6 +119,10 @@ class GYWDrawing:
         return []
 
 
+# The whitespace characters replaced by spaces by `textwrap.wrap`, besides the space itself.
+_WRAPPED_WHITESPACE = frozenset("\t\n\x0b\x0c\r")
+
+
 class TextDrawing(GYWDrawing):
     """
     Represents a text element displayed on the screen.
@@ -83,6 +140,8 @@ class TextDrawing(GYWDrawing):
                    All extra lines will be ignored. The value 0 is special and disables the limit.
     """
 
+    __slots__ = ("text", "font", "size", "color", "max_width", "max_lines")
+
     def __init__(self,
                  text: str,
                  left: int = 0,
@@ -131,6 +190,10 @@ class TextDrawing(GYWDrawing):
         data["max_lines"] = self.max_lines
         return data
 
+    def cache_key(self) -> Optional[Hashable]:
+        return (type(self), self.text, self.left, self.top, self.font.filename, self.size, self.color,
+                self.max_width, self.max_lines)
+
     @property
     def wrapped_text(self) -> str:
         """
@@ -157,15 +220,29 @@ class TextDrawing(GYWDrawing):
 
         char_height = ceil(self.size * 1.33)
 
-        commands = []
+        lines = [line.encode('utf-8') for line in self._wrap_text()]
+        buffer = commands.BTCommandBuffer(sum(map(len, lines)) + len(lines) * encoders.TEXT_LAYOUT.size)
         current_top = self.top
-        for line in self._wrap_text():
-            commands.extend(self._line_to_commands(line, current_top))
+        for line in lines:
+            self._write_line(buffer, line, current_top)
             current_top += char_height
 
-        return commands
+        return buffer.to_commands()
+
+    def _wrap_text(self, text: Optional[str] = None) -> "list[str]":
+        """
+        Wrap a text on lines constrained by the attributes of the drawing.
+
+        :param text: The text to wrap. Defaults to None (the text of the drawing).
+        :type text: str or None
+
+        :return: The lines of text.
+        :rtype: list[str]
+
+        """
+        if text is None:
+            text = self.text
 
-    def _wrap_text(self) -> "list[str]":
         # An invalid value will be considered as unconstrained.
         max_width = None if self.max_width is not None and self.max_width < 1 else self.max_width
         max_lines = max(0, self.max_lines)
@@ -180,40 +257,36 @@ class TextDrawing(GYWDrawing):
         char_width = ceil(self.size * 0.6)
         max_chars_per_line = text_width // char_width
 
-        lines = textwrap.wrap(self.text, width=max_chars_per_line)
+        if 0 < len(text) <= max_chars_per_line and text == text.strip() and not _WRAPPED_WHITESPACE.intersection(text):
+            # What `textwrap.wrap` returns for a short text without whitespace to replace or drop, without its cost.
+            return [text]
+
+        lines = textwrap.wrap(text, width=max_chars_per_line)
         if max_lines > 0:
             lines = lines[:max_lines]
 
         return lines
 
-    def _line_to_commands(self, line: str, top: int) -> "list[commands.BTCommand]":
+    def _write_line(self, buffer: commands.BTCommandBuffer, line: bytes, top: int):
         """
-        Convert a line of text into a list of commands understood by the aRdent Bluetooth device.
+        Write the commands displaying a line of text into a buffer.
 
-        :return: The list of `commands.BTCommand` that describes the Bluetooth instructions to perform.
-        :rtype: `list[commands.BTCommand]`
+        :param buffer: The buffer in which the commands are written.
+        :type buffer: `commands.BTCommandBuffer`
+        :param line: The line of text, encoded in UTF-8.
+        :type line: bytes
+        :param top: The vertical offset of the line.
+        :type top: int
 
         """
-        # Generate control instruction
-        ctrl_data = bytearray([commands.ControlCodes.DRAW_TEXT])
-        ctrl_data += self.left.to_bytes(2, 'little', signed=True)
-        ctrl_data += top.to_bytes(2, 'little', signed=True)
-        ctrl_data += bytes(self.font.filename, 'utf-8')
-        ctrl_data += self.size.to_bytes(1, 'little')
-        ctrl_data += self.color.to_rgba8888_bytes()
-
-        return [
-            # Text data
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_DATA,
-                bytes(line, 'utf-8'),
-            ),
-            # Control
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_COMMAND,
-                ctrl_data,
-            ),
-        ]
+        # Text data
+        buffer.write(line)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
+
+        # Control
+        offset = buffer.reserve(encoders.TEXT_LAYOUT.size)
+        encoders.pack_text(buffer.buffer, offset, self.left, top, self.font, self.size, self.color)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
 
 
 class IconDrawing(GYWDrawing):
@@ -229,6 +302,8 @@ class IconDrawing(GYWDrawing):
 
     """
 
+    __slots__ = ("icon", "color", "scale")
+
     def __init__(self,
                  icon: icons.GYWIcon,
                  left: int = 0,
@@ -264,6 +339,9 @@ class IconDrawing(GYWDrawing):
         data["scale"] = self.scale
         return data
 
+    def cache_key(self) -> Optional[Hashable]:
+        return (type(self), self.icon.name if self.icon else None, self.left, self.top, self.color, self.scale)
+
     def to_commands(self) -> "list[commands.BTCommand]":
         """
         Convert the `IconDrawing` into a list of commands understood by the aRdent Bluetooth device.
@@ -278,23 +356,16 @@ class IconDrawing(GYWDrawing):
         if not self.icon:
             return operations
 
-        left = self.left.to_bytes(2, 'little', signed=True)
-        top = self.top.to_bytes(2, 'little', signed=True)
-        ctrl_data = bytearray([commands.ControlCodes.DRAW_IMAGE]) + left + top
+        filename = f"{self.icon.name}.svg".encode('utf-8')
+        buffer = commands.BTCommandBuffer(len(filename) + encoders.IMAGE_LAYOUT.size)
+        buffer.write(filename)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
 
-        ctrl_data += self.color.to_rgba8888_bytes() if self.color is not None else bytearray([0, 0, 0, 0])
-        ctrl_data += byte_from_scale_float(self.scale)
+        offset = buffer.reserve(encoders.IMAGE_LAYOUT.size)
+        encoders.pack_image(buffer.buffer, offset, self.left, self.top, self.color, int_from_scale_float(self.scale))
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
 
-        operations.extend([
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_DATA,
-                bytes(f"{self.icon.name}.svg", 'utf-8'),
-            ),
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_COMMAND,
-                ctrl_data,
-            ),
-        ])
+        operations.extend(buffer.to_commands())
 
         return operations
 
@@ -311,6 +382,8 @@ class RectangleDrawing(GYWDrawing):
         color: The fill color. Defaults to None in which case the current background color is used.
     """
 
+    __slots__ = ("width", "height", "color")
+
     def __init__(self,
                  left: int,
                  top: int,
@@ -329,25 +402,20 @@ class RectangleDrawing(GYWDrawing):
         data["color"] = str(self.color)
         return data
 
+    def cache_key(self) -> Optional[Hashable]:
+        return (type(self), self.left, self.top, self.width, self.height, self.color)
+
     def to_commands(self) -> "list[commands.BTCommand]":
         """Convert this `RectangleDrawing` into a list of commands."""
 
         operations = super().to_commands()
 
-        left = self.left.to_bytes(2, 'little', signed=True)
-        top = self.top.to_bytes(2, 'little', signed=True)
-        width = self.width.to_bytes(2, 'little')
-        height = self.height.to_bytes(2, 'little')
-        color = self.color.to_rgba8888_bytes() if self.color is not None else bytearray([0, 0, 0, 0])
-
-        ctrl_data = bytearray([commands.ControlCodes.DRAW_RECTANGLE]) + left + top + width + height + color
+        buffer = commands.BTCommandBuffer(encoders.RECTANGLE_LAYOUT.size)
+        offset = buffer.reserve(encoders.RECTANGLE_LAYOUT.size)
+        encoders.pack_rectangle(buffer.buffer, offset, self.left, self.top, self.width, self.height, self.color)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
 
-        operations.append(
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_COMMAND,
-                ctrl_data,
-            ),
-        )
+        operations.extend(buffer.to_commands())
 
         return operations
 
@@ -360,6 +428,10 @@ class AnimationTimingFunction(IntEnum):
     EASE_OUT = 2
 
 
+# The image of the spinner stored on the device.
+SPINNER_FILENAME = b"spinner_1.svg"
+
+
 class SpinnerDrawing(GYWDrawing):
     """
     Animated spinner and that can be displayed on the screen.
@@ -374,6 +446,8 @@ class SpinnerDrawing(GYWDrawing):
 
     """
 
+    __slots__ = ("color", "scale", "animation_timing_function", "spins_per_second")
+
     def __init__(self,
                  left: int = 0,
                  top: int = 0,
@@ -397,6 +471,10 @@ class SpinnerDrawing(GYWDrawing):
         data["spins_per_second"] = self.spins_per_second
         return data
 
+    def cache_key(self) -> Optional[Hashable]:
+        return (type(self), self.left, self.top, self.color, self.scale, self.animation_timing_function,
+                self.spins_per_second)
+
     def to_commands(self) -> "list[commands.BTCommand]":
         """
         Convert the `SpinnerDrawing` into a list of commands understood by the aRdent Bluetooth device.
@@ -408,25 +486,115 @@ class SpinnerDrawing(GYWDrawing):
 
         operations = super().to_commands()
 
-        left = self.left.to_bytes(2, 'little', signed=True)
-        top = self.top.to_bytes(2, 'little', signed=True)
-        ctrl_data = bytearray([commands.ControlCodes.DRAW_SPINNER]) + left + top
-        ctrl_data += self.color.to_rgba8888_bytes()
-        ctrl_data += byte_from_scale_float(self.scale)
-        ctrl_data += self.animation_timing_function.value.to_bytes(1, 'little')
+        buffer = commands.BTCommandBuffer(len(SPINNER_FILENAME) + encoders.SPINNER_LAYOUT.size)
+        buffer.write(SPINNER_FILENAME)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_DATA)
 
         spins_per_second = int(clamp(self.spins_per_second, 0.0, 25.5) * 10)
-        ctrl_data += spins_per_second.to_bytes(1, 'little')
-
-        operations.extend([
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_DATA,
-                bytes("spinner_1.svg", 'utf-8'),
-            ),
-            commands.BTCommand(
-                commands.GYWCharacteristics.DISPLAY_COMMAND,
-                ctrl_data,
-            ),
-        ])
+        offset = buffer.reserve(encoders.SPINNER_LAYOUT.size)
+        encoders.pack_spinner(buffer.buffer, offset, self.left, self.top, self.color, int_from_scale_float(self.scale),
+                              self.animation_timing_function, spins_per_second)
+        buffer.end(commands.GYWCharacteristics.DISPLAY_COMMAND)
+
+        operations.extend(buffer.to_commands())
 
         return operations
+
+
+def _slot_names(drawing_type: type) -> "list[str]":
+    """Return the names of the attributes of a type of drawing."""
+    return [name for cls in drawing_type.__mro__ for name in cls.__dict__.get("__slots__", ())
+            if name not in ("_hash", "__weakref__")]
+
+
+def _copy_slots(drawing: GYWDrawing, drawing_type: type) -> GYWDrawing:
+    """Copy the attributes of a drawing into a new drawing of another type, without calling its constructor."""
+    result = drawing_type.__new__(drawing_type)
+    for name in _slot_names(type(drawing)):
+        if hasattr(drawing, name):
+            setattr(result, name, getattr(drawing, name))
+    return result
+
+
+class _FrozenDrawing:
+    """
+    Makes a type of drawing immutable, and its instances equal to and hashed like those with the same content.
+
+    Each attribute can only be set once, by the constructor.
+    """
+
+    __slots__ = ()
+
+    # The mutable type of drawing of which the class is the immutable variant.
+    mutable_type: type = GYWDrawing
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, _FrozenDrawing):
+            return NotImplemented
+        return self.cache_key() == other.cache_key()
+
+    def __hash__(self) -> int:
+        if not hasattr(self, "_hash"):
+            self._hash = hash(self.cache_key())
+        return self._hash
+
+    def freeze(self) -> GYWDrawing:
+        return self
+
+    def thaw(self) -> GYWDrawing:
+        """
+        Return a mutable copy of the drawing.
+
+        :return: The mutable drawing, e.g. a `TextDrawing` for a `FrozenTextDrawing`.
+        :rtype: `GYWDrawing`
+
+        """
+
+        return _copy_slots(self, self.mutable_type)
+
+    def replace(self, **changes) -> GYWDrawing:
+        drawing = self.thaw()
+        for name, value in changes.items():
+            setattr(drawing, name, value)
+        return drawing.freeze()
+
+
+class FrozenTextDrawing(_FrozenDrawing, TextDrawing):
+    """An immutable `TextDrawing`, which can be used as a dictionary key."""
+
+    __slots__ = ("_hash",)
+    mutable_type = TextDrawing
+
+
+class FrozenIconDrawing(_FrozenDrawing, IconDrawing):
+    """An immutable `IconDrawing`, which can be used as a dictionary key."""
+
+    __slots__ = ("_hash",)
+    mutable_type = IconDrawing
+
+
+class FrozenRectangleDrawing(_FrozenDrawing, RectangleDrawing):
+    """An immutable `RectangleDrawing`, which can be used as a dictionary key."""
+
+    __slots__ = ("_hash",)
+    mutable_type = RectangleDrawing
+
+
+class FrozenSpinnerDrawing(_FrozenDrawing, SpinnerDrawing):
+    """An immutable `SpinnerDrawing`, which can be used as a dictionary key."""
+
+    __slots__ = ("_hash",)
+    mutable_type = SpinnerDrawing
+
+
+# The immutable variant of each type of drawing.
+_FROZEN_TYPES = {frozen_type.mutable_type: frozen_type
+                 for frozen_type in (FrozenTextDrawing, FrozenIconDrawing, FrozenRectangleDrawing, FrozenSpinnerDrawing)}
@@ -0,0 +1,195 @@
+"""
+Encoders of the control commands sent to the display, built on precompiled `struct.Struct` layouts.
+
+Each `pack_*` function writes one control command in place into a caller-provided writable buffer (a `bytearray`,
+a `memoryview` or the `buffer` of a `commands.BTCommandBuffer`) at a given offset, and returns the offset following
+it. The buffer must already have room for the layout of the command (`*_LAYOUT.size` bytes).
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Optional
+
+from . import fonts
+from .color import Color
+from ..bluetooth.commands import ControlCodes
+
+# Control code, left, top, font filename, font size, RGBA color
+TEXT_LAYOUT = struct.Struct("<Bhh5sB4B")
+# Control code, left, top, RGBA color (0 to keep the colors of the image), scale
+IMAGE_LAYOUT = struct.Struct("<Bhh4Bb")
+# Control code, left, top, width, height, RGBA color (0 to use the background color)
+RECTANGLE_LAYOUT = struct.Struct("<BhhHH4B")
+# Control code, left, top, RGBA color, scale, animation timing function, spins per second (x10)
+SPINNER_LAYOUT = struct.Struct("<Bhh4BbBB")
+# Control code
+CLEAR_LAYOUT = struct.Struct("<B")
+# Control code, RGBA color
+CLEAR_COLOR_LAYOUT = struct.Struct("<B4B")
+
+
+def pack_text(buffer, offset: int, left: int, top: int, font: fonts.GYWFont, size: int, color: Color) -> int:
+    """
+    Write a DRAW_TEXT command into a buffer.
+
+    :param buffer: The writable buffer.
+    :param offset: The position of the command in the buffer.
+    :type offset: int
+    :param left: The horizontal offset of the text.
+    :type left: int
+    :param top: The vertical offset of the text.
+    :type top: int
+    :param font: The font of the text.
+    :type font: `fonts.GYWFont`
+    :param size: The font size.
+    :type size: int
+    :param color: The text color.
+    :type color: Color
+
+    :return: The offset following the command.
+    :rtype: int
+
+    """
+
+    TEXT_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_TEXT, left, top, font.filename.encode('utf-8'), size,
+                          color.red, color.green, color.blue, color.alpha)
+    return offset + TEXT_LAYOUT.size
+
+
+def pack_image(buffer, offset: int, left: int, top: int, color: Optional[Color], scale: int) -> int:
+    """
+    Write a DRAW_IMAGE command into a buffer.
+
+    :param buffer: The writable buffer.
+    :param offset: The position of the command in the buffer.
+    :type offset: int
+    :param left: The horizontal offset of the image.
+    :type left: int
+    :param top: The vertical offset of the image.
+    :type top: int
+    :param color: The color of the image, or None to keep its colors.
+    :type color: Color or None
+    :param scale: The scale, as returned by `helpers.int_from_scale_float`.
+    :type scale: int
+
+    :return: The offset following the command.
+    :rtype: int
+
+    """
+
+    if color is None:
+        IMAGE_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_IMAGE, left, top, 0, 0, 0, 0, scale)
+    else:
+        IMAGE_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_IMAGE, left, top,
+                               color.red, color.green, color.blue, color.alpha, scale)
+    return offset + IMAGE_LAYOUT.size
+
+
+def pack_rectangle(buffer, offset: int, left: int, top: int, width: int, height: int, color: Optional[Color]) -> int:
+    """
+    Write a DRAW_RECTANGLE command into a buffer.
+
+    :param buffer: The writable buffer.
+    :param offset: The position of the command in the buffer.
+    :type offset: int
+    :param left: The horizontal offset of the rectangle.
+    :type left: int
+    :param top: The vertical offset of the rectangle.
+    :type top: int
+    :param width: The width of the rectangle.
+    :type width: int
+    :param height: The height of the rectangle.
+    :type height: int
+    :param color: The fill color, or None to use the background color.
+    :type color: Color or None
+
+    :return: The offset following the command.
+    :rtype: int
+
+    """
+
+    if color is None:
+        RECTANGLE_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_RECTANGLE, left, top, width, height, 0, 0, 0, 0)
+    else:
+        RECTANGLE_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_RECTANGLE, left, top, width, height,
+                                   color.red, color.green, color.blue, color.alpha)
+    return offset + RECTANGLE_LAYOUT.size
+
+
+def pack_spinner(buffer,
+                 offset: int,
+                 left: int,
+                 top: int,
+                 color: Color,
+                 scale: int,
+                 animation_timing_function: int,
+                 spins_per_second: int) -> int:
+    """
+    Write a DRAW_SPINNER command into a buffer.
+
+    :param buffer: The writable buffer.
+    :param offset: The position of the command in the buffer.
+    :type offset: int
+    :param left: The horizontal offset of the spinner.
+    :type left: int
+    :param top: The vertical offset of the spinner.
+    :type top: int
+    :param color: The color of the spinner.
+    :type color: Color
+    :param scale: The scale, as returned by `helpers.int_from_scale_float`.
+    :type scale: int
+    :param animation_timing_function: The animation timing function.
+    :type animation_timing_function: int
+    :param spins_per_second: The number of spins per ten seconds.
+    :type spins_per_second: int
+
+    :return: The offset following the command.
+    :rtype: int
+
+    """
+
+    SPINNER_LAYOUT.pack_into(buffer, offset, ControlCodes.DRAW_SPINNER, left, top,
+                             color.red, color.green, color.blue, color.alpha,
+                             scale, animation_timing_function, spins_per_second)
+    return offset + SPINNER_LAYOUT.size
+
+
+def pack_clear(buffer, offset: int, color: Optional[Color] = None) -> int:
+    """
+    Write a CLEAR command into a buffer.
+
+    :param buffer: The writable buffer.
+    :param offset: The position of the command in the buffer.
+    :type offset: int
+    :param color: The color filling the screen, or None to use the last color.
+    :type color: Color or None
+
+    :return: The offset following the command.
+    :rtype: int
+
+    """
+
+    if color is None:
+        CLEAR_LAYOUT.pack_into(buffer, offset, ControlCodes.CLEAR)
+        return offset + CLEAR_LAYOUT.size
+
+    CLEAR_COLOR_LAYOUT.pack_into(buffer, offset, ControlCodes.CLEAR, color.red, color.green, color.blue, color.alpha)
+    return offset + CLEAR_COLOR_LAYOUT.size
+
+
+def encode_clear(color: Optional[Color] = None) -> bytearray:
+    """
+    Encode a CLEAR command.
+
+    :param color: The color filling the screen, or None to use the last color.
+    :type color: Color or None
+
+    :return: The command.
+    :rtype: bytearray
+
+    """
+
+    data = bytearray(CLEAR_LAYOUT.size if color is None else CLEAR_COLOR_LAYOUT.size)
+    pack_clear(data, 0, color)
+    return data
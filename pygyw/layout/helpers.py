@@ -202,8 +202,8 @@ def clamp(n, smallest, largest):
     return max(smallest, min(n, largest))
 
 
-def byte_from_scale_float(scale: float) -> bytes:
-    """Encode the scale into a single byte."""
+def int_from_scale_float(scale: float) -> int:
+    """Encode the scale into the value of a signed byte."""
     scale = clamp(scale, 0.01, 13.7)
 
     if scale >= 1.0:
@@ -216,4 +216,9 @@ def byte_from_scale_float(scale: float) -> bytes:
         byte = round(-scale * 100.0)
 
     assert -99 <= byte <= 127
-    return byte.to_bytes(1, 'little', signed=True)
+    return byte
+
+
+def byte_from_scale_float(scale: float) -> bytes:
+    """Encode the scale into a single byte."""
+    return int_from_scale_float(scale).to_bytes(1, 'little', signed=True)
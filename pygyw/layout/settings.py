@@ -8,3 +8,7 @@ iconSize = 48
 # Suggested padding for a better visibility
 vertical_padding = 50
 horizontal_padding = 60
+
+# Bounds of the cache of encoded drawings: number of drawings and total size (in bytes) of their commands
+command_cache_size = 256
+command_cache_bytes = 256 * 1024
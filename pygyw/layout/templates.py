@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from math import ceil
+from typing import Any, Dict, List, Optional, Union
+
+from . import cache, encoders, icons
+from .drawings import FrozenIconDrawing, FrozenTextDrawing, GYWDrawing, IconDrawing, TextDrawing
+from ..bluetooth import commands
+
+
+class GYWSlot:
+    """
+    A field of a drawing of a `GYWTemplate`, given a new value each time the template is rendered.
+
+    Attributes:
+        name: The name of the slot, used to give its value.
+        drawing: The drawing holding the field. Its attributes are the default values of the slot.
+        attribute: The name of the attribute of the drawing set by the slot.
+
+    """
+
+    def __init__(self, name: str, drawing: GYWDrawing, attribute: Optional[str] = None):
+        """
+        Initialize a new instance of the `GYWSlot` class.
+
+        :param name: The name of the slot, used to give its value.
+        :type name: str
+        :param drawing: The drawing holding the field.
+        :type drawing: `GYWDrawing`
+        :param attribute: The name of the attribute set by the slot. Defaults to None ("text" for a `TextDrawing`,
+            "icon" for an `IconDrawing`).
+        :type attribute: str or None
+
+        """
+
+        if attribute is None:
+            if isinstance(drawing, TextDrawing):
+                attribute = "text"
+            elif isinstance(drawing, IconDrawing):
+                attribute = "icon"
+        assert attribute is not None and hasattr(drawing, attribute), "The slot must name an attribute of the drawing."
+
+        self.name = name
+        self.drawing = drawing
+        self.attribute = attribute
+        # Control commands of the lines of a text slot, by index of the line
+        self.__text_controls: List[commands.BTCommand] = []
+        self.__icon_control: Optional[commands.BTCommand] = None
+
+    def __str__(self) -> str:
+        return f"Slot {self.name} ({self.attribute} of {self.drawing})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def default(self) -> Any:
+        """The value of the slot when none is given."""
+
+        return getattr(self.drawing, self.attribute)
+
+    def render(self, value: Any) -> "list[commands.BTCommand]":
+        """
+        Encode the drawing of the slot with a value.
+
+        :param value: The value of the attribute.
+        :type value: Any
+
+        :return: The commands of the drawing.
+        :rtype: `list[commands.BTCommand]`
+
+        """
+
+        if type(self.drawing) in (TextDrawing, FrozenTextDrawing) and self.attribute == "text":
+            return self.__render_text(str(value))
+        if type(self.drawing) in (IconDrawing, FrozenIconDrawing) and self.attribute == "icon":
+            return self.__render_icon(value)
+
+        return cache.command_cache.get(self.drawing.replace(**{self.attribute: value}))
+
+    def __render_text(self, text: str) -> "list[commands.BTCommand]":
+        # Only the lines are encoded: the control command of each line does not depend on the text.
+        if not text:
+            return []
+
+        drawing = self.drawing
+        result = []
+        for index, line in enumerate(drawing._wrap_text(text)):
+            result.append(commands.BTCommand(commands.GYWCharacteristics.DISPLAY_DATA, line.encode('utf-8')))
+            while len(self.__text_controls) <= index:
+                top = drawing.top + len(self.__text_controls) * ceil(drawing.size * 1.33)
+                data = bytearray(encoders.TEXT_LAYOUT.size)
+                encoders.pack_text(data, 0, drawing.left, top, drawing.font, drawing.size, drawing.color)
+                self.__text_controls.append(commands.BTFrozenCommand(commands.GYWCharacteristics.DISPLAY_COMMAND, data))
+            result.append(self.__text_controls[index])
+        return result
+
+    def __render_icon(self, icon: Optional[icons.GYWIcon]) -> "list[commands.BTCommand]":
+        # Only the name of the icon is encoded: the control command does not depend on it.
+        if not icon:
+            return []
+
+        if self.__icon_control is None:
+            self.__icon_control = IconDrawing(icon, self.drawing.left, self.drawing.top, self.drawing.color,
+                                              self.drawing.scale).to_commands()[1]
+        return [
+            commands.BTCommand(commands.GYWCharacteristics.DISPLAY_DATA, f"{icon.name}.svg".encode('utf-8')),
+            self.__icon_control,
+        ]
+
+
+class GYWTemplate:
+    """
+    A screen made of drawings among which some fields change each time it is sent.
+
+    The static drawings are encoded once, when the template is created, into a single buffer reused by every render.
+    The drawings of the slots are encoded on each render; for a text or an icon slot, only its data is encoded, as
+    its control commands do not depend on the value.
+
+    The drawings must not be modified once they are part of a template.
+
+    Attributes:
+        elements: The drawings and the slots of the template, in the order in which they are drawn.
+
+    """
+
+    def __init__(self, elements: "list[Union[GYWDrawing, GYWSlot]]"):
+        """
+        Initialize a new instance of the `GYWTemplate` class and encode its static drawings.
+
+        :param elements: The drawings and the slots of the template, in the order in which they are drawn.
+        :type elements: `list[GYWDrawing | GYWSlot]`
+
+        """
+
+        self.elements = list(elements)
+        self.__slots: Dict[str, GYWSlot] = {}
+        # Static commands, or slot, in the order in which they are sent
+        self.__parts: "list[Union[list[commands.BTCommand], GYWSlot]]" = []
+
+        buffer = commands.BTCommandBuffer()
+        counts = []
+        for element in self.elements:
+            if isinstance(element, GYWSlot):
+                assert element.name not in self.__slots, f"Duplicate slot {element.name}."
+                self.__slots[element.name] = element
+                counts.append(None)
+            else:
+                element_commands = element.to_commands()
+                for command in element_commands:
+                    buffer.write(command.view())
+                    buffer.end(command.characteristic)
+                counts.append(len(element_commands))
+
+        # The static commands are read-only views over one buffer, grouped between two slots.
+        static_commands = iter([commands.BTFrozenCommand(command.characteristic, command.view().toreadonly())
+                                for command in buffer.to_commands()])
+        for element, count in zip(self.elements, counts):
+            if count is None:
+                self.__parts.append(element)
+            else:
+                if not self.__parts or isinstance(self.__parts[-1], GYWSlot):
+                    self.__parts.append([])
+                self.__parts[-1].extend(next(static_commands) for _ in range(count))
+
+    def __str__(self) -> str:
+        return f"Template of {len(self.elements)} drawings with slots {', '.join(self.__slots) or 'none'}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @property
+    def slots(self) -> "list[str]":
+        """The names of the slots."""
+
+        return list(self.__slots)
+
+    def render(self, values: Optional[Dict[str, Any]] = None, **kwargs) -> "list[commands.BTCommand]":
+        """
+        Encode the template with values for its slots.
+
+        :param values: The value of each slot, by name. The slots without a value keep the value of their drawing.
+            Defaults to None.
+        :type values: dict or None
+        :param kwargs: More values of slots, by name.
+
+        :return: The commands of the template, to send with `BTDevice.send_commands`.
+        :rtype: `list[commands.BTCommand]`
+
+        :raises `KeyError`: If a value is given for an unknown slot.
+
+        """
+
+        values = {**values, **kwargs} if values is not None else kwargs
+        for name in values:
+            if name not in self.__slots:
+                raise KeyError(f"Unknown slot: {name}")
+
+        result = []
+        for part in self.__parts:
+            if isinstance(part, GYWSlot):
+                result.extend(part.render(values.get(part.name, part.default)))
+            else:
+                result.extend(part)
+        return result
@@ -0,0 +1,14 @@
+import pytest
+
+from helpers import FakeScanner
+from pygyw.bluetooth import manager as bt_manager
+
+
+@pytest.fixture
+def scanner(monkeypatch):
+    """Replace `BleakScanner` by a `FakeScanner` advertising no device."""
+
+    monkeypatch.setattr(FakeScanner, "addresses", [])
+    monkeypatch.setattr(FakeScanner, "fail_start", False)
+    monkeypatch.setattr(bt_manager, "BleakScanner", FakeScanner)
+    return FakeScanner
@@ -0,0 +1,97 @@
+"""Transports, drawings and coroutines shared by the tests."""
+
+import asyncio
+from types import SimpleNamespace
+
+from pygyw.bluetooth import BTDevice, LoopbackTransport, settings
+from pygyw.bluetooth.commands import ControlCodes, GYWCharacteristics
+from pygyw.layout import drawings
+from pygyw.layout.color import Colors
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+class FailingWriteTransport(LoopbackTransport):
+    """A loopback transport whose writes fail at given indexes, counted from the first write."""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = set(failures)
+        self.attempts = 0
+
+    async def write(self, characteristic, data, response=False):
+        self.attempts += 1
+        if self.attempts in self.failures:
+            raise OSError("Injected write error")
+        await super().write(characteristic, data, response)
+
+
+class CountingTransport(LoopbackTransport):
+    """A loopback transport counting the connection attempts."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connects = 0
+
+    async def connect(self):
+        self.connects += 1
+        return await super().connect()
+
+
+class FakeScanner:
+    """Replaces `BleakScanner`, reporting the advertisements of `addresses` on start or discovery."""
+
+    addresses = []
+    fail_start = False
+
+    def __init__(self, detection_callback, **kwargs):
+        self.detection_callback = detection_callback
+        self.stopped = False
+
+    @classmethod
+    def advertisements(cls):
+        for address in cls.addresses:
+            yield SimpleNamespace(address=address, name=settings.device_names[0]), SimpleNamespace(local_name=None, rssi=-50)
+
+    @classmethod
+    async def discover(cls, timeout, return_adv, **kwargs):
+        return {device.address: (device, advertisement) for device, advertisement in cls.advertisements()}
+
+    async def start(self):
+        if self.fail_start:
+            raise OSError("Adapter not ready")
+        for device, advertisement in self.advertisements():
+            self.detection_callback(device, advertisement)
+
+    async def stop(self):
+        assert not self.fail_start, "A scanner that failed to start must not be stopped"
+        self.stopped = True
+
+
+def rectangle(left):
+    return drawings.RectangleDrawing(left=left, top=0, width=10, height=10, color=Colors.BLACK)
+
+
+def rectangle_lefts(transport):
+    # The left coordinate of each rectangle written, in order.
+    return [int.from_bytes(w.data[1:3], "little", signed=True) for w in transport.writes
+            if w.characteristic == GYWCharacteristics.DISPLAY_COMMAND and w.data[0] == ControlCodes.DRAW_RECTANGLE]
+
+
+def loopback_device(address, adapter=None):
+    # A device factory of `BTAdapterScheduler` and `BTBroker`, picklable for the worker processes.
+    return BTDevice(address, transport=LoopbackTransport())
+
+
+async def connected_device(transport, **kwargs):
+    device = BTDevice(ADDRESS, transport=transport, **kwargs)
+    assert await device.connect()
+    return device
+
+
+async def wait_until(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "Timed out"
+        await asyncio.sleep(0.01)
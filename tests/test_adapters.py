@@ -0,0 +1,102 @@
+"""Tests of the `BTAdapterScheduler` spreading devices across adapters."""
+
+import asyncio
+
+import pytest
+
+from helpers import loopback_device
+from pygyw.bluetooth import BTAdapterScheduler, BTDevice, BTException, LoopbackTransport
+from pygyw.layout import drawings
+
+ADAPTERS = ["hci0", "hci1"]
+
+
+class FailingConnectTransport(LoopbackTransport):
+    async def connect(self):
+        raise OSError("Adapter busy")
+
+
+def test_devices_go_to_the_least_loaded_adapter():
+    scheduler = BTAdapterScheduler(ADAPTERS + ["hci2"], device_factory=loopback_device)
+
+    assert [scheduler.assign(f"AA:{index}") for index in range(5)] == ["hci0", "hci1", "hci2", "hci0", "hci1"]
+    # A device keeps its adapter.
+    assert scheduler.assign("AA:0") == "hci0"
+    assert scheduler.load() == {"hci0": 2, "hci1": 2, "hci2": 1}
+
+
+def test_requests_are_routed_to_the_adapter_of_the_device():
+    async def run():
+        devices = {}
+
+        def factory(address, adapter):
+            device = devices[address] = BTDevice(address, transport=LoopbackTransport())
+            device.adapter_name = adapter
+            return device
+
+        scheduler = BTAdapterScheduler(ADAPTERS, device_factory=factory)
+        await scheduler.start()
+        try:
+            assert await scheduler.connect("AA:0")
+            assert await scheduler.connect("AA:1")
+            result = await scheduler.send_drawing("AA:1", drawings.TextDrawing("hello"))
+
+            assert result.commands == 2
+            assert [devices[address].adapter_name for address in ("AA:0", "AA:1")] == ADAPTERS
+            assert devices["AA:0"].transport.writes == []
+            assert devices["AA:1"].transport.received().startswith(b"hello")
+
+            assert await scheduler.disconnect("AA:0")
+            assert scheduler.load() == {"hci0": 0, "hci1": 1}
+            with pytest.raises(BTException):
+                await scheduler.send_drawing("AA:0", drawings.TextDrawing("hello"))
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("transport_class", [FailingConnectTransport, None])
+def test_failed_connection_frees_the_adapter(transport_class):
+    async def run():
+        def factory(address, adapter):
+            transport = LoopbackTransport() if transport_class is None else transport_class()
+            if transport_class is None:
+                transport.fail_connects(1)
+            return BTDevice(address, transport=transport)
+
+        scheduler = BTAdapterScheduler(ADAPTERS, device_factory=factory)
+        await scheduler.start()
+        try:
+            if transport_class is None:
+                assert not await scheduler.connect("AA:0")
+            else:
+                with pytest.raises(OSError):
+                    await scheduler.connect("AA:0")
+
+            assert scheduler.assignments == {}
+            assert scheduler.assign("AA:1") == "hci0"
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(run())
+
+
+def test_worker_processes_serve_the_devices():
+    async def run():
+        scheduler = BTAdapterScheduler(ADAPTERS, processes=True, device_factory=loopback_device)
+        await scheduler.start()
+        try:
+            for index in range(3):
+                assert await scheduler.connect(f"AA:{index}")
+            results = await asyncio.gather(*(scheduler.send_drawing(f"AA:{index}", drawings.TextDrawing("hello"))
+                                             for index in range(3)))
+
+            assert [result.commands for result in results] == [2, 2, 2]
+            assert scheduler.load() == {"hci0": 2, "hci1": 1}
+            with pytest.raises(BTException):
+                await scheduler.send_drawing("AA:9", drawings.TextDrawing("hello"))
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,123 @@
+"""Tests of the `BTBroker` sharing devices between the clients of a Unix domain socket."""
+
+import asyncio
+import gc
+
+import pytest
+
+from helpers import ADDRESS, loopback_device, wait_until
+from pygyw.bluetooth import BTException
+from pygyw.bluetooth.writer import SendStatus
+from pygyw.broker import BTBroker, BTBrokerClient, protocol
+from pygyw.layout import drawings
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "broker.sock")
+
+
+def test_clients_share_a_device(path):
+    async def run():
+        broker = BTBroker(path, device_factory=loopback_device)
+        await broker.start()
+        try:
+            async with BTBrokerClient(path) as first, BTBrokerClient(path) as second:
+                assert await first.device(ADDRESS).connect()
+                assert await second.device(ADDRESS).connect()
+
+                results = await asyncio.gather(first.device(ADDRESS).send_drawing(drawings.TextDrawing("one")),
+                                               second.device(ADDRESS).send_drawing(drawings.TextDrawing("two")))
+
+                assert [result.status for result in results] == [SendStatus.SENT, SendStatus.SENT]
+                received = broker.devices[ADDRESS].transport.received()
+                assert b"one" in received and b"two" in received
+                assert await first.devices() == [{"address": ADDRESS, "connected": True}]
+        finally:
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_failed_request_is_answered_with_an_error(path):
+    async def run():
+        broker = BTBroker(path, device_factory=loopback_device)
+        await broker.start()
+        try:
+            async with BTBrokerClient(path) as client:
+                with pytest.raises(BTException, match="not connected to the broker"):
+                    await client.device(ADDRESS).stats()
+                with pytest.raises(BTException, match="Unknown operation"):
+                    await client.request("reboot")
+        finally:
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_requests_fail_once_the_broker_is_stopped(path):
+    async def run():
+        broker = BTBroker(path, device_factory=loopback_device)
+        await broker.start()
+        client = BTBrokerClient(path)
+        await client.connect()
+        assert await client.device(ADDRESS).connect()
+
+        await broker.stop()
+        await wait_until(lambda: not client.is_connected)
+
+        with pytest.raises(BTException):
+            await asyncio.wait_for(client.devices(), 1.0)
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_concurrent_answers_to_one_client(path):
+    async def run():
+        broker = BTBroker(path, device_factory=loopback_device)
+        await broker.start()
+        try:
+            async with BTBrokerClient(path) as client:
+                device = client.device(ADDRESS)
+                assert await device.connect()
+
+                results = await asyncio.gather(*(device.send_drawing(drawings.TextDrawing(f"line {index}"))
+                                                 for index in range(20)),
+                                               *(device.stats() for _ in range(20)))
+
+                assert all(result.status == SendStatus.SENT for result in results[:20])
+                assert all("commands" in stats for stats in results[20:])
+                assert (await device.stats())["commands"] == 40
+        finally:
+            await broker.stop()
+
+    asyncio.run(run())
+
+
+def test_client_leaving_before_its_answers(path, monkeypatch):
+    async def lost(self):
+        raise ConnectionResetError("Connection reset by peer")
+
+    async def run():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        broker = BTBroker(path, device_factory=loopback_device)
+        await broker.start()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            with monkeypatch.context() as patch:
+                # The client leaves while its answers are written.
+                patch.setattr(asyncio.StreamWriter, "drain", lost)
+                writer.write(b"".join(protocol.encode_message({"id": index, "op": "devices"}) for index in range(50)))
+                await asyncio.sleep(0.1)
+            writer.close()
+
+            async with BTBrokerClient(path) as client:
+                assert await client.devices() == []
+        finally:
+            await broker.stop()
+        gc.collect()
+        assert errors == []
+
+    asyncio.run(run())
@@ -0,0 +1,92 @@
+"""Tests of the `GYWCommandCache` of encoded drawings."""
+
+from helpers import rectangle
+from pygyw.layout import drawings
+from pygyw.layout.cache import GYWCommandCache
+from pygyw.layout.color import Colors
+
+
+def encoded(bt_commands):
+    return [(command.characteristic, bytes(command.data)) for command in bt_commands]
+
+
+def test_drawings_with_the_same_content_share_their_commands():
+    cache = GYWCommandCache()
+
+    first = cache.get(drawings.TextDrawing("hello", 10, 20))
+    second = cache.get(drawings.TextDrawing("hello", 10, 20))
+
+    assert encoded(first) == encoded(drawings.TextDrawing("hello", 10, 20).to_commands())
+    assert [a is b for a, b in zip(first, second)] == [True, True]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert cache.hit_ratio == 0.5
+
+
+def test_cached_commands_are_read_only():
+    cache = GYWCommandCache()
+    bt_commands = cache.get(rectangle(1))
+    bt_commands.clear()
+
+    assert encoded(cache.get(rectangle(1))) == encoded(rectangle(1).to_commands())
+    assert all(command.view().readonly for command in cache.get(rectangle(1)))
+
+
+def test_modified_drawing_is_encoded_again():
+    cache = GYWCommandCache()
+    drawing = drawings.TextDrawing("before")
+    cache.get(drawing)
+
+    drawing.text = "after"
+    drawing.color = Colors.RED
+
+    assert encoded(cache.get(drawing)) == encoded(drawings.TextDrawing("after", color=Colors.RED).to_commands())
+    assert cache.misses == 2
+
+
+def test_least_recently_used_drawings_are_evicted():
+    cache = GYWCommandCache(max_entries=2)
+    cache.get(rectangle(1))
+    cache.get(rectangle(2))
+    cache.get(rectangle(1))
+    cache.get(rectangle(3))
+
+    assert cache.evictions == 1
+    cache.reset_stats()
+    cache.get(rectangle(1))
+    cache.get(rectangle(2))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_size_in_bytes_is_bounded():
+    size = sum(len(command.data) for command in rectangle(1).to_commands())
+    cache = GYWCommandCache(max_bytes=2 * size)
+
+    for left in range(5):
+        cache.get(rectangle(left))
+
+    assert len(cache) == 2 and cache.size_bytes == 2 * size
+    # A drawing larger than the whole cache is encoded but not stored.
+    small = GYWCommandCache(max_bytes=size - 1)
+    assert encoded(small.get(rectangle(1))) == encoded(rectangle(1).to_commands())
+    assert small.to_json()["bytes"] == 0
+
+
+def test_invalidate_and_disabled_cache():
+    cache = GYWCommandCache()
+    cache.get(rectangle(1))
+
+    assert cache.invalidate(rectangle(1))
+    assert not cache.invalidate(rectangle(1))
+    assert cache.size_bytes == 0
+
+    disabled = GYWCommandCache(max_entries=0)
+    disabled.get(rectangle(1))
+    disabled.get(rectangle(1))
+    assert (len(disabled), disabled.misses) == (0, 2)
+
+
+def test_drawings_without_a_key_are_not_cached():
+    cache = GYWCommandCache()
+
+    assert cache.get(drawings.GYWDrawing("custom")) == []
+    assert (cache.hits, cache.misses) == (0, 0)
@@ -0,0 +1,81 @@
+"""Tests of the concurrent connection of several devices with `BTManager.connect_all`."""
+
+import asyncio
+
+from helpers import CountingTransport
+from pygyw.bluetooth import BTDevice, BTManager, BTRetryPolicy, LoopbackTransport
+
+
+class SlowConnectTransport(LoopbackTransport):
+    """A loopback transport taking some time to connect, tracking the connections pending at the same time."""
+
+    pending = 0
+    max_pending = 0
+
+    async def connect(self):
+        cls = type(self)
+        cls.pending += 1
+        cls.max_pending = max(cls.max_pending, cls.pending)
+        try:
+            await asyncio.sleep(0.02)
+            return await super().connect()
+        finally:
+            cls.pending -= 1
+
+
+class RaisingConnectTransport(CountingTransport):
+    async def connect(self):
+        self.connects += 1
+        raise OSError("Connection refused")
+
+
+def devices_of(transports):
+    return [BTDevice(f"AA:BB:CC:DD:EE:{index:02X}", transport=transport) for index, transport in enumerate(transports)]
+
+
+def test_connections_are_limited_to_the_concurrency(tmp_path):
+    async def run():
+        devices = devices_of([SlowConnectTransport() for _ in range(6)])
+
+        report = await BTManager(registry_path=str(tmp_path / "devices.json")).connect_all(devices, concurrency=2)
+
+        assert report.connected == devices
+        assert SlowConnectTransport.max_pending == 2
+        # Three waves of two connections.
+        assert report.duration >= 0.06
+        assert all(result.attempts == 1 and result.latency >= 0.02 for result in report.results)
+
+    asyncio.run(run())
+
+
+def test_failed_connections_are_retried(tmp_path):
+    async def run():
+        transports = [CountingTransport(), CountingTransport(), RaisingConnectTransport()]
+        transports[1].fail_connects(2)
+        devices = devices_of(transports)
+        retry_policy = BTRetryPolicy(max_retries=2, backoff=0.01)
+
+        report = await BTManager(registry_path=str(tmp_path / "devices.json")).connect_all(devices, 2, retry_policy)
+
+        assert report.connected == devices[:2]
+        assert [result.attempts for result in report.results] == [1, 3, 3]
+        assert [transport.connects for transport in transports] == [1, 3, 3]
+        assert [result.device for result in report.failed] == devices[2:]
+        assert isinstance(report.failed[0].error, OSError)
+        assert [item["error"] for item in report.to_json()["results"]] == [None, None, "Connection refused"]
+
+    asyncio.run(run())
+
+
+def test_connected_devices_are_not_connected_again(tmp_path):
+    async def run():
+        transport = CountingTransport()
+        device = devices_of([transport])[0]
+        await device.connect()
+
+        report = await BTManager(registry_path=str(tmp_path / "devices.json")).connect_all([device])
+
+        assert report.connected == [device]
+        assert transport.connects == 1
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+"""Tests of the `struct` encoders of the control commands, against the bytes assembled field by field."""
+
+import struct
+
+import pytest
+
+from pygyw.bluetooth.commands import ControlCodes
+from pygyw.layout import encoders
+from pygyw.layout.color import Color, Colors
+from pygyw.layout.fonts import GYWFonts
+
+COLOR = Color(1, 2, 3, 4)
+
+
+def field(value, size=2, signed=True):
+    return value.to_bytes(size, "little", signed=signed)
+
+
+def packed(pack, layout, *args):
+    # Written after a prefix, to check the offset.
+    buffer = bytearray(3 + layout.size)
+    assert pack(buffer, 3, *args) == len(buffer)
+    return bytes(buffer[3:])
+
+
+@pytest.mark.parametrize("left, top", [(0, 0), (-20, 300), (32767, -32768)])
+def test_text(left, top):
+    expected = b"".join([bytes([ControlCodes.DRAW_TEXT]), field(left), field(top), b"robmb", bytes([24]),
+                         COLOR.to_rgba8888_bytes()])
+
+    assert packed(encoders.pack_text, encoders.TEXT_LAYOUT, left, top, GYWFonts.ROBOTO_MONO_BOLD, 24, COLOR) == expected
+
+
+@pytest.mark.parametrize("color, color_bytes", [(None, bytes(4)), (COLOR, bytes([1, 2, 3, 4]))])
+def test_image(color, color_bytes):
+    expected = bytes([ControlCodes.DRAW_IMAGE]) + field(10) + field(-5) + color_bytes + field(-3, 1)
+
+    assert packed(encoders.pack_image, encoders.IMAGE_LAYOUT, 10, -5, color, -3) == expected
+
+
+@pytest.mark.parametrize("color, color_bytes", [(None, bytes(4)), (Colors.RED, Colors.RED.to_rgba8888_bytes())])
+def test_rectangle(color, color_bytes):
+    expected = b"".join([bytes([ControlCodes.DRAW_RECTANGLE]), field(-1), field(2), field(640, signed=False),
+                         field(400, signed=False), color_bytes])
+
+    assert packed(encoders.pack_rectangle, encoders.RECTANGLE_LAYOUT, -1, 2, 640, 400, color) == expected
+
+
+def test_spinner():
+    expected = b"".join([bytes([ControlCodes.DRAW_SPINNER]), field(7), field(8), COLOR.to_rgba8888_bytes(), field(2, 1),
+                         bytes([1, 15])])
+
+    assert packed(encoders.pack_spinner, encoders.SPINNER_LAYOUT, 7, 8, COLOR, 2, 1, 15) == expected
+
+
+def test_clear():
+    assert encoders.encode_clear() == bytes([ControlCodes.CLEAR])
+    assert encoders.encode_clear(COLOR) == bytes([ControlCodes.CLEAR, 1, 2, 3, 4])
+    assert packed(encoders.pack_clear, encoders.CLEAR_COLOR_LAYOUT, COLOR) == bytes([ControlCodes.CLEAR, 1, 2, 3, 4])
+
+
+def test_out_of_range_field_is_refused():
+    with pytest.raises(struct.error):
+        encoders.pack_rectangle(bytearray(encoders.RECTANGLE_LAYOUT.size), 0, 0, 0, -1, 10, None)
+    with pytest.raises(struct.error):
+        encoders.pack_text(bytearray(encoders.TEXT_LAYOUT.size - 1), 0, 0, 0, GYWFonts.ROBOTO_MONO, 24, COLOR)
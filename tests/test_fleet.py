@@ -0,0 +1,88 @@
+"""Tests of the broadcast of drawings to a `BTFleet`."""
+
+import asyncio
+
+from helpers import FailingWriteTransport, rectangle
+from pygyw.bluetooth import BTDevice, BTFleet, LoopbackTransport
+from pygyw.bluetooth.commands import BTCommand, GYWCharacteristics
+from pygyw.layout.color import Colors
+
+
+async def fleet_of(transports, **kwargs):
+    devices = [BTDevice(f"AA:BB:CC:DD:EE:{index:02X}", transport=transport) for index, transport in enumerate(transports)]
+    for device in devices:
+        await device.connect()
+    return BTFleet(devices, **kwargs)
+
+
+def test_broadcast_sends_the_same_bytes_to_every_connected_device():
+    async def run():
+        transports = [LoopbackTransport() for _ in range(3)]
+        fleet = await fleet_of(transports)
+        await fleet.devices[2].disconnect()
+
+        report = await fleet.broadcast(rectangle(1))
+
+        assert [r.device for r in report.succeeded] == fleet.devices[:2]
+        assert report.failed == []
+        expected = b"".join(bytes(c.data) for c in rectangle(1).to_commands())
+        assert [t.received() for t in transports] == [expected, expected, b""]
+
+    asyncio.run(run())
+
+
+def test_broadcast_shares_the_commands_between_the_devices():
+    async def run():
+        transports = [LoopbackTransport() for _ in range(2)]
+        fleet = await fleet_of(transports)
+        data = bytearray(b"shared")
+
+        await fleet.broadcast_commands([BTCommand(GYWCharacteristics.DISPLAY_DATA, data)])
+
+        assert [t.received() for t in transports] == [b"shared", b"shared"]
+
+    asyncio.run(run())
+
+
+def test_error_on_one_device_does_not_affect_the_others():
+    async def run():
+        transports = [LoopbackTransport(), FailingWriteTransport([1]), LoopbackTransport()]
+        fleet = await fleet_of(transports)
+
+        report = await fleet.broadcast(rectangle(1))
+
+        assert [r.ok for r in report.results] == [True, False, True]
+        assert report.failed[0].device is fleet.devices[1]
+        assert report.failed[0].error is not None
+        assert [item["error"] is None for item in report.to_json()["results"]] == [True, False, True]
+
+    asyncio.run(run())
+
+
+def test_timeout_reports_the_slow_devices():
+    async def run():
+        transports = [LoopbackTransport(), LoopbackTransport(latency=1.0)]
+        fleet = await fleet_of(transports, timeout=0.1)
+
+        report = await fleet.broadcast(rectangle(1))
+
+        assert [r.ok for r in report.results] == [True, False]
+        assert isinstance(report.failed[0].error, asyncio.TimeoutError)
+        assert report.duration < 0.5
+
+    asyncio.run(run())
+
+
+def test_concurrency_limits_the_devices_sent_to_at_the_same_time():
+    async def run():
+        transports = [LoopbackTransport(latency=0.05) for _ in range(4)]
+        fleet = await fleet_of(transports, concurrency=2)
+
+        report = await fleet.clear_screen(Colors.WHITE)
+
+        latencies = sorted(r.latency for r in report.results)
+        assert all(r.ok for r in report.results)
+        # Two waves of two devices.
+        assert latencies[1] < 0.09 <= latencies[2]
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+"""Tests of the slotted drawings and commands and of their immutable variants."""
+
+import weakref
+
+import pytest
+
+from pygyw.bluetooth.commands import BTCommand, BTFrozenCommand, GYWCharacteristics
+from pygyw.layout import drawings
+from pygyw.layout.color import Colors
+from pygyw.layout.fonts import GYWFont, GYWFonts
+from pygyw.layout.icons import GYWIcon, GYWIcons
+
+
+def test_drawings_stay_mutable():
+    drawing = drawings.TextDrawing("one")
+    drawing.text = "two"
+    drawing.font = GYWFonts.ROBOTO_MONO_BOLD
+
+    assert drawing.replace(left=5).left == 5 and drawing.left == 0
+    assert weakref.ref(drawing)() is drawing
+    # Slotted: no attribute of their own.
+    with pytest.raises(AttributeError):
+        drawing.label = "title"
+
+
+def test_fonts_and_icons_stay_mutable():
+    font = GYWFont("Custom", "custo")
+    font.char_width = 0.5
+    font.label = "narrow"
+    icon = GYWIcon("custom")
+    icon.size = 32
+
+    assert (font.char_width, font.label, icon.size) == (0.5, "narrow", 32)
+
+
+def test_frozen_drawings_are_equal_and_hashed_by_content():
+    frozen = drawings.FrozenTextDrawing("label", 10, 20, color=Colors.RED)
+    same = drawings.TextDrawing("label", 10, 20, color=Colors.RED).freeze()
+
+    assert frozen == same and hash(frozen) == hash(same)
+    assert {frozen: 1}[same] == 1
+    assert frozen != drawings.FrozenTextDrawing("label", 10, 21, color=Colors.RED)
+    assert frozen.freeze() is frozen
+    assert [bytes(c.data) for c in frozen.to_commands()] == [bytes(c.data) for c in same.thaw().to_commands()]
+
+
+def test_frozen_drawings_refuse_modifications():
+    frozen = drawings.FrozenIconDrawing(GYWIcons.CHECK, 1, 2)
+
+    with pytest.raises(AttributeError):
+        frozen.left = 5
+    with pytest.raises(AttributeError):
+        del frozen.icon
+    with pytest.raises(AttributeError):
+        frozen.label = "title"
+
+    moved = frozen.replace(left=5)
+    assert isinstance(moved, drawings.FrozenIconDrawing) and (moved.left, frozen.left) == (5, 1)
+    thawed = frozen.thaw()
+    thawed.left = 6
+    assert type(thawed) is drawings.IconDrawing and frozen.left == 1
+
+
+def test_drawings_without_a_variant_cannot_be_frozen():
+    with pytest.raises(TypeError):
+        drawings.GYWDrawing("custom").freeze()
+
+
+def test_frozen_commands():
+    data = bytearray(b"data")
+    frozen = BTFrozenCommand(GYWCharacteristics.DISPLAY_DATA, data)
+    data[0] = 0
+
+    assert frozen.data == b"data"
+    assert frozen == BTFrozenCommand(GYWCharacteristics.DISPLAY_DATA, memoryview(b"data"))
+    assert hash(frozen) == hash(BTFrozenCommand(GYWCharacteristics.DISPLAY_DATA, b"data"))
+    assert frozen != BTFrozenCommand(GYWCharacteristics.DISPLAY_COMMAND, b"data")
+    with pytest.raises(AttributeError):
+        frozen.data = b"other"
+
+    # Plain commands are mutable and compared by identity, in both directions.
+    plain = BTCommand(GYWCharacteristics.DISPLAY_DATA, b"data")
+    assert frozen != plain and plain != frozen
@@ -0,0 +1,87 @@
+"""Tests of the scans of `BTManager`."""
+
+import asyncio
+
+import pytest
+
+from helpers import ADDRESS
+from pygyw.bluetooth import BTException, BTManager
+
+OTHER = "11:22:33:44:55:66"
+
+
+def test_stream_yields_each_device_once(scanner, tmp_path):
+    async def run():
+        manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        scanner.addresses = [ADDRESS, OTHER, ADDRESS]
+
+        found = [device.address async for device in manager.stream_devices(timeout=0.1)]
+
+        assert found == [ADDRESS, OTHER]
+        assert [device.address for device in manager.devices] == found
+        assert manager.registry.get(OTHER) is not None
+        assert not manager.is_scanning
+
+    asyncio.run(run())
+
+
+def test_breaking_out_of_the_stream_stops_the_scan(scanner, tmp_path):
+    async def run():
+        manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        scanner.addresses = [ADDRESS, OTHER]
+
+        devices = manager.stream_devices(timeout=None, store=False)
+        async for device in devices:
+            # A second scan is refused while the first one runs.
+            with pytest.raises(BTException):
+                await manager.find(OTHER, timeout=0.1)
+            break
+        await devices.aclose()
+
+        assert device.address == ADDRESS
+        assert not manager.is_scanning
+        assert await manager.find(OTHER, timeout=0.1, store=False) is not None
+
+    asyncio.run(run())
+
+
+def test_find_returns_none_when_the_device_is_not_advertising(scanner, tmp_path):
+    async def run():
+        manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        scanner.addresses = [OTHER]
+
+        assert await manager.find(ADDRESS, timeout=0.1, store=False) is None
+        assert (await manager.find(lambda device: device.address == OTHER, timeout=0.1, store=False)).address == OTHER
+
+    asyncio.run(run())
+
+
+def test_scan_state_is_reset_when_the_scanner_fails_to_start(scanner, tmp_path):
+    async def run():
+        manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        scanner.fail_start = True
+        for _ in range(2):
+            # The second scan fails the same way, not with "A scan is already in progress".
+            with pytest.raises(OSError):
+                await manager.find(ADDRESS, timeout=0.1, store=False)
+            assert not manager.is_scanning
+
+        scanner.fail_start = False
+        scanner.addresses = [ADDRESS]
+        assert await manager.find(ADDRESS, timeout=0.1, store=False) is not None
+
+    asyncio.run(run())
+
+
+def test_scan_yields_the_known_instance_of_a_device(scanner, tmp_path):
+    async def run():
+        manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        scanner.addresses = [ADDRESS]
+
+        first = await manager.find(ADDRESS, timeout=0.1, store=False)
+        second = await manager.find(ADDRESS, timeout=0.1, store=False)
+
+        assert first is second
+        assert manager.devices == [first]
+
+    asyncio.run(run())
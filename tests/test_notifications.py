@@ -0,0 +1,117 @@
+"""Tests of the notification streams of `BTDevice`."""
+
+import asyncio
+
+import pytest
+
+from helpers import connected_device
+from pygyw.bluetooth import LoopbackTransport
+from pygyw.bluetooth.notifications import OverflowPolicy
+
+CHARACTERISTIC = "characteristic"
+
+
+def test_each_stream_receives_every_notification():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+
+        async with device.notifications(CHARACTERISTIC) as first, device.notifications(CHARACTERISTIC) as second:
+            transport.notify(CHARACTERISTIC, b"one")
+            transport.notify(CHARACTERISTIC, b"two")
+
+            assert [(await first.get()).data for _ in range(2)] == [b"one", b"two"]
+            assert second.get_nowait().data == b"one"
+
+        # A closed stream keeps its buffer but receives nothing more.
+        transport.notify(CHARACTERISTIC, b"three")
+        assert [notification.data async for notification in second] == [b"two"]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("policy, kept", [(OverflowPolicy.DROP_OLDEST, [b"2", b"3"]),
+                                          (OverflowPolicy.DROP_NEWEST, [b"0", b"1"])])
+def test_full_buffer_drops_by_policy(policy, kept):
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        stream = device.notifications(CHARACTERISTIC, capacity=2, policy=policy)
+        await stream.start()
+
+        for index in range(4):
+            transport.notify(CHARACTERISTIC, str(index).encode())
+
+        assert (stream.received, stream.dropped) == (4, 2)
+        assert [stream.get_nowait().data for _ in range(len(stream))] == kept
+
+    asyncio.run(run())
+
+
+def test_concurrent_getters_each_receive_a_notification():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        stream = device.notifications(CHARACTERISTIC)
+        await stream.start()
+
+        getters = [asyncio.ensure_future(stream.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        for index in range(3):
+            transport.notify(CHARACTERISTIC, str(index).encode())
+
+        notifications = await asyncio.wait_for(asyncio.gather(*getters), 1.0)
+        assert [notification.data for notification in notifications] == [b"0", b"1", b"2"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_getter_leaves_its_notification_to_the_others():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        stream = device.notifications(CHARACTERISTIC)
+        await stream.start()
+
+        first = asyncio.ensure_future(stream.get())
+        second = asyncio.ensure_future(stream.get())
+        await asyncio.sleep(0)
+        transport.notify(CHARACTERISTIC, b"one")
+        first.cancel()
+
+        assert (await asyncio.wait_for(second, 1.0)).data == b"one"
+
+    asyncio.run(run())
+
+
+def test_streams_end_when_the_device_is_disconnected():
+    async def run():
+        device = await connected_device(LoopbackTransport())
+        stream = device.notifications(CHARACTERISTIC)
+        await stream.start()
+
+        getters = [asyncio.ensure_future(stream.get()) for _ in range(2)]
+        await asyncio.sleep(0)
+        await device.disconnect()
+
+        results = await asyncio.wait_for(asyncio.gather(*getters, return_exceptions=True), 1.0)
+        assert all(isinstance(result, StopAsyncIteration) for result in results)
+        assert stream.closed
+
+    asyncio.run(run())
+
+
+def test_subscriptions_are_restored_after_a_reconnection():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        stream = device.notifications(CHARACTERISTIC)
+        await stream.start()
+
+        transport.drop()
+        await device.connect()
+        transport.notify(CHARACTERISTIC, b"back")
+
+        assert (await asyncio.wait_for(stream.get(), 1.0)).data == b"back"
+
+    asyncio.run(run())
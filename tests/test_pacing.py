@@ -0,0 +1,71 @@
+"""Tests of the pacing of the packets written to a device."""
+
+import asyncio
+
+from helpers import FailingWriteTransport, connected_device, rectangle
+from pygyw.bluetooth import BTPacer, BTRetryPolicy, LoopbackTransport, PacingMode
+from pygyw.bluetooth.commands import BTCommand, GYWCharacteristics
+
+
+def test_no_pacing_keeps_no_gap():
+    pacer = BTPacer(PacingMode.NONE)
+    assert pacer.interval == 0.0
+    assert pacer.rate is None
+
+
+def test_fixed_pacing_spaces_the_packets():
+    async def run():
+        transport = LoopbackTransport(mtu=23)
+        device = await connected_device(transport, pacer=BTPacer(PacingMode.FIXED, interval=0.01))
+
+        await device.send_commands([BTCommand(GYWCharacteristics.DISPLAY_DATA, bytes(100))])
+
+        gaps = [b.timestamp - a.timestamp for a, b in zip(transport.writes, transport.writes[1:])]
+        assert len(gaps) == 4
+        assert min(gaps) >= 0.009
+
+    asyncio.run(run())
+
+
+def test_adaptive_pacing_backs_off_on_errors_and_recovers():
+    async def run():
+        pacer = BTPacer(PacingMode.ADAPTIVE, interval=0.0, max_interval=0.05)
+        pacer.on_error()
+        pacer.on_error()
+        assert pacer.interval == 2 * BTPacer.STEP
+        assert pacer.increases == 2
+
+        for _ in range(BTPacer.RECOVERY_WRITES * 10):
+            await pacer.wait()
+            pacer.on_success()
+        assert pacer.interval == 0.0
+        assert pacer.decreases > 0
+
+    asyncio.run(run())
+
+
+def test_adaptive_pacing_never_exceeds_its_maximum():
+    async def run():
+        pacer = BTPacer(PacingMode.ADAPTIVE, interval=0.0, max_interval=0.01)
+        for _ in range(20):
+            pacer.on_error()
+        assert pacer.interval == 0.01
+
+    asyncio.run(run())
+
+
+def test_connection_resets_the_gap_learned_on_the_previous_link():
+    async def run():
+        transport = FailingWriteTransport([1, 2, 3])
+        pacer = BTPacer(PacingMode.ADAPTIVE, interval=0.0)
+        device = await connected_device(transport, pacer=pacer,
+                                        retry_policy=BTRetryPolicy(max_retries=3, backoff=0.0))
+        await device.send_drawing(rectangle(0))
+        assert pacer.interval > 0.0
+
+        await device.disconnect()
+        await device.connect()
+
+        assert pacer.interval == 0.0
+
+    asyncio.run(run())
@@ -0,0 +1,53 @@
+"""Tests of the size of the packets written to a device."""
+
+import asyncio
+
+import pytest
+
+from helpers import connected_device
+from pygyw.bluetooth import LoopbackTransport, settings
+from pygyw.bluetooth.commands import BTCommand, GYWCharacteristics
+
+
+@pytest.mark.parametrize("mtu, packet_size", [(None, settings.default_packet_size), (23, 20), (100, 97), (247, 244)])
+def test_packet_size_follows_the_mtu(mtu, packet_size):
+    async def run():
+        transport = LoopbackTransport(mtu=mtu)
+        device = await connected_device(transport)
+        assert device.packet_size == packet_size
+
+        data = bytes(range(250))
+        result = await device.send_commands([BTCommand(GYWCharacteristics.DISPLAY_DATA, data)])
+        assert all(len(w.data) <= packet_size for w in transport.writes)
+        assert result.writes == len(transport.writes) == -(-len(data) // packet_size)
+        assert transport.received() == data
+
+    asyncio.run(run())
+
+
+def test_max_packet_size_caps_the_mtu():
+    async def run():
+        device = await connected_device(LoopbackTransport(mtu=247), max_packet_size=64)
+        assert device.packet_size == 64
+
+    asyncio.run(run())
+
+
+def test_mtu_override_replaces_the_negotiated_mtu():
+    async def run():
+        transport = LoopbackTransport(mtu=247)
+        device = await connected_device(transport, mtu_override=50)
+        assert device.packet_size == 47
+
+        await device.send_commands([BTCommand(GYWCharacteristics.DISPLAY_DATA, bytes(100))])
+        assert [len(w.data) for w in transport.writes] == [47, 47, 6]
+
+    asyncio.run(run())
+
+
+def test_packet_size_never_drops_below_the_default():
+    async def run():
+        device = await connected_device(LoopbackTransport(mtu=10))
+        assert device.packet_size == settings.default_packet_size
+
+    asyncio.run(run())
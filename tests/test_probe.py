@@ -0,0 +1,67 @@
+"""Tests of the measures of the link taken by `BTDevice.probe`."""
+
+import asyncio
+import json
+
+import pytest
+
+from helpers import FailingWriteTransport, connected_device
+from pygyw.bluetooth import BTException, LoopbackTransport
+from pygyw.bluetooth import probe as bt_probe
+from pygyw.bluetooth.commands import ControlCodes, GYWCharacteristics
+
+
+def test_probe_measures_the_link():
+    async def run():
+        transport = LoopbackTransport(mtu=103, latency=0.001, throughput=100_000)
+        device = await connected_device(transport)
+
+        result = await device.probe(rtt_samples=5, packets=4)
+
+        assert len(result.rtt_samples) == 5 and min(result.rtt_samples) >= 0.001
+        assert sorted(result.throughputs) == [20, 50, 100]
+        assert result.throughput <= 100_000
+        assert result.effective_mtu == result.best_chunk_size + 3
+        assert result.write_interval == pytest.approx(result.best_chunk_size / result.throughput)
+        json.dumps(result.to_json(), allow_nan=False)
+
+    asyncio.run(run())
+
+
+def test_probe_data_is_consumed_off_the_screen():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+
+        await device.probe(rtt_samples=2, chunk_sizes=[10], packets=2)
+
+        data = transport.received(GYWCharacteristics.DISPLAY_DATA)
+        assert data.strip(b" ") == b""
+        commands = [w.data for w in transport.writes if w.characteristic == GYWCharacteristics.DISPLAY_COMMAND]
+        assert [command[0] for command in commands] == [ControlCodes.DRAW_TEXT] * 2
+
+    asyncio.run(run())
+
+
+def test_writes_too_fast_to_be_timed_are_left_out(monkeypatch):
+    async def run():
+        device = await connected_device(LoopbackTransport())
+        monkeypatch.setattr(bt_probe.time, "perf_counter", lambda: 1.0)
+
+        result = await device.probe(rtt_samples=2, packets=2)
+
+        assert result.throughputs == {}
+        assert result.throughput == 0.0 and result.write_interval == 0.0
+        json.dumps(result.to_json(), allow_nan=False)
+
+    asyncio.run(run())
+
+
+def test_failed_probe_raises():
+    async def run():
+        device = await connected_device(FailingWriteTransport([3]))
+
+        with pytest.raises(BTException):
+            await device.probe(rtt_samples=5)
+
+    asyncio.run(run())
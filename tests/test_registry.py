@@ -0,0 +1,146 @@
+"""Tests of the `BTRegistry` and of the reconnection of the registered devices."""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from helpers import ADDRESS
+from pygyw.bluetooth import BTException, BTManager, BTRegistry, LoopbackTransport
+from pygyw.bluetooth import device as bt_device
+from pygyw.bluetooth import manager as bt_manager
+
+OTHER = "11:22:33:44:55:66"
+
+
+class AdvertisedTransport(LoopbackTransport):
+    """Replaces `BleakTransport`: only connects to a device known from its advertisement, not by its address."""
+
+    def __init__(self, device, adapter=None):
+        super().__init__()
+        self.device = device
+        self.adapter = adapter
+
+    async def connect(self):
+        if isinstance(self.device, str):
+            return False
+        return await super().connect()
+
+
+class ReachableTransport(LoopbackTransport):
+    """Replaces `BleakTransport`: connects to any device."""
+
+    def __init__(self, device, adapter=None):
+        super().__init__()
+
+
+@pytest.fixture
+def advertised(monkeypatch):
+    monkeypatch.setattr(bt_device, "BleakTransport", AdvertisedTransport)
+    monkeypatch.setattr(bt_manager, "BleakTransport", AdvertisedTransport)
+
+
+def test_entries_are_recorded_by_upper_case_address(tmp_path):
+    registry = BTRegistry(str(tmp_path / "devices.json"))
+
+    registry.record(ADDRESS.lower(), name="GYW", rssi=-60)
+    entry = registry.record(ADDRESS, rssi=None, mtu=247)
+
+    assert len(registry) == 1
+    assert ADDRESS.lower() in registry
+    assert registry.get(ADDRESS.lower()) is entry
+    assert (entry.address, entry.name, entry.rssi, entry.mtu) == (ADDRESS, "GYW", -60, 247)
+    with pytest.raises(BTException):
+        registry.record(ADDRESS, last_seen=0)
+
+    registry.remove(ADDRESS.lower())
+    assert registry.get(ADDRESS) is None
+
+
+def test_entries_survive_a_save_and_load(tmp_path):
+    path = str(tmp_path / "registry" / "devices.json")
+    registry = BTRegistry(path)
+    registry.record(OTHER, adapter="hci1")
+    registry.record(ADDRESS, name="GYW", mtu=185)
+    registry.save()
+
+    loaded = BTRegistry(path)
+    assert loaded.load()
+    assert [entry.to_json() for entry in loaded.entries] == [entry.to_json() for entry in registry.entries]
+    # The most recently seen first.
+    assert [entry.address for entry in loaded.entries] == [ADDRESS, OTHER]
+    assert os.listdir(os.path.dirname(path)) == ["devices.json"]
+
+
+def test_failed_save_keeps_the_previous_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "devices.json")
+    registry = BTRegistry(path)
+    registry.record(ADDRESS)
+    registry.save()
+
+    registry.record(OTHER)
+
+    def fail(*args, **kwargs):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(json, "dump", fail)
+    with pytest.raises(OSError):
+        registry.save()
+
+    with open(path, "r") as f:
+        assert [item["address"] for item in json.load(f)["devices"]] == [ADDRESS]
+    assert os.listdir(tmp_path) == ["devices.json"]
+
+
+def test_unreadable_registry_is_not_loaded(tmp_path):
+    path = tmp_path / "devices.json"
+    path.write_text("{not json")
+    registry = BTRegistry(str(path))
+
+    assert not registry.load()
+    assert len(registry) == 0
+
+
+def test_legacy_address_list_is_imported(tmp_path):
+    (tmp_path / "devices.txt").write_text(f"{ADDRESS.lower()}\n\n{OTHER}\n")
+    manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+
+    assert sorted(entry.address for entry in manager.registry) == sorted([ADDRESS, OTHER])
+
+
+def test_missed_devices_are_connected_from_their_advertisement(scanner, advertised, tmp_path):
+    async def run():
+        registry = BTRegistry(str(tmp_path / "devices.json"))
+        registry.record(ADDRESS)
+        registry.record(OTHER)
+        registry.save()
+        manager = BTManager(registry_path=registry.path)
+        scanner.addresses = [ADDRESS, "00:00:00:00:00:00"]
+
+        connected = await manager.connect_registered(scan_timeout=0.1)
+
+        assert [device.address for device in connected] == [ADDRESS]
+        assert not isinstance(connected[0].transport.device, str)
+        # Only the registered devices are kept.
+        assert sorted(device.address for device in manager.devices) == sorted([ADDRESS, OTHER])
+        assert manager.registry.get(ADDRESS).mtu == 247
+        assert manager.registry.get(OTHER).mtu is None
+
+    asyncio.run(run())
+
+
+def test_registered_devices_are_connected_without_scanning(scanner, tmp_path, monkeypatch):
+    async def run():
+        registry = BTRegistry(str(tmp_path / "devices.json"))
+        registry.record(ADDRESS)
+        registry.save()
+        manager = BTManager(registry_path=registry.path)
+        monkeypatch.setattr(bt_device, "BleakTransport", ReachableTransport)
+        scanner.fail_start = True
+
+        connected = await manager.connect_registered(scan_timeout=0.1)
+
+        assert [device.address for device in connected] == [ADDRESS]
+
+    asyncio.run(run())
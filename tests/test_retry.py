@@ -0,0 +1,62 @@
+"""Tests of the retries of a drawing after a transient error."""
+
+import asyncio
+
+import pytest
+
+from helpers import FailingWriteTransport, connected_device, rectangle
+from pygyw.bluetooth import BTException, BTRetryPolicy
+from pygyw.bluetooth.commands import BTCommand, GYWCharacteristics
+
+
+def test_delay_grows_exponentially_up_to_the_maximum():
+    policy = BTRetryPolicy(backoff=0.1, backoff_factor=2.0, max_backoff=0.3)
+    assert [policy.delay(retry) for retry in range(1, 5)] == pytest.approx([0.1, 0.2, 0.3, 0.3])
+
+
+def test_retry_resumes_after_the_last_control_command():
+    async def run():
+        # The 4th write is the control command of the second instruction.
+        transport = FailingWriteTransport([4])
+        device = await connected_device(transport, retry_policy=BTRetryPolicy(max_retries=2, backoff=0.0))
+        bt_commands = [
+            BTCommand(GYWCharacteristics.DISPLAY_DATA, b"first"),
+            BTCommand(GYWCharacteristics.DISPLAY_COMMAND, b"\x01"),
+            BTCommand(GYWCharacteristics.DISPLAY_DATA, b"second"),
+            BTCommand(GYWCharacteristics.DISPLAY_COMMAND, b"\x02"),
+        ]
+
+        result = await device.send_commands(bt_commands)
+
+        assert result.retries == 1
+        # The first instruction is not written again, the data of the second one is.
+        assert [w.data for w in transport.writes] == [b"first", b"\x01", b"second", b"second", b"\x02"]
+        assert transport.is_connected
+
+    asyncio.run(run())
+
+
+def test_error_without_retry_policy_disconnects():
+    async def run():
+        transport = FailingWriteTransport([1])
+        device = await connected_device(transport)
+
+        with pytest.raises(BTException):
+            await device.send_drawing(rectangle(0))
+        assert not transport.is_connected
+
+    asyncio.run(run())
+
+
+def test_error_after_the_last_retry_disconnects():
+    async def run():
+        transport = FailingWriteTransport([1, 2, 3])
+        device = await connected_device(transport, retry_policy=BTRetryPolicy(max_retries=2, backoff=0.0))
+
+        with pytest.raises(BTException):
+            await device.send_drawing(rectangle(0))
+        assert transport.attempts == 3
+        assert device.stats.retries == 2
+        assert not transport.is_connected
+
+    asyncio.run(run())
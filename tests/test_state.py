@@ -0,0 +1,97 @@
+"""Tests of the `BTDisplayState` omitting the fields the display already has."""
+
+import asyncio
+
+from helpers import FailingWriteTransport, connected_device
+from pygyw.bluetooth import BTRetryPolicy, LoopbackTransport
+from pygyw.bluetooth.commands import BTCommand, ControlCodes, GYWCharacteristics
+from pygyw.bluetooth.state import BTDisplayState
+from pygyw.layout import drawings, encoders
+from pygyw.layout.color import Colors
+from pygyw.layout.fonts import GYWFonts
+
+
+def text_command(size=24, color=Colors.BLACK, font=GYWFonts.ROBOTO_MONO):
+    data = bytearray(encoders.TEXT_LAYOUT.size)
+    encoders.pack_text(data, 0, 10, 20, font, size, color)
+    return BTCommand(GYWCharacteristics.DISPLAY_COMMAND, data)
+
+
+def clear_command(color=None):
+    return BTCommand(GYWCharacteristics.DISPLAY_COMMAND, encoders.encode_clear(color))
+
+
+def test_unknown_state_keeps_the_commands():
+    state = BTDisplayState()
+    command = text_command()
+
+    assert state.shorten(command) is command
+    assert state.to_json() == {"font": None, "size": None, "color": None, "background": None}
+
+
+def test_trailing_fields_already_sent_are_omitted():
+    state = BTDisplayState()
+    state.update(text_command())
+
+    assert bytes(state.shorten(text_command()).data) == bytes(text_command().data[:5])
+    # The size differs: only the color is omitted.
+    assert bytes(state.shorten(text_command(size=32)).data) == bytes(text_command(size=32).data[:11])
+    # The font is before the size: it is sent again with it.
+    assert len(state.shorten(text_command(size=32, font=GYWFonts.ROBOTO_MONO_BOLD)).data) == 11
+    # The color is the last field: nothing can be omitted before it.
+    assert len(state.shorten(text_command(color=Colors.RED)).data) == 15
+    assert state.to_json()["font"] == "robmn"
+
+
+def test_clear_forgets_the_text_fields():
+    state = BTDisplayState()
+    state.update(text_command())
+    state.update(clear_command(Colors.WHITE))
+
+    assert len(state.shorten(text_command()).data) == 15
+    assert bytes(state.shorten(clear_command(Colors.WHITE)).data) == bytes([ControlCodes.CLEAR])
+    assert len(state.shorten(clear_command(Colors.RED)).data) == 5
+
+    state.reset()
+    assert len(state.shorten(clear_command(Colors.WHITE)).data) == 5
+
+
+def test_data_commands_are_not_shortened():
+    state = BTDisplayState()
+    state.update(text_command())
+    command = BTCommand(GYWCharacteristics.DISPLAY_DATA, bytearray(text_command().data))
+
+    assert state.shorten(command) is command
+
+
+def test_display_state_omits_the_fields_already_sent():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport, track_display_state=True)
+
+        await device.send_drawing(drawings.TextDrawing("one", 10, 10))
+        await device.send_drawing(drawings.TextDrawing("two", 10, 50))
+        await device.send_drawing(drawings.TextDrawing("three", 10, 90, color=Colors.RED))
+
+        controls = [w.data for w in transport.writes if w.characteristic == GYWCharacteristics.DISPLAY_COMMAND]
+        # Full command, then without font, size and color, then full again as the color changed.
+        assert [len(data) for data in controls] == [15, 5, 15]
+        assert controls[1][0] == ControlCodes.DRAW_TEXT
+        assert device.stats.bytes_saved == 10
+
+    asyncio.run(run())
+
+
+def test_display_state_is_forgotten_after_an_error():
+    async def run():
+        transport = FailingWriteTransport([4])
+        device = await connected_device(transport, track_display_state=True,
+                                        retry_policy=BTRetryPolicy(max_retries=1, backoff=0.0))
+
+        await device.send_drawing(drawings.TextDrawing("one", 10, 10))
+        await device.send_drawing(drawings.TextDrawing("two", 10, 50))
+
+        controls = [w.data for w in transport.writes if w.characteristic == GYWCharacteristics.DISPLAY_COMMAND]
+        assert [len(data) for data in controls] == [15, 15]
+
+    asyncio.run(run())
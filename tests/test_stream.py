@@ -0,0 +1,81 @@
+"""Tests of `BTDevice.stream`, sending drawings as a source produces them."""
+
+import asyncio
+
+import pytest
+
+from helpers import FailingWriteTransport, connected_device, rectangle, rectangle_lefts
+from pygyw.bluetooth import BTException, LoopbackTransport
+from pygyw.bluetooth.writer import SendStatus
+
+
+def test_drawings_are_sent_in_order_with_their_latency():
+    async def run():
+        transport = LoopbackTransport(latency=0.01)
+        device = await connected_device(transport)
+
+        async def source():
+            for left in range(5):
+                await asyncio.sleep(0.005)
+                yield rectangle(left)
+
+        items = [item async for item in device.stream(source())]
+
+        assert [item.index for item in items] == list(range(5))
+        assert rectangle_lefts(transport) == list(range(5))
+        assert all(item.result.status == SendStatus.SENT and item.latency >= 0.01 for item in items)
+        assert items[0].to_json()["index"] == 0
+
+    asyncio.run(run())
+
+
+def test_source_is_read_at_most_prefetch_drawings_ahead():
+    async def run():
+        device = await connected_device(LoopbackTransport(latency=0.02))
+        taken = []
+
+        def source():
+            for left in range(10):
+                taken.append(left)
+                yield rectangle(left)
+
+        async for item in device.stream(source(), prefetch=3):
+            # The drawing being consumed and the ones queued after it, plus one waiting for a free slot.
+            assert len(taken) <= item.index + 4
+
+    asyncio.run(run())
+
+
+def test_error_of_the_source_is_raised_after_the_drawings_taken():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+
+        async def source():
+            yield rectangle(1)
+            yield rectangle(2)
+            raise ValueError("Feed closed")
+
+        items = []
+        with pytest.raises(ValueError):
+            async for item in device.stream(source()):
+                items.append(item)
+
+        assert [item.index for item in items] == [0, 1]
+        assert rectangle_lefts(transport) == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_failed_drawing_stops_the_stream():
+    async def run():
+        device = await connected_device(FailingWriteTransport([2]))
+
+        items = []
+        with pytest.raises(BTException):
+            async for item in device.stream([rectangle(left) for left in range(5)]):
+                items.append(item)
+
+        assert [item.index for item in items] == [0]
+
+    asyncio.run(run())
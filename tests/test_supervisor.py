@@ -0,0 +1,142 @@
+"""Tests of the `BTSupervisor` keeping a device connected."""
+
+import asyncio
+
+import pytest
+
+from helpers import CountingTransport, connected_device, rectangle, rectangle_lefts, wait_until
+from pygyw.bluetooth import BTException, BTSupervisor, LoopbackTransport, SendStatus
+from pygyw.bluetooth.commands import GYWCharacteristics
+from pygyw.layout.color import Colors
+
+
+def test_supervisor_replays_the_screen_after_a_reconnection():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=0.01, jitter=0.0)
+        await supervisor.start()
+        try:
+            await device.send_drawing(rectangle(1))
+            await device.clear_screen(Colors.WHITE)
+            await device.send_drawing(rectangle(2))
+            await device.send_drawing(rectangle(3))
+            sent = transport.writes[1:]
+
+            transport.drop()
+            transport.reset()
+            await wait_until(lambda: supervisor.reconnections == 1 and supervisor.connected)
+
+            # The clear and the drawings sent since, not the drawing cleared.
+            assert [(w.characteristic, w.data) for w in transport.writes] == [(w.characteristic, w.data) for w in sent]
+
+            # Drawings sent while the link is down wait for it.
+            transport.drop()
+            result = await asyncio.wait_for(device.send_drawing(rectangle(4)), 5.0)
+            assert result.status == SendStatus.SENT
+            assert supervisor.reconnections == 2
+        finally:
+            await supervisor.stop()
+
+    asyncio.run(run())
+
+
+def test_supervisor_backs_off_when_the_screen_cannot_be_restored():
+    async def run():
+        transport = CountingTransport()
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=0.2, jitter=0.0)
+        await supervisor.start()
+        try:
+            await device.send_drawing(rectangle(1))
+            transport.error_rate = 1.0
+            transport.connects = 0
+            transport.drop()
+            await asyncio.sleep(1.0)
+            # Attempts after 0, 0.2 and 0.6 seconds, the next one after 1.4 seconds.
+            assert transport.connects == 3
+            assert supervisor.reconnections == 0
+        finally:
+            await supervisor.stop()
+
+    asyncio.run(run())
+
+
+def test_supervisor_gives_up_after_max_attempts_when_the_screen_cannot_be_restored():
+    async def run():
+        transport = CountingTransport()
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=0.01, jitter=0.0, max_attempts=2)
+        await supervisor.start()
+        await device.send_drawing(rectangle(1))
+        transport.error_rate = 1.0
+        transport.connects = 0
+        transport.drop()
+        await wait_until(lambda: not supervisor.running)
+        assert transport.connects == 2
+
+    asyncio.run(run())
+
+
+def test_supervisor_retries_failed_connections_with_backoff():
+    async def run():
+        transport = CountingTransport()
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=0.01, jitter=0.0)
+        await supervisor.start()
+        try:
+            await wait_until(lambda: supervisor.generation == 1)
+            transport.connects = 0
+            transport.fail_connects(3)
+            transport.drop()
+            await wait_until(lambda: supervisor.reconnections == 1)
+            assert transport.connects == 4
+        finally:
+            await supervisor.stop()
+
+    asyncio.run(run())
+
+
+def test_replay_does_not_interleave_with_a_probe():
+    async def run():
+        transport = LoopbackTransport(latency=0.005)
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=0.0, jitter=0.0)
+        await supervisor.start()
+        try:
+            for left in range(5):
+                await device.send_drawing(rectangle(left))
+            transport.drop()
+            transport.reset()
+            await asyncio.sleep(0)
+            await wait_until(lambda: transport.is_connected)
+            # The probe waits for the end of the replay, which holds the link.
+            await device.probe(rtt_samples=2, chunk_sizes=[20], packets=2)
+            await wait_until(lambda: supervisor.connected)
+
+            assert all(w.characteristic == GYWCharacteristics.DISPLAY_COMMAND for w in transport.writes[:5])
+            assert rectangle_lefts(transport)[:5] == [0, 1, 2, 3, 4]
+        finally:
+            await supervisor.stop()
+
+    asyncio.run(run())
+
+
+def test_waiting_drawings_fail_when_the_supervisor_stops():
+    async def run():
+        transport = LoopbackTransport()
+        device = await connected_device(transport)
+        supervisor = BTSupervisor(device, backoff=10.0, jitter=0.0)
+        await supervisor.start()
+        transport.fail_connects(1)
+        transport.drop()
+
+        pending = asyncio.ensure_future(device.send_drawing(rectangle(0)))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        await supervisor.stop()
+
+        with pytest.raises(BTException):
+            await asyncio.wait_for(pending, 1.0)
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""Tests of the `BTSyncClient`, driving devices from threads without an event loop."""
+
+import concurrent.futures
+import threading
+
+import pytest
+
+from helpers import ADDRESS
+from pygyw.bluetooth import BTException, BTManager, BTSyncClient, LoopbackTransport
+from pygyw.bluetooth.writer import SendStatus
+from pygyw.layout import drawings
+
+OTHER = "11:22:33:44:55:66"
+
+
+@pytest.fixture
+def client(scanner, tmp_path):
+    with BTSyncClient() as client:
+        client.manager = BTManager(registry_path=str(tmp_path / "devices.json"))
+        yield client
+
+
+def test_blocking_calls_send_the_drawings(client):
+    transport = LoopbackTransport()
+    device = client.device(ADDRESS, transport=transport)
+
+    assert device.connect()
+    assert device.send_drawing(drawings.TextDrawing("one")).status == SendStatus.SENT
+    futures = [device.submit(drawings.TextDrawing(text)) for text in ("two", "three")]
+    device.flush()
+
+    assert all(future.done() for future in futures)
+    assert b"two" in transport.received() and b"three" in transport.received()
+    assert device.stats.commands == 6
+
+
+def test_calls_from_several_threads(client):
+    device = client.device(ADDRESS, transport=LoopbackTransport())
+    device.connect()
+
+    threads = [threading.Thread(target=device.send_drawing, args=(drawings.TextDrawing(f"line {index}"),))
+               for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert device.stats.commands == 16
+
+
+def test_devices_are_wrapped_once_per_address(client, scanner):
+    scanner.addresses = [ADDRESS, OTHER]
+    device = client.device(ADDRESS.lower(), transport=LoopbackTransport())
+
+    for _ in range(2):
+        found = client.scan_devices(timeout=0.1)
+        assert [sync_device.address.upper() for sync_device in found] == [ADDRESS, OTHER]
+        assert found[0] is device
+    assert client.find(OTHER, timeout=0.1) is found[1]
+    assert client.device(ADDRESS) is device
+    assert str(client).startswith("Synchronous client of 2 devices")
+
+
+def test_closed_client_refuses_calls(client):
+    device = client.device(ADDRESS, transport=LoopbackTransport())
+    device.connect()
+    client.close()
+
+    assert not client.running
+    assert not device.is_connected
+    with pytest.raises(BTException):
+        device.send_drawing(drawings.TextDrawing("late"))
+
+
+def test_timeout_cancels_the_call(client):
+    device = client.device(ADDRESS, transport=LoopbackTransport(latency=1.0))
+    device.connect()
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        device.send_drawing(drawings.TextDrawing("slow"), timeout=0.05)
@@ -0,0 +1,71 @@
+"""Tests of the `GYWTemplate`, rendering screens of which only some fields change."""
+
+import pytest
+
+from helpers import rectangle
+from pygyw.layout import drawings
+from pygyw.layout.color import Colors
+from pygyw.layout.icons import GYWIcons
+from pygyw.layout.templates import GYWSlot, GYWTemplate
+
+
+def encoded(bt_commands):
+    return [(command.characteristic, bytes(command.data)) for command in bt_commands]
+
+
+def full_commands(*elements):
+    return [command for element in elements for command in element.to_commands()]
+
+
+def station_template():
+    title = drawings.TextDrawing("Station", 10, 10)
+    part = drawings.TextDrawing("Part #0", 10, 50, max_width=120, max_lines=2)
+    status = drawings.IconDrawing(GYWIcons.CHECK, 300, 10)
+    count = drawings.TextDrawing("0/120", 10, 150, color=Colors.RED, size=32)
+    elements = [title, rectangle(5), GYWSlot("part", part), GYWSlot("status", status),
+                GYWSlot("count", count), GYWSlot("bar", rectangle(0), "width")]
+    return GYWTemplate(elements), (title, part, status, count)
+
+
+def test_render_is_the_encoding_of_the_drawings_with_the_values():
+    template, (title, part, status, count) = station_template()
+
+    rendered = template.render({"part": "Part #12345 of the station", "status": GYWIcons.WARNING}, count="37/120",
+                               bar=37)
+
+    expected = full_commands(title, rectangle(5), part.replace(text="Part #12345 of the station"),
+                             status.replace(icon=GYWIcons.WARNING), count.replace(text="37/120"),
+                             rectangle(0).replace(width=37))
+    assert encoded(rendered) == encoded(expected)
+    assert template.slots == ["part", "status", "count", "bar"]
+
+
+def test_slots_without_a_value_keep_the_value_of_their_drawing():
+    template, (title, part, status, count) = station_template()
+
+    assert encoded(template.render()) == encoded(full_commands(title, rectangle(5), part, status, count, rectangle(0)))
+
+
+def test_empty_values_draw_nothing():
+    template, (title, part, status, count) = station_template()
+
+    rendered = template.render(part="", status=None)
+
+    assert encoded(rendered) == encoded(full_commands(title, rectangle(5), count, rectangle(0)))
+
+
+def test_static_commands_are_shared_between_renders():
+    template, _ = station_template()
+
+    first = template.render(count="1/120")
+    second = template.render(count="2/120")
+
+    assert first[0] is second[0]
+    assert all(command.view().readonly for command in first[:4])
+
+
+def test_unknown_slot_is_refused():
+    template, _ = station_template()
+
+    with pytest.raises(KeyError):
+        template.render(missing="value")
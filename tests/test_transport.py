@@ -0,0 +1,143 @@
+"""Tests of the `LoopbackTransport`."""
+
+import asyncio
+
+import pytest
+from bleak.exc import BleakError
+
+from pygyw.bluetooth import LoopbackTransport
+
+CHARACTERISTIC = "characteristic"
+
+
+def test_writes_are_recorded_in_order():
+    async def run():
+        transport = LoopbackTransport()
+        assert await transport.connect()
+
+        await transport.write(CHARACTERISTIC, b"one")
+        await transport.write("other", memoryview(b"two"), response=True)
+
+        assert [(w.characteristic, w.data, w.response) for w in transport.writes] == [
+            (CHARACTERISTIC, b"one", False),
+            ("other", b"two", True),
+        ]
+        assert transport.received() == b"onetwo"
+        assert transport.received(CHARACTERISTIC) == b"one"
+
+        transport.reset()
+        assert transport.writes == []
+
+    asyncio.run(run())
+
+
+def test_write_fails_when_not_connected():
+    async def run():
+        transport = LoopbackTransport()
+        with pytest.raises(BleakError):
+            await transport.write(CHARACTERISTIC, b"data")
+
+    asyncio.run(run())
+
+
+def test_mtu_is_only_known_while_connected():
+    async def run():
+        transport = LoopbackTransport(mtu=185)
+        assert transport.mtu is None
+        await transport.connect()
+        assert transport.mtu == 185
+        await transport.disconnect()
+        assert transport.mtu is None
+
+    asyncio.run(run())
+
+
+def test_injected_errors_fail_the_next_writes_only():
+    async def run():
+        transport = LoopbackTransport()
+        await transport.connect()
+        transport.inject_errors(2, OSError("Lost"))
+
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await transport.write(CHARACTERISTIC, b"data")
+        await transport.write(CHARACTERISTIC, b"data")
+
+        assert len(transport.writes) == 1
+
+    asyncio.run(run())
+
+
+def test_error_rate_is_reproducible_with_a_seed():
+    async def run():
+        async def outcomes():
+            transport = LoopbackTransport(error_rate=0.5, seed=42)
+            await transport.connect()
+            result = []
+            for _ in range(50):
+                try:
+                    await transport.write(CHARACTERISTIC, b"data")
+                    result.append(True)
+                except BleakError:
+                    result.append(False)
+            return result
+
+        first = await outcomes()
+        assert first == await outcomes()
+        assert True in first and False in first
+
+    asyncio.run(run())
+
+
+def test_throughput_limits_the_write_rate():
+    async def run():
+        transport = LoopbackTransport(throughput=10_000)
+        await transport.connect()
+        loop = asyncio.get_running_loop()
+
+        started_at = loop.time()
+        for _ in range(10):
+            await transport.write(CHARACTERISTIC, bytes(100))
+
+        assert loop.time() - started_at >= 0.09
+
+    asyncio.run(run())
+
+
+def test_drop_and_failed_connections():
+    async def run():
+        transport = LoopbackTransport()
+        lost = []
+        transport.disconnected_callback = lambda: lost.append(True)
+
+        transport.fail_connects(1)
+        assert not await transport.connect()
+        assert await transport.connect()
+
+        transport.drop()
+        assert not transport.is_connected
+        assert lost == [True]
+
+        # Closing the link on purpose is not a loss.
+        await transport.connect()
+        await transport.disconnect()
+        assert lost == [True]
+
+    asyncio.run(run())
+
+
+def test_notifications_reach_the_subscribed_handler():
+    async def run():
+        transport = LoopbackTransport()
+        await transport.connect()
+        received = []
+        await transport.start_notify(CHARACTERISTIC, lambda characteristic, data: received.append(bytes(data)))
+
+        transport.notify(CHARACTERISTIC, b"one")
+        transport.notify("other", b"ignored")
+        await transport.stop_notify(CHARACTERISTIC)
+        transport.notify(CHARACTERISTIC, b"two")
+
+        assert received == [b"one"]
+
+    asyncio.run(run())
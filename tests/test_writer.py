@@ -0,0 +1,188 @@
+"""Tests of the queue of a device: priorities, keyed updates and deadlines."""
+
+import asyncio
+
+from helpers import connected_device, rectangle, rectangle_lefts
+from pygyw.bluetooth import BTJob, BTJobQueue, LoopbackTransport, Priority, SendStatus
+from pygyw.bluetooth.commands import ControlCodes, GYWCharacteristics
+from pygyw.layout import drawings
+
+
+def job(name, priority=Priority.NORMAL, key=None):
+    return BTJob([name], asyncio.get_running_loop().create_future(), 0.0, priority, key)
+
+
+def test_queue_returns_the_most_urgent_lane_first():
+    async def run():
+        queue = BTJobQueue()
+        for name, priority in [("a", Priority.BACKGROUND), ("b", Priority.NORMAL), ("c", Priority.URGENT),
+                               ("d", Priority.NORMAL)]:
+            queue.put_nowait(job(name, priority))
+
+        assert [queue.get_nowait().commands[0] for _ in range(4)] == ["c", "b", "d", "a"]
+        assert queue.empty()
+
+    asyncio.run(run())
+
+
+def test_urgent_drawings_are_sent_first():
+    async def run():
+        transport = LoopbackTransport(latency=0.02)
+        device = await connected_device(transport)
+
+        first = device.submit_nowait(rectangle(1))
+        await asyncio.sleep(0)
+        background = device.submit_nowait(rectangle(2), Priority.BACKGROUND)
+        normal = device.submit_nowait(rectangle(3))
+        urgent = device.submit_nowait(rectangle(4), Priority.URGENT)
+        await asyncio.gather(first, background, normal, urgent)
+
+        assert rectangle_lefts(transport) == [1, 4, 3, 2]
+
+    asyncio.run(run())
+
+
+def test_urgent_drawing_preempts_a_text_between_two_lines():
+    async def run():
+        transport = LoopbackTransport(latency=0.01)
+        device = await connected_device(transport)
+        text = drawings.TextDrawing("one two three four", max_width=100, max_lines=0)
+        assert len(text.to_commands()) == 8
+
+        background = device.submit_nowait(text, Priority.BACKGROUND)
+        await asyncio.sleep(0.015)
+        urgent = device.submit_nowait(rectangle(1), Priority.URGENT)
+        await asyncio.gather(background, urgent)
+
+        controls = [w.data[0] for w in transport.writes if w.characteristic == GYWCharacteristics.DISPLAY_COMMAND]
+        assert controls[0] == ControlCodes.DRAW_TEXT
+        assert controls.count(ControlCodes.DRAW_TEXT) == 4
+        assert 0 < controls.index(ControlCodes.DRAW_RECTANGLE) < 4
+        # The packets of a command are never interleaved: each line is followed by its control command.
+        assert transport.writes[0].characteristic == GYWCharacteristics.DISPLAY_DATA
+        assert transport.writes[1].characteristic == GYWCharacteristics.DISPLAY_COMMAND
+        assert device.stats.preemptions == 1
+        assert rectangle_lefts(transport) == [1]
+
+    asyncio.run(run())
+
+
+def test_update_replaces_the_waiting_drawing_of_its_key():
+    async def run():
+        transport = LoopbackTransport(latency=0.02)
+        device = await connected_device(transport)
+
+        busy = device.submit_nowait(rectangle(1))
+        await asyncio.sleep(0)
+        replaced = device.update_nowait("torque", rectangle(2))
+        other = device.submit_nowait(rectangle(3))
+        latest = device.update_nowait("torque", rectangle(4))
+        await asyncio.gather(busy, replaced, other, latest)
+
+        assert replaced.result().status == SendStatus.REPLACED
+        assert latest.result().status == SendStatus.SENT
+        # The latest drawing takes the place of the first one queued with its key.
+        assert rectangle_lefts(transport) == [1, 4, 3]
+
+    asyncio.run(run())
+
+
+def test_replacement_with_another_priority_moves_to_the_end_of_its_lane():
+    async def run():
+        queue = BTJobQueue()
+        queue.put_nowait(job("a", Priority.NORMAL, key="torque"))
+        queue.put_nowait(job("b", Priority.NORMAL))
+        queue.put_nowait(job("c", Priority.URGENT))
+
+        old = queue.replace(job("d", Priority.URGENT, key="torque"))
+
+        assert old.commands == ["a"]
+        assert queue.qsize() == 3
+        assert [queue.get_nowait().commands[0] for _ in range(3)] == ["c", "d", "b"]
+
+    asyncio.run(run())
+
+
+def test_replacement_with_the_same_priority_keeps_its_place():
+    async def run():
+        queue = BTJobQueue()
+        queue.put_nowait(job("a", key="torque"))
+        queue.put_nowait(job("b"))
+
+        queue.replace(job("c", key="torque"))
+        assert queue.replace(job("d", key="speed")) is None
+
+        assert [queue.get_nowait().commands[0] for _ in range(2)] == ["c", "b"]
+        assert queue.empty()
+
+    asyncio.run(run())
+
+
+def test_update_with_a_higher_priority_overtakes_the_normal_drawings():
+    async def run():
+        transport = LoopbackTransport(latency=0.02)
+        device = await connected_device(transport)
+
+        busy = device.submit_nowait(rectangle(1))
+        await asyncio.sleep(0)
+        replaced = device.update_nowait("torque", rectangle(2))
+        other = device.submit_nowait(rectangle(3))
+        latest = device.update_nowait("torque", rectangle(4), Priority.URGENT)
+        await asyncio.gather(busy, replaced, other, latest)
+
+        assert replaced.result().status == SendStatus.REPLACED
+        assert rectangle_lefts(transport) == [1, 4, 3]
+        assert device.stats.coalesced_by_key == {"torque": 1}
+
+    asyncio.run(run())
+
+
+def test_drawings_waiting_past_their_deadline_expire():
+    async def run():
+        transport = LoopbackTransport(latency=0.05)
+        device = await connected_device(transport)
+
+        busy = device.submit_nowait(rectangle(1))
+        await asyncio.sleep(0)
+        expired = device.submit_nowait(rectangle(2), ttl=0.01)
+        deadline = asyncio.get_running_loop().time() + 10.0
+        kept = device.submit_nowait(rectangle(3), deadline=deadline)
+        await asyncio.gather(busy, expired, kept)
+
+        assert expired.result().status == SendStatus.EXPIRED
+        assert kept.result().status == SendStatus.SENT
+        assert rectangle_lefts(transport) == [1, 3]
+        assert device.stats.expired == 1
+
+    asyncio.run(run())
+
+
+def test_ttl_and_deadline_use_the_earliest():
+    async def run():
+        transport = LoopbackTransport(latency=0.05)
+        device = await connected_device(transport)
+
+        busy = device.submit_nowait(rectangle(1))
+        await asyncio.sleep(0)
+        later = asyncio.get_running_loop().time() + 10.0
+        expired = device.submit_nowait(rectangle(2), ttl=0.01, deadline=later)
+        await asyncio.gather(busy, expired)
+
+        assert expired.result().status == SendStatus.EXPIRED
+        assert expired.result().commands == 0
+
+    asyncio.run(run())
+
+
+def test_started_drawing_is_not_dropped_when_its_deadline_passes():
+    async def run():
+        transport = LoopbackTransport(latency=0.02)
+        device = await connected_device(transport)
+        text = drawings.TextDrawing("one two three four", max_width=100, max_lines=0)
+
+        result = await device.send_drawing(text, ttl=0.01)
+
+        assert result.status == SendStatus.SENT
+        assert result.commands == 8
+
+    asyncio.run(run())